@@ -0,0 +1,83 @@
+"""Память AST на большой сгенерированной программе: байт на узел.
+
+    python benchmarks/ast_memory_bench.py [--functions 2000]
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from antlr4 import CommonTokenStream, InputStream  # noqa: E402
+
+from src.AST.Karkas import ASTNode  # noqa: E402
+from src.lexer.fast_lexer import FastLexer  # noqa: E402
+from src.parser.rd_parser import RDParser  # noqa: E402
+
+FUNCTION = """
+    function f{i}(a: int, b: float): int {{
+        let x{i}: int = a * 2 + {i} - (a / 3);
+        let s{i}: string = "name{i}";
+        if (x{i} > {i} && !(a == 0) || false) {{
+            print(s{i});
+        }} else {{
+            x{i} = x{i} - 1;
+        }}
+        while (x{i} != 0) {{ x{i} = x{i} - 1; }}
+        for (let j: int = 0; j < 10; j = j + 1) {{ print(j * b); }}
+        match x{i} {{
+            case 1: print(1);
+            default: print(0);
+        }}
+        return x{i} + f{i}(a, b);
+    }}
+"""
+
+
+def generate(functions: int) -> str:
+    return "{\n" + "".join(FUNCTION.format(i=i) for i in range(functions)) + "}\n"
+
+
+def count_nodes(root) -> int:
+    count, stack = 0, [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ASTNode):
+            count += 1
+            fields = getattr(node, "_fields", None)
+            values = [getattr(node, f) for f in fields] if fields else vars(node).values()
+            stack.extend(values)
+        elif isinstance(node, (list, tuple)):
+            stack.extend(node)
+    return count
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--functions", type=int, default=2000)
+    args = arg_parser.parse_args()
+
+    code = generate(args.functions)
+    tokens = CommonTokenStream(FastLexer(InputStream(code)))
+    tokens.fill()
+    parser = RDParser(tokens)
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    ast = parser.parse()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    nodes = count_nodes(ast)
+    total = after - before
+    print(f"Исходник: {len(code) / 1024:.0f} КБ, токенов: {len(tokens.tokens)}")
+    print(f"Узлов AST: {nodes}")
+    print(f"Память AST: {total / 1024 / 1024:.2f} МБ, {total / nodes:.1f} байт на узел")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Память и скорость сканирования: список объектов IR против CompactIR.
+
+    python benchmarks/compact_ir_bench.py [--functions 3000] [--repeat 5]
+
+Программа генерируется как в ast_memory_bench.py. Память меряется
+tracemalloc: сколько остаётся занятым после построения списка IR и после
+перевода его в CompactIR с удалением списка. Сканирование — сбор имён всех
+переменных через vars() каждой инструкции (как раньше в NASMGenerator)
+против прохода по массивам CompactIR.
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from antlr4 import CommonTokenStream, InputStream  # noqa: E402
+
+from ast_memory_bench import generate  # noqa: E402
+from src.IR.compact import CompactIR  # noqa: E402
+from src.IR.instructions import IRBinary, Name  # noqa: E402
+from src.IR.ir_generator import IRGenerator  # noqa: E402
+from src.lexer.fast_lexer import FastLexer  # noqa: E402
+from src.parser.rd_parser import RDParser  # noqa: E402
+from src.semantic.semantic_analyzer import SemanticAnalyzer  # noqa: E402
+
+
+def build_ast(functions: int):
+    lexer = FastLexer(InputStream(generate(functions)))
+    lexer.removeErrorListeners()
+    ast = RDParser(CommonTokenStream(lexer)).parse()
+    SemanticAnalyzer().analyze(ast)
+    return ast
+
+
+def object_names(ir) -> set:
+    names = set()
+    for instr in ir:
+        for value in vars(instr).values():
+            if isinstance(value, list):
+                names.update(item.name for item in value if isinstance(item, Name))
+            elif isinstance(value, Name):
+                names.add(value.name)
+    return names
+
+
+def object_count(ir) -> int:
+    return sum(1 for instr in ir if isinstance(instr, IRBinary))
+
+
+def measure_memory(ast):
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    ir = IRGenerator().generate(ast)
+    gc.collect()
+    as_objects = tracemalloc.get_traced_memory()[0] - base
+    compact = CompactIR.from_instructions(ir)
+    del ir
+    gc.collect()
+    as_arrays = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return len(compact), as_objects, as_arrays
+
+
+def best(func, arg, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(arg)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--functions", type=int, default=3000)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    ast = build_ast(args.functions)
+    count, as_objects, as_arrays = measure_memory(ast)
+    print(f"Инструкций IR: {count}")
+    print(f"{'Память':<24} {'всего, МБ':>10} {'байт/инстр.':>12}")
+    print(f"{'список объектов':<24} {as_objects / 2**20:>10.1f} {as_objects / count:>12.0f}")
+    print(f"{'CompactIR':<24} {as_arrays / 2**20:>10.1f} {as_arrays / count:>12.0f}"
+          f"  ({as_objects / as_arrays:.1f}× меньше)")
+
+    ir = IRGenerator().generate(ast)
+    compact = CompactIR.from_instructions(ir)
+    assert object_names(ir) == compact.names()
+    assert object_count(ir) == compact.count(IRBinary)
+    print(f"{'Сканирование':<24} {'объекты, мс':>12} {'массивы, мс':>12}")
+    for title, slow, fast in [("имена переменных", object_names, CompactIR.names),
+                              ("число IRBinary", object_count, lambda c: c.count(IRBinary))]:
+        t_objects = best(slow, ir, args.repeat)
+        t_arrays = best(fast, compact, args.repeat)
+        print(f"{title:<24} {t_objects * 1000:>12.2f} {t_arrays * 1000:>12.2f}"
+              f"  ({t_objects / t_arrays:.0f}×)")
+
+
+if __name__ == "__main__":
+    main()
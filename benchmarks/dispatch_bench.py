@@ -0,0 +1,116 @@
+"""Накладные расходы диспетчеризации на узел: getattr по имени, цепочка
+isinstance и таблица DispatchTable — на узлах AST и инструкциях IR.
+
+    python benchmarks/dispatch_bench.py [--functions 500] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from antlr4 import CommonTokenStream, InputStream  # noqa: E402
+
+from ast_memory_bench import generate  # noqa: E402
+from src.AST.Karkas import *  # noqa: E402,F403
+from src.IR.instructions import *  # noqa: E402,F403
+from src.IR.ir_generator import IRGenerator  # noqa: E402
+from src.dispatch import DispatchTable  # noqa: E402
+from src.lexer.fast_lexer import FastLexer  # noqa: E402
+from src.parser.rd_parser import RDParser  # noqa: E402
+from src.semantic.semantic_analyzer import SemanticAnalyzer  # noqa: E402
+
+AST_CHAIN = (VarDeclaration, Assignment, PrintStatement, FunctionDeclaration, FunctionCall,
+             ReturnStatement, Block, IfStatement, WhileStatement, ForStatement,
+             TryCatchStatement, MatchStatement, Literal, Identifier, BinaryOp, UnaryOp)
+IR_CHAIN = (IRLabel, IRAssign, IRBinary, IRUnary, IRPrint, IRGoto, IRIfGoto, IRCall, IRReturn)
+
+
+def noop(self, node):
+    return None
+
+
+class ByName:
+    """Как прежний IRGenerator.visit: f-строка и getattr на каждый узел."""
+
+    def visit(self, node):
+        return getattr(self, f"visit_{type(node).__name__}", self.generic_visit)(node)
+
+    def generic_visit(self, node):
+        return None
+
+
+for _cls in AST_CHAIN + IR_CHAIN:
+    setattr(ByName, f"visit_{_cls.__name__}", noop)
+
+
+class ByIsinstance:
+    """Как прежние SemanticAnalyzer.visit_statement и NASMGenerator.translate."""
+
+    def __init__(self, chain):
+        self.chain = chain
+
+    def visit(self, node):
+        for cls in self.chain:
+            if isinstance(node, cls):
+                return noop(self, node)
+        return None
+
+
+class ByTable:
+    dispatch = DispatchTable(default=noop)
+    dispatch.on(*AST_CHAIN, *IR_CHAIN)(noop)
+
+    def visit(self, node):
+        return self.dispatch[type(node)](self, node)
+
+
+def collect_nodes(root):
+    nodes, stack = [], [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, ASTNode):
+            nodes.append(node)
+            stack.extend(getattr(node, f) for f in node._fields)
+        elif isinstance(node, (list, tuple)):
+            stack.extend(node)
+    return nodes
+
+
+def per_node_ns(visitor, nodes, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        visit = visitor.visit
+        for node in nodes:
+            visit(node)
+        best = min(best, time.perf_counter() - started)
+    return best / len(nodes) * 1e9
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--functions", type=int, default=500)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    ast = RDParser(CommonTokenStream(FastLexer(InputStream(generate(args.functions))))).parse()
+    ast_nodes = collect_nodes(ast)
+    SemanticAnalyzer().analyze(ast)
+    ir = IRGenerator().generate(ast)
+
+    print(f"Узлов AST: {len(ast_nodes)}, IR-инструкций: {len(ir)}")
+    print(f"{'Способ':<28} {'AST, нс/узел':>13} {'IR, нс/инстр.':>14}")
+    rows = [
+        ("getattr(f'visit_{name}')", ByName(), ByName()),
+        ("цепочка isinstance", ByIsinstance(AST_CHAIN), ByIsinstance(IR_CHAIN)),
+        ("DispatchTable", ByTable(), ByTable()),
+    ]
+    for title, ast_visitor, ir_visitor in rows:
+        print(f"{title:<28} {per_node_ns(ast_visitor, ast_nodes, args.repeat):>13.1f} "
+              f"{per_node_ns(ir_visitor, ir, args.repeat):>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
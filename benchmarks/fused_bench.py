@@ -0,0 +1,103 @@
+"""Два прохода (SemanticAnalyzer + IRGenerator) против однопроходного
+FusedIRGenerator на масштабированном корпусе.
+
+    python benchmarks/fused_bench.py [--scale 200] [--functions 2000] [--repeat 7]
+
+Корпус — корректные программы из example.my и тестовых скриптов, каждая
+повторена --scale раз, плюс сгенерированная программа из --functions функций.
+Время разбора не учитывается: AST для каждого замера строится заново.
+Сборщик мусора на время замера отключается — иначе его паузы, зависящие от
+числа живых AST, дают разброс больше самой разницы.
+"""
+import argparse
+import gc
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from antlr4 import CommonTokenStream, InputStream  # noqa: E402
+
+from ast_memory_bench import generate  # noqa: E402
+from src.IR.fused_generator import FusedIRGenerator  # noqa: E402
+from src.IR.ir_generator import IRGenerator  # noqa: E402
+from src.lexer.fast_lexer import FastLexer  # noqa: E402
+from src.parser.rd_parser import RDParser  # noqa: E402
+from src.semantic.semantic_analyzer import SemanticAnalyzer  # noqa: E402
+from tests.lexer_conformance_test import load_corpus  # noqa: E402
+
+
+def parse(code):
+    lexer = FastLexer(InputStream(code))
+    lexer.removeErrorListeners()
+    return RDParser(CommonTokenStream(lexer)).parse()
+
+
+def valid_corpus():
+    programs = []
+    for code in load_corpus():
+        try:
+            ast = parse(code)
+            SemanticAnalyzer().analyze(ast)
+            IRGenerator().generate(ast)
+        except Exception:
+            continue
+        programs.append(code)
+    return programs
+
+
+def two_pass(ast):
+    SemanticAnalyzer().analyze(ast)
+    return IRGenerator().generate(ast)
+
+
+def fused(ast):
+    return FusedIRGenerator().generate(ast)
+
+
+def timed(compile_ast, programs):
+    asts = [parse(code) for code in programs]
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for ast in asts:
+            compile_ast(ast)
+        return time.perf_counter() - started
+    finally:
+        gc.enable()
+
+
+def best_times(programs, repeat):
+    # Режимы чередуются, чтобы фоновая нагрузка сказывалась на обоих одинаково
+    separate = single = float("inf")
+    for _ in range(repeat):
+        separate = min(separate, timed(two_pass, programs))
+        single = min(single, timed(fused, programs))
+    return separate, single
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--scale", type=int, default=200)
+    arg_parser.add_argument("--functions", type=int, default=2000)
+    arg_parser.add_argument("--repeat", type=int, default=7)
+    args = arg_parser.parse_args()
+
+    with redirect_stdout(io.StringIO()):
+        corpus = valid_corpus()
+    workloads = [
+        (f"корпус: {len(corpus)} программ × {args.scale}", corpus * args.scale),
+        (f"одна программа: {args.functions} функций", [generate(args.functions)]),
+    ]
+    print(f"{'Нагрузка':<36} {'2 прохода, мс':>14} {'1 проход, мс':>13} {'ускорение':>10}")
+    for title, programs in workloads:
+        separate, single = best_times(programs, args.repeat)
+        print(f"{title:<36} {separate * 1000:>14.1f} {single * 1000:>13.1f} {separate / single:>9.2f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Оптимизация и трансляция в NASM по функциям: один процесс против пула.
+
+    python benchmarks/module_bench.py [--functions 2000] [--jobs 4] [--repeat 3]
+
+Программа генерируется как в ast_memory_bench.py; разбор, семантический
+анализ и генерация IR в замер не входят. Время пула включает его запуск и
+пересылку единиц между процессами, поэтому выигрыш появляется только на
+больших программах и при нескольких ядрах.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from antlr4 import CommonTokenStream, InputStream  # noqa: E402
+
+from ast_memory_bench import generate  # noqa: E402
+from src.IR.ir_generator import IRGenerator  # noqa: E402
+from src.IR.module import IRModule  # noqa: E402
+from src.lexer.fast_lexer import FastLexer  # noqa: E402
+from src.Nasm.nasm_generator import NASMGenerator  # noqa: E402
+from src.optimizer.ir_optimizer import IROptimizer  # noqa: E402
+from src.parser.rd_parser import RDParser  # noqa: E402
+from src.semantic.semantic_analyzer import SemanticAnalyzer  # noqa: E402
+
+
+def build_module(functions: int) -> IRModule:
+    lexer = FastLexer(InputStream(generate(functions)))
+    lexer.removeErrorListeners()
+    ast = RDParser(CommonTokenStream(lexer)).parse()
+    SemanticAnalyzer().analyze(ast)
+    return IRModule.from_instructions(IRGenerator().generate(ast))
+
+
+def backend(module: IRModule, jobs: int) -> str:
+    optimized = IROptimizer().optimize_module(module, jobs=jobs)
+    return NASMGenerator(jobs=jobs).generate(optimized)
+
+
+def best_time(module, jobs, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        backend(module, jobs)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--functions", type=int, default=2000)
+    arg_parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    with redirect_stdout(io.StringIO()):
+        module = build_module(args.functions)
+        same = backend(module, 1) == backend(module, args.jobs)
+    print(f"Функций: {len(module.functions)}, инструкций IR: {len(module)}, ядер: {os.cpu_count()}")
+    print(f"Вывод при --jobs {args.jobs} совпадает с последовательным: {'да' if same else 'НЕТ'}")
+    serial = best_time(module, 1, args.repeat)
+    parallel = best_time(module, args.jobs, args.repeat)
+    print(f"{'Режим':<16} {'Время, мс':>10}")
+    print(f"{'1 процесс':<16} {serial * 1000:>10.1f}")
+    print(f"{f'{args.jobs} процессов':<16} {parallel * 1000:>10.1f}  ({serial / parallel:.2f}×)")
+
+
+if __name__ == "__main__":
+    main()
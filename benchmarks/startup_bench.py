@@ -0,0 +1,68 @@
+"""Задержка «импорт → первое AST» в свежем процессе, со снимком DFA и без.
+
+    python benchmarks/startup_bench.py [--runs 10] [--source example.my]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Выполняется в дочернем процессе: время считается с самого первого импорта
+CHILD = r"""
+import io, json, sys, time
+from contextlib import redirect_stdout
+started = time.perf_counter()
+from antlr4 import InputStream
+from src.main import CompileOptions, build_ast, lex, load_frontend_snapshot, parse
+options = CompileOptions(lexer=sys.argv[2], parser=sys.argv[3], atn_snapshot=sys.argv[4] or None)
+load_frontend_snapshot(options)
+imported = time.perf_counter()
+with open(sys.argv[1], encoding="utf-8") as f:
+    code = f.read()
+with redirect_stdout(io.StringIO()):
+    build_ast(parse(lex(InputStream(code), options), options), options)
+done = time.perf_counter()
+print(json.dumps({"import_ms": (imported - started) * 1000,
+                  "first_ast_ms": (done - imported) * 1000,
+                  "total_ms": (done - started) * 1000}))
+"""
+
+
+def measure(source, lexer, parser, snapshot, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", CHILD, source, lexer, parser, snapshot or ""],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        samples.append(json.loads(out.splitlines()[-1]))
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--runs", type=int, default=10)
+    arg_parser.add_argument("--source", default=os.path.join(ROOT, "example.my"))
+    args = arg_parser.parse_args()
+    source = os.path.abspath(args.source)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, "atn.pkl")
+        subprocess.run([sys.executable, "-m", "src.parser.atn_snapshot", "-o", snapshot, source],
+                       cwd=ROOT, check=True, capture_output=True)
+        configs = [
+            ("antlr, без снимка", "antlr", "antlr", None),
+            ("antlr, со снимком", "antlr", "antlr", snapshot),
+            ("fast + rd", "fast", "rd", None),
+        ]
+        print(f"{'Конфигурация':<22} {'Импорт, мс':>11} {'Первое AST, мс':>15} {'Всего, мс':>10}")
+        for title, lexer, parser, snap in configs:
+            r = measure(source, lexer, parser, snap, args.runs)
+            print(f"{title:<22} {r['import_ms']:>11.1f} {r['first_ast_ms']:>15.1f} {r['total_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from src.parser.MyLangParser import MyLangParser
 from src.AST.ASTBuilder import ASTBuilder
 from src.semantic.semantic_analyzer import SemanticAnalyzer
 from src.IR.ir_generator import IRGenerator
+from src.IR.text import format_ir
 from src.optimizer.ir_optimizer import IROptimizer
 from src.Nasm.nasm_generator import NASMGenerator
 
@@ -33,16 +34,12 @@ def debug_compile(source_file: str):
     # 4. IR до оптимизации
     ir = IRGenerator().generate(ast)
     print("=== 🧾 IR до оптимизации ===")
-    for instr in ir:
-        print(instr)
-    print()
+    print(format_ir(ir))
 
     # 5. IR после оптимизации
     optimized_ir = IROptimizer().optimize(ir)
     print("=== 🧾 IR после оптимизации ===")
-    for instr in optimized_ir:
-        print(instr)
-    print()
+    print(format_ir(optimized_ir))
 
     # 6. NASM
     print("=== ⚙️ NASM-код ===")
@@ -1,9 +1,18 @@
 from src.parser.MyLangParser import MyLangParser
 from src.AST.MyLangVisitor import MyLangVisitor
 from src.AST.Karkas import *
+from src.AST.traversal import iterate
+from src.dispatch import DispatchTable
 
 
 class ASTBuilder(MyLangVisitor):
+    @staticmethod
+    def _at(node, ctx):
+        # Позиция узла — первый токен правила
+        node.line = ctx.start.line
+        node.column = ctx.start.column
+        return node
+
     def visitProgram(self, ctx: MyLangParser.ProgramContext):
         statements = []
         for stmt_ctx in ctx.statement():
@@ -14,43 +23,43 @@ class ASTBuilder(MyLangVisitor):
                 statements.extend(stmt)
             else:
                 statements.append(stmt)
-        return Program(statements=statements)
+        return self._at(Program(statements=statements), ctx)
 
     def visitVarDeclaration(self, ctx: MyLangParser.VarDeclarationContext):
         name = ctx.ID().getText()
         type_ = ctx.type_().getText()
         value = self.visit(ctx.expression())
-        return VarDeclaration(name, type_, value)
+        return self._at(VarDeclaration(name, type_, value), ctx)
 
     def visitAssignment(self, ctx: MyLangParser.AssignmentContext):
         name = ctx.ID().getText()
         value = self.visit(ctx.expression())
-        return Assignment(name, value)
+        return self._at(Assignment(name, value), ctx)
 
     def visitPrintStatement(self, ctx: MyLangParser.PrintStatementContext):
         expr = self.visit(ctx.expression())
-        return PrintStatement(expr)
+        return self._at(PrintStatement(expr), ctx)
 
     def visitReturnStatement(self, ctx: MyLangParser.ReturnStatementContext):
-        return ReturnStatement(self.visit(ctx.expression()) if ctx.expression() else None)
+        return self._at(ReturnStatement(self.visit(ctx.expression()) if ctx.expression() else None), ctx)
 
     def visitIfStatement(self, ctx: MyLangParser.IfStatementContext):
         cond = self.visit(ctx.expression())
         then_block = self.visit(ctx.block(0))
         else_block = self.visit(ctx.block(1)) if ctx.ELSE() else None
-        return IfStatement(cond, then_block, else_block)
+        return self._at(IfStatement(cond, then_block, else_block), ctx)
 
     def visitWhileStatement(self, ctx: MyLangParser.WhileStatementContext):
         cond = self.visit(ctx.expression())
         body = self.visit(ctx.block())
-        return WhileStatement(cond, body)
+        return self._at(WhileStatement(cond, body), ctx)
 
     def visitForStatement(self, ctx: MyLangParser.ForStatementContext):
         init = self.visit(ctx.forInit()) if ctx.forInit() else None
         cond = self.visit(ctx.forCondition()) if ctx.forCondition() else None
         update = self.visit(ctx.forUpdate()) if ctx.forUpdate() else None
         body = self.visit(ctx.block())
-        return ForStatement(init, cond, update, body)
+        return self._at(ForStatement(init, cond, update, body), ctx)
 
     def visitForInit(self, ctx: MyLangParser.ForInitContext):
         return self.visit(ctx.getChild(0))
@@ -65,12 +74,12 @@ class ASTBuilder(MyLangVisitor):
         name = ctx.ID().getText()
         type_ = ctx.type_().getText()
         value = self.visit(ctx.expression())
-        return VarDeclaration(name, type_, value)
+        return self._at(VarDeclaration(name, type_, value), ctx)
 
     def visitAssignmentWithoutSemi(self, ctx: MyLangParser.AssignmentWithoutSemiContext):
         name = ctx.ID().getText()
         value = self.visit(ctx.expression())
-        return Assignment(name, value)
+        return self._at(Assignment(name, value), ctx)
 
     def visitBlock(self, ctx: MyLangParser.BlockContext):
         statements = []
@@ -82,7 +91,7 @@ class ASTBuilder(MyLangVisitor):
                 statements.extend(result)
             else:
                 statements.append(result)
-        return Block(statements)
+        return self._at(Block(statements), ctx)
 
     def visitTryCatchStatement(self, ctx: MyLangParser.TryCatchStatementContext):
         try_block = self.visit(ctx.block(0))
@@ -91,13 +100,13 @@ class ASTBuilder(MyLangVisitor):
             try_block = Block(try_block)
         if isinstance(catch_block, list):
             catch_block = Block(catch_block)
-        return TryCatchStatement(try_block, ctx.ID().getText(), catch_block)
+        return self._at(TryCatchStatement(try_block, ctx.ID().getText(), catch_block), ctx)
 
     def visitMatchStatement(self, ctx: MyLangParser.MatchStatementContext):
         expr = self.visit(ctx.expression())
         cases = [self.visit(case) for case in ctx.matchCase()]
         default = self.visit(ctx.defaultCase()) if ctx.defaultCase() else None
-        return MatchStatement(expr, cases, default)
+        return self._at(MatchStatement(expr, cases, default), ctx)
 
     def visitMatchCase(self, ctx: MyLangParser.MatchCaseContext):
         value = self.visit(ctx.expression())
@@ -110,7 +119,7 @@ class ASTBuilder(MyLangVisitor):
                 statements.extend(res)
             else:
                 statements.append(res)
-        return MatchCase(value, statements)
+        return self._at(MatchCase(value, statements), ctx)
 
     def visitDefaultCase(self, ctx: MyLangParser.DefaultCaseContext):
         statements = []
@@ -122,7 +131,7 @@ class ASTBuilder(MyLangVisitor):
                 statements.extend(res)
             else:
                 statements.append(res)
-        return DefaultCase(statements)
+        return self._at(DefaultCase(statements), ctx)
 
     def visitFunctionDeclaration(self, ctx: MyLangParser.FunctionDeclarationContext):
         name = ctx.ID().getText()
@@ -134,82 +143,79 @@ class ASTBuilder(MyLangVisitor):
         body = self.visit(ctx.block())
         if isinstance(body, list):
             body = Block(body)
-        return FunctionDeclaration(name, params, return_type, body)
+        return self._at(FunctionDeclaration(name, params, return_type, body), ctx)
+
+    # Выражения обходятся итеративно: длинные цепочки `a + b + c + ...` дают
+    # дерево разбора глубиной в число операндов, и рекурсивный visit упирается
+    # в лимит рекурсии. Каждый шаг — генератор, который yield-ит дочерние
+    # контексты и получает их узлы обратно (см. src/AST/traversal.py).
+
+    def _expression(self, ctx):
+        return iterate(self._expression_step, ctx)
+
+    visitExprFunctionCall = visitExprNot = visitExprMulDiv = visitExprAddSub = _expression
+    visitExprComparison = visitExprLogicalAnd = visitExprLogicalOr = _expression
+    visitExprIdentifier = visitExprPrimary = visitPrimary = _expression
+
+    expression_steps = DispatchTable()
 
-    def visitExprFunctionCall(self, ctx: MyLangParser.ExprFunctionCallContext):
+    def _expression_step(self, ctx):
+        return self.expression_steps[type(ctx)](self, ctx)
+
+    @expression_steps.on(MyLangParser.ExprFunctionCallContext)
+    def _function_call_step(self, ctx: MyLangParser.ExprFunctionCallContext):
         name = ctx.ID().getText()
-        args = [self.visit(e) for e in ctx.argList().expression()] if ctx.argList() else []
-        return FunctionCall(name, args)
-
-    def visitExprNot(self, ctx: MyLangParser.ExprNotContext):
-        operand = self.visit(ctx.expression())
-        if isinstance(operand, list):
-            operand = operand[0]
-        return UnaryOp("!", operand)
-
-    def visitExprMulDiv(self, ctx: MyLangParser.ExprMulDivContext):
-        left = self.visit(ctx.expression(0))
-        right = self.visit(ctx.expression(1))
-        if isinstance(left, list):
-            left = left[0]
-        if isinstance(right, list):
-            right = right[0]
-        return BinaryOp(left, ctx.getChild(1).getText(), right)
-
-    def visitExprAddSub(self, ctx: MyLangParser.ExprAddSubContext):
-        left = self.visit(ctx.expression(0))
-        right = self.visit(ctx.expression(1))
-        if isinstance(left, list):
-            left = left[0]
-        if isinstance(right, list):
-            right = right[0]
-        return BinaryOp(left, ctx.getChild(1).getText(), right)
-
-    def visitExprComparison(self, ctx: MyLangParser.ExprComparisonContext):
-        left = self.visit(ctx.expression(0))
-        right = self.visit(ctx.expression(1))
-        if isinstance(left, list):
-            left = left[0]
-        if isinstance(right, list):
-            right = right[0]
-        return BinaryOp(left, ctx.getChild(1).getText(), right)
-
-    def visitExprLogicalAnd(self, ctx: MyLangParser.ExprLogicalAndContext):
-        left = self.visit(ctx.expression(0))
-        right = self.visit(ctx.expression(1))
-        return BinaryOp(left, '&&', right)
-
-    def visitExprLogicalOr(self, ctx: MyLangParser.ExprLogicalOrContext):
-        left = self.visit(ctx.expression(0))
-        right = self.visit(ctx.expression(1))
-        return BinaryOp(left, '||', right)
-
-    def visitExprIdentifier(self, ctx: MyLangParser.ExprIdentifierContext):
+        args = []
+        if ctx.argList():
+            for e in ctx.argList().expression():
+                args.append((yield e))
+        return self._at(FunctionCall(name, args), ctx)
+
+    @expression_steps.on(MyLangParser.ExprNotContext)
+    def _not_step(self, ctx: MyLangParser.ExprNotContext):
+        operand = yield ctx.expression()
+        return self._at(UnaryOp("!", operand), ctx)
+
+    @expression_steps.on(MyLangParser.ExprMulDivContext, MyLangParser.ExprAddSubContext,
+                         MyLangParser.ExprComparisonContext, MyLangParser.ExprLogicalAndContext,
+                         MyLangParser.ExprLogicalOrContext)
+    def _binary_step(self, ctx):
+        left = yield ctx.expression(0)
+        right = yield ctx.expression(1)
+        # Для && и || текст оператора тот же, что и у токена
+        return self._at(BinaryOp(left, ctx.getChild(1).getText(), right), ctx)
+
+    @expression_steps.on(MyLangParser.ExprIdentifierContext)
+    def _identifier_step(self, ctx: MyLangParser.ExprIdentifierContext):
         name = ctx.ID().getText()
         if name == "true":
-            return Literal(True)
+            return self._at(Literal(True), ctx)
         if name == "false":
-            return Literal(False)
-        return Identifier(name)
-
-    def visitExprPrimary(self, ctx: MyLangParser.ExprPrimaryContext):
-        return self.visit(ctx.primary())
+            return self._at(Literal(False), ctx)
+        return self._at(Identifier(name), ctx)
 
-    def visitPrimary(self, ctx: MyLangParser.PrimaryContext):
+    @expression_steps.on(MyLangParser.ExprPrimaryContext, MyLangParser.PrimaryContext)
+    def _primary_step(self, ctx):
+        if isinstance(ctx, MyLangParser.ExprPrimaryContext):
+            ctx = ctx.primary()
         if ctx.literal():
-            return self.visit(ctx.literal())
-        return self.visit(ctx.expression())
+            return self.visitLiteral(ctx.literal())
+        return self._parenthesized_step(ctx.expression())
+
+    def _parenthesized_step(self, expression):
+        # Скобки узла не порождают: результат — само вложенное выражение
+        return (yield expression)
 
     def visitLiteral(self, ctx: MyLangParser.LiteralContext):
         text = ctx.getText()
         if ctx.INT_LITERAL():
-            return Literal(int(text))
+            return self._at(Literal(int(text)), ctx)
         if ctx.FLOAT_LITERAL():
-            return Literal(float(text))
+            return self._at(Literal(float(text)), ctx)
         if ctx.STRING_LITERAL():
-            return Literal(text.strip('"'))
+            return self._at(Literal(text.strip('"')), ctx)
         if ctx.BOOL_LITERAL():
-            return Literal(text == "true")
+            return self._at(Literal(text == "true"), ctx)
 
     def visitChildren(self, node):
         results = []
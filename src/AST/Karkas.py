@@ -4,12 +4,41 @@ from typing import List, Optional, Union
 
 
 class ASTNode:
-
-    pass
+    """Базовый узел AST.
+
+    Узлы объявлены через __slots__: без __dict__ каждый узел занимает в разы
+    меньше памяти. Общие для всех узлов поля:
+      type_        — тип узла (для VarDeclaration — объявленный тип,
+                     для выражений и присваиваний его проставляет
+                     семантический анализ);
+      line, column — позиция первого токена узла в исходнике.
+    Узлы, ссылающиеся на имя (объявления, присваивания, идентификаторы,
+    вызовы), дополнительно хранят symbol — запись таблицы символов, к которой
+    имя разрешил семантический анализ.
+    """
+    __slots__ = ("type_", "line", "column")
+
+    # Имена всех полей узла, включая общие, — замена vars() для узлов без __dict__
+    _fields = __slots__
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = []
+        for klass in reversed(cls.__mro__):
+            fields.extend(klass.__dict__.get("__slots__", ()))
+        cls._fields = tuple(fields)
+
+    def __init__(self, type_=None, line: Optional[int] = None, column: Optional[int] = None):
+        self.type_ = type_
+        self.line = line
+        self.column = column
 
 
 class Program(ASTNode):
+    __slots__ = ("statements",)
+
     def __init__(self, statements: List[ASTNode]):
+        super().__init__()
         self.statements = statements
 
     def __repr__(self):
@@ -17,37 +46,49 @@ class Program(ASTNode):
 
 
 class VarDeclaration(ASTNode):
+    __slots__ = ("name", "value", "symbol")
+
     def __init__(self, name: str, type_: str, value: Optional[ASTNode]):
+        super().__init__(type_)
         self.name = name
-        self.type_ = type_
         self.value = value
+        self.symbol = None
 
     def __repr__(self):
         return f"VarDeclaration(name={self.name}, type_={self.type_}, value={self.value})"
 
 
 class Assignment(ASTNode):
+    __slots__ = ("name", "value", "symbol")
+
     def __init__(self, name: str, value: ASTNode):
+        super().__init__()
         self.name = name
         self.value = value
+        self.symbol = None
 
     def __repr__(self):
         return f"Assignment(name={self.name}, value={self.value})"
 
 
 class BinaryOp(ASTNode):
+    __slots__ = ("left", "op", "right")
+
     def __init__(self, left: ASTNode, op: str, right: ASTNode, type_=None):
+        super().__init__(type_)
         self.left = left
         self.op = op
         self.right = right
-        self.type_ = type_
 
     def __repr__(self):
         return f"BinaryOp({self.left} {self.op} {self.right})"
 
 
 class Literal(ASTNode):
+    __slots__ = ("value",)
+
     def __init__(self, value: Union[int, float, str, bool]):
+        super().__init__()
         self.value = value
 
     def __repr__(self):
@@ -55,15 +96,22 @@ class Literal(ASTNode):
 
 
 class Identifier(ASTNode):
+    __slots__ = ("name", "symbol")
+
     def __init__(self, name: str):
+        super().__init__()
         self.name = name
+        self.symbol = None
 
     def __repr__(self):
         return f"Identifier(name={self.name})"
 
 
 class PrintStatement(ASTNode):
+    __slots__ = ("expression",)
+
     def __init__(self, expression: ASTNode):
+        super().__init__()
         self.expression = expression
 
     def __repr__(self):
@@ -71,7 +119,10 @@ class PrintStatement(ASTNode):
 
 
 class Block(ASTNode):
+    __slots__ = ("statements",)
+
     def __init__(self, statements: List[ASTNode]):
+        super().__init__()
         self.statements = statements
 
     def __repr__(self):
@@ -79,7 +130,10 @@ class Block(ASTNode):
 
 
 class IfStatement(ASTNode):
+    __slots__ = ("condition", "then_block", "else_block")
+
     def __init__(self, condition: ASTNode, then_block: Block, else_block: Optional[Block] = None):
+        super().__init__()
         self.condition = condition
         self.then_block = then_block
         self.else_block = else_block
@@ -89,7 +143,10 @@ class IfStatement(ASTNode):
 
 
 class WhileStatement(ASTNode):
+    __slots__ = ("condition", "body")
+
     def __init__(self, condition: ASTNode, body: Block):
+        super().__init__()
         self.condition = condition
         self.body = body
 
@@ -98,8 +155,11 @@ class WhileStatement(ASTNode):
 
 
 class ForStatement(ASTNode):
+    __slots__ = ("init", "condition", "update", "body")
+
     def __init__(self, init: Optional[ASTNode], condition: Optional[ASTNode],
                  update: Optional[ASTNode], body: Block):
+        super().__init__()
         self.init = init
         self.condition = condition
         self.update = update
@@ -110,27 +170,38 @@ class ForStatement(ASTNode):
 
 
 class FunctionDeclaration(ASTNode):
+    __slots__ = ("name", "params", "return_type", "body", "symbol")
+
     def __init__(self, name: str, params: List[tuple], return_type: str, body: Block):
+        super().__init__()
         self.name = name
         self.params = params  # список кортежей (имя, тип)
         self.return_type = return_type
         self.body = body
+        self.symbol = None
 
     def __repr__(self):
         return f"FunctionDeclaration(name={self.name}, params={self.params}, return_type={self.return_type}, body={self.body})"
 
 
 class FunctionCall(ASTNode):
+    __slots__ = ("name", "arguments", "symbol")
+
     def __init__(self, name: str, arguments: List[ASTNode]):
+        super().__init__()
         self.name = name
         self.arguments = arguments
+        self.symbol = None
 
     def __repr__(self):
         return f"FunctionCall(name={self.name}, args={self.arguments})"
 
 
 class TryCatchStatement(ASTNode):
+    __slots__ = ("try_block", "exception_name", "catch_block")
+
     def __init__(self, try_block: Block, exception_name: str, catch_block: Block):
+        super().__init__()
         self.try_block = try_block
         self.exception_name = exception_name
         self.catch_block = catch_block
@@ -140,7 +211,10 @@ class TryCatchStatement(ASTNode):
 
 
 class MatchStatement(ASTNode):
+    __slots__ = ("expr", "cases", "default")
+
     def __init__(self, expr: ASTNode, cases: List["MatchCase"], default: Optional[Block]):
+        super().__init__()
         self.expr = expr
         self.cases = cases
         self.default = default
@@ -150,7 +224,10 @@ class MatchStatement(ASTNode):
 
 
 class MatchCase(ASTNode):
+    __slots__ = ("value", "body")
+
     def __init__(self, value: ASTNode, body: List[ASTNode]):
+        super().__init__()
         self.value = value
         self.body = body
 
@@ -159,19 +236,28 @@ class MatchCase(ASTNode):
 
 
 class ReturnStatement(ASTNode):
+    __slots__ = ("value",)
+
     def __init__(self, value: Optional[ASTNode]):
+        super().__init__()
         self.value = value
 
     def __repr__(self):
         return f"Return(value={self.value})"
 class UnaryOp(ASTNode):
     """ Унарная операция, например -x или !x """
+    __slots__ = ("op", "operand")
+
     def __init__(self, op: str, operand: ASTNode):
+        super().__init__()
         self.op = op
         self.operand = operand
 
 class DefaultCase(ASTNode):
+    __slots__ = ("body",)
+
     def __init__(self, body: List[ASTNode]):
+        super().__init__()
         self.body = body
 
     def __repr__(self):
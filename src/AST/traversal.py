@@ -0,0 +1,32 @@
+from types import GeneratorType
+
+
+def iterate(step, root):
+    """Рекурсивный по смыслу обход дерева без рекурсии Python.
+
+    step(node) возвращает либо готовый результат узла (для листьев), либо
+    генератор: он yield-ит дочерние узлы по одному, получает их результаты
+    обратно через send() и возвращает результат узла через return.
+    Незавершённые генераторы лежат в явном стеке, поэтому глубина дерева
+    ограничена только памятью, а не sys.getrecursionlimit().
+    """
+    result = step(root)
+    if not isinstance(result, GeneratorType):
+        return result
+
+    stack = [result]
+    value = None
+    while stack:
+        try:
+            child = stack[-1].send(value)
+        except StopIteration as stop:
+            stack.pop()
+            value = stop.value
+            continue
+        result = step(child)
+        if isinstance(result, GeneratorType):
+            stack.append(result)
+            value = None
+        else:
+            value = result
+    return value
@@ -0,0 +1,349 @@
+import copy
+
+from src.IR.instructions import *
+from src.IR.module import FunctionUnit, IRModule
+
+
+class BasicBlock:
+    """Базовый блок: линейный участок IR с одним входом и одним выходом.
+
+    Метка блока (если есть) — его первая инструкция. succs — преемники в
+    порядке [цель перехода, следующий блок]; fallthrough — преемник, в
+    который управление попадает без перехода (следующий блок раскладки).
+    """
+    __slots__ = ("index", "instructions", "preds", "succs", "fallthrough",
+                 "idom", "dom_children", "loop")
+
+    def __init__(self, index: int, instructions=None):
+        self.index = index
+        self.instructions = instructions if instructions is not None else []
+        self.preds = []
+        self.succs = []
+        self.fallthrough = None
+        self.idom = None          # непосредственный доминатор; у входа и недостижимых — None
+        self.dom_children = []
+        self.loop = None          # самый внутренний цикл, содержащий блок
+
+    @property
+    def label(self):
+        if self.instructions and isinstance(self.instructions[0], IRLabel):
+            return self.instructions[0].label
+        return None
+
+    @property
+    def terminator(self):
+        last = self.instructions[-1] if self.instructions else None
+        if isinstance(last, (IRGoto, IRIfGoto, IRReturn)):
+            return last
+        return None
+
+    @property
+    def loop_depth(self) -> int:
+        return self.loop.depth if self.loop else 0
+
+    def __repr__(self):
+        return f"BasicBlock(B{self.index}, label={self.label}, succs={[b.index for b in self.succs]})"
+
+
+class Loop:
+    """Естественный цикл: заголовок и все блоки, из которых достижим обратный переход."""
+    __slots__ = ("header", "blocks", "parent", "children", "depth")
+
+    def __init__(self, header: BasicBlock):
+        self.header = header
+        self.blocks = {header}
+        self.parent = None
+        self.children = []
+        self.depth = 1
+
+    def __repr__(self):
+        return f"Loop(header=B{self.header.index}, blocks={sorted(b.index for b in self.blocks)}, depth={self.depth})"
+
+
+class ControlFlowGraph:
+    """Граф потока управления одной функции (или main).
+
+    Строится из тела единицы IRModule (плоского списка без IRFunctionStart/End).
+    Блоки лежат в порядке исходной раскладки; linearize() возвращает их
+    обратно в список, добавляя переходы там, где раскладка разошлась с
+    рёбрами fallthrough.
+    """
+
+    def __init__(self, name: str, instructions, params=None, position: int = 0):
+        self.name = name
+        self.params = params      # у main — None
+        self.position = position  # см. FunctionUnit.position
+        self.blocks = []
+        self.loops = []
+        self._split(instructions)
+        self._connect()
+        self.compute_dominators()
+        self.compute_loops()
+
+    @classmethod
+    def from_unit(cls, unit: FunctionUnit) -> "ControlFlowGraph":
+        return cls(unit.name, unit.body, None if unit.is_main else unit.params, unit.position)
+
+    def to_unit(self) -> FunctionUnit:
+        return FunctionUnit(self.name, self.params, self.linearize(), self.position)
+
+    @property
+    def entry(self) -> BasicBlock:
+        return self.blocks[0]
+
+    # --- построение ---
+
+    def _split(self, instructions):
+        block = None
+        for instr in instructions:
+            if block is None or isinstance(instr, IRLabel):
+                block = BasicBlock(len(self.blocks))
+                self.blocks.append(block)
+            block.instructions.append(instr)
+            if isinstance(instr, (IRGoto, IRIfGoto, IRReturn)):
+                block = None
+        if not self.blocks:
+            self.blocks.append(BasicBlock(0))
+
+    def _connect(self):
+        by_label = {b.label: b for b in self.blocks if b.label is not None}
+        for i, block in enumerate(self.blocks):
+            following = self.blocks[i + 1] if i + 1 < len(self.blocks) else None
+            last = block.terminator
+            if isinstance(last, (IRGoto, IRIfGoto)):
+                target = by_label.get(last.label)
+                if target is None:
+                    raise Exception(f"Ошибка: переход на неизвестную метку '{last.label}' в {self.name}")
+                self._add_edge(block, target)
+            if not isinstance(last, (IRGoto, IRReturn)) and following is not None:
+                block.fallthrough = following
+                self._add_edge(block, following)
+
+    @staticmethod
+    def _add_edge(source: BasicBlock, target: BasicBlock):
+        if target not in source.succs:
+            source.succs.append(target)
+            target.preds.append(source)
+
+    # --- доминаторы ---
+
+    def reverse_postorder(self):
+        order, visited = [], set()
+        stack = [(self.entry, iter(self.entry.succs))]
+        visited.add(self.entry)
+        while stack:
+            block, succs = stack[-1]
+            for succ in succs:
+                if succ not in visited:
+                    visited.add(succ)
+                    stack.append((succ, iter(succ.succs)))
+                    break
+            else:
+                stack.pop()
+                order.append(block)
+        order.reverse()
+        return order
+
+    def compute_dominators(self):
+        """Доминаторы по Cooper–Harvey–Kennedy: итерации над обратным постпорядком."""
+        order = self.reverse_postorder()
+        number = {block: i for i, block in enumerate(order)}
+        for block in self.blocks:
+            block.idom = None
+            block.dom_children = []
+        entry = self.entry
+        idom = {entry: entry}
+
+        def intersect(a, b):
+            while a is not b:
+                while number[a] > number[b]:
+                    a = idom[a]
+                while number[b] > number[a]:
+                    b = idom[b]
+            return a
+
+        changed = True
+        while changed:
+            changed = False
+            for block in order[1:]:
+                new_idom = None
+                for pred in block.preds:
+                    if pred in idom:
+                        new_idom = pred if new_idom is None else intersect(pred, new_idom)
+                if idom.get(block) is not new_idom:
+                    idom[block] = new_idom
+                    changed = True
+
+        for block in order[1:]:
+            block.idom = idom[block]
+            block.idom.dom_children.append(block)
+
+    def reachable(self, block: BasicBlock) -> bool:
+        return block is self.entry or block.idom is not None
+
+    def dominates(self, a: BasicBlock, b: BasicBlock) -> bool:
+        if not self.reachable(b):
+            return False
+        while b is not None:
+            if b is a:
+                return True
+            b = b.idom
+        return False
+
+    def dominance_frontiers(self) -> dict:
+        """Граница доминирования каждого достижимого блока (Cooper–Harvey–Kennedy)."""
+        frontiers = {block: set() for block in self.blocks if self.reachable(block)}
+        for block in frontiers:
+            preds = [p for p in block.preds if self.reachable(p)]
+            if len(preds) < 2:
+                continue
+            for runner in preds:
+                while runner is not block.idom:
+                    frontiers[runner].add(block)
+                    runner = runner.idom
+        return frontiers
+
+    # --- циклы ---
+
+    def compute_loops(self):
+        """Естественные циклы по обратным рёбрам и их вложенность."""
+        by_header = {}
+        for block in self.blocks:
+            for succ in block.succs:
+                if self.dominates(succ, block):
+                    loop = by_header.get(succ)
+                    if loop is None:
+                        loop = by_header[succ] = Loop(succ)
+                    self._collect_loop_body(loop, block)
+
+        self.loops = sorted(by_header.values(), key=lambda l: len(l.blocks))
+        for block in self.blocks:
+            block.loop = None
+        for i, loop in enumerate(self.loops):
+            # Родитель — наименьший цикл, строго содержащий этот
+            for outer in self.loops[i + 1:]:
+                if loop.header in outer.blocks and outer is not loop:
+                    loop.parent = outer
+                    outer.children.append(loop)
+                    break
+            for block in loop.blocks:
+                if block.loop is None:
+                    block.loop = loop
+        for loop in reversed(self.loops):
+            loop.depth = loop.parent.depth + 1 if loop.parent else 1
+
+    @staticmethod
+    def _collect_loop_body(loop: Loop, latch: BasicBlock):
+        stack = [latch]
+        while stack:
+            block = stack.pop()
+            if block not in loop.blocks:
+                loop.blocks.add(block)
+                stack.extend(block.preds)
+
+    # --- правка графа ---
+
+    def split_edge(self, source: BasicBlock, target: BasicBlock) -> BasicBlock:
+        """Вставляет пустой блок на ребро source → target и возвращает его.
+
+        Доминаторы и циклы после правок нужно пересчитать.
+        """
+        block = BasicBlock(max(b.index for b in self.blocks) + 1)
+        block.fallthrough = target
+        last = source.terminator
+        if source.fallthrough is target:
+            self.blocks.insert(self.blocks.index(source) + 1, block)
+            source.fallthrough = block
+        else:
+            # Блок перед target: кто раньше падал в target, получит явный goto
+            self.blocks.insert(self.blocks.index(target), block)
+        if isinstance(last, (IRGoto, IRIfGoto)) and last.label == target.label:
+            retargeted = copy.copy(last)
+            retargeted.label = self._ensure_label(block, self._labels())
+            source.instructions[-1] = retargeted
+        source.succs[source.succs.index(target)] = block
+        target.preds[target.preds.index(source)] = block
+        block.preds.append(source)
+        block.succs.append(target)
+        return block
+
+    def preheader(self, loop: Loop) -> BasicBlock:
+        """Блок, через который в цикл входят извне, — создаётся при необходимости.
+
+        Годится единственный внешний предшественник заголовка, у которого
+        нет других преемников; иначе перед заголовком вставляется новый
+        блок, и все входы извне переводятся на него. Доминаторы
+        пересчитываются, новый блок добавляется во внешние циклы.
+        """
+        header = loop.header
+        outside = [pred for pred in header.preds if pred not in loop.blocks]
+        if len(outside) == 1 and outside[0].succs == [header]:
+            return outside[0]
+        block = BasicBlock(max(b.index for b in self.blocks) + 1)
+        self.blocks.insert(self.blocks.index(header), block)
+        label = None
+        for pred in outside:
+            if pred.fallthrough is header:
+                pred.fallthrough = block
+            last = pred.terminator
+            if isinstance(last, (IRGoto, IRIfGoto)) and last.label == header.label:
+                label = label or self._ensure_label(block, self._labels())
+                retargeted = copy.copy(last)
+                retargeted.label = label
+                pred.instructions[-1] = retargeted
+            pred.succs[pred.succs.index(header)] = block
+            block.preds.append(pred)
+        header.preds = [block, *(pred for pred in header.preds if pred in loop.blocks)]
+        block.succs.append(header)
+        block.fallthrough = header
+        block.loop = loop.parent
+        for outer in self.loops:
+            if outer is not loop and header in outer.blocks:
+                outer.blocks.add(block)
+        self.compute_dominators()
+        return block
+
+    def _labels(self) -> set:
+        return {b.label for b in self.blocks if b.label is not None}
+
+    # --- обратно в список ---
+
+    def linearize(self) -> list:
+        """Инструкции блоков в порядке раскладки, с переходами для разорванных fallthrough."""
+        result = []
+        used_labels = self._labels()
+        for i, block in enumerate(self.blocks):
+            result.extend(block.instructions)
+            target = block.fallthrough
+            following = self.blocks[i + 1] if i + 1 < len(self.blocks) else None
+            if target is not None and target is not following:
+                result.append(IRGoto(self._ensure_label(target, used_labels)))
+        return result
+
+    def _ensure_label(self, block: BasicBlock, used_labels: set) -> str:
+        # Метки в NASM глобальные, поэтому в имени есть имя функции
+        if block.label is None:
+            label, n = f"{self.name}_bb_{block.index}", block.index
+            while label in used_labels:
+                n += 1
+                label = f"{self.name}_bb_{n}"
+            used_labels.add(label)
+            block.instructions.insert(0, IRLabel(label))
+        return block.label
+
+
+def build_cfgs(ir) -> list:
+    """Графы программы (IRModule или плоского IR): функции в порядке объявления, main последним."""
+    module = ir if isinstance(ir, IRModule) else IRModule.from_instructions(ir)
+    return [ControlFlowGraph.from_unit(unit) for unit in module.units()]
+
+
+def to_module(cfgs) -> IRModule:
+    units = [cfg.to_unit() for cfg in cfgs]
+    main = next((unit for unit in units if unit.is_main), None)
+    return IRModule([unit for unit in units if not unit.is_main], main)
+
+
+def linearize(cfgs) -> list:
+    """Обратно в плоский список: функции в IRFunctionStart/End на прежних местах среди main."""
+    return to_module(cfgs).instructions()
@@ -0,0 +1,185 @@
+import re
+from array import array
+
+from src.IR.instructions import *
+
+# Коды операций: индекс класса в этом кортеже
+OPCODES = (IRAssign, IRPrint, IRReturn, IRLabel, IRGoto, IRIfGoto, IRCall,
+           IRFunctionStart, IRFunctionEnd, IRBinary, IRUnary)
+OPCODE = {cls: code for code, cls in enumerate(OPCODES)}
+SLOTS = max(len(cls.fields) for cls in OPCODES)
+
+# Временные и метки почти все уникальны, поэтому в таблицу не попадают:
+# ячейка хранит их отрицательным числом — номер и тег (тип временной или
+# «метка»); у метки в номер упакован ещё индекс префикса
+TEMP_TYPES = (None, "int", "float", "bool", "string")
+LABEL_TAG = len(TEMP_TYPES)
+TAGS = LABEL_TAG + 1
+MAX_PREFIXES = 256
+MAX_INLINE = 2 ** 31 - 1
+_TEMP = re.compile(r"t(0|[1-9][0-9]*)")
+_LABEL = re.compile(r"(.+)_(0|[1-9][0-9]*)")
+
+
+class CompactIR:
+    """Плоский IR в виде структуры массивов.
+
+    opcodes — код класса инструкции (байт на инструкцию), slots[k] — k-е
+    поле инструкции (в порядке cls.fields): индекс в таблице values, где
+    каждый операнд и строка хранятся один раз, или, для временных и меток,
+    само значение в закодированном виде. Списки (аргументы вызова,
+    параметры) хранятся в таблице кортежем кодов.
+
+    Индексация и итерация дают представления: объекты классов-наследников
+    IRAssign, IRBinary и т. д., которые читают и пишут поля прямо в массивы,
+    поэтому существующие проходы и NASMGenerator работают с ними без
+    изменений. Списки, полученные из представления, — копии: чтобы изменить
+    аргументы, полю присваивается новый список.
+    """
+
+    def __init__(self):
+        self.opcodes = array("B")
+        self.slots = [array("i") for _ in range(SLOTS)]
+        self.values = [None]
+        self.prefixes = []
+        self._index = {_intern_key(None): 0}
+        self._prefix_index = {}
+
+    @classmethod
+    def from_instructions(cls, instructions) -> "CompactIR":
+        ir = cls()
+        ir.extend(instructions)
+        return ir
+
+    def intern(self, value) -> int:
+        """Код значения для ячейки slots."""
+        if isinstance(value, Temp):
+            match = _TEMP.fullmatch(value.name)
+            if match and value.type_ in TEMP_TYPES:
+                code = int(match.group(1)) * TAGS + TEMP_TYPES.index(value.type_)
+                if code < MAX_INLINE:
+                    return -code - 1
+        elif isinstance(value, str):
+            match = _LABEL.fullmatch(value)
+            if match:
+                prefix = self._prefix_index.get(match.group(1))
+                if prefix is None and len(self.prefixes) < MAX_PREFIXES:
+                    prefix = self._prefix_index[match.group(1)] = len(self.prefixes)
+                    self.prefixes.append(match.group(1))
+                if prefix is not None:
+                    code = (int(match.group(2)) * MAX_PREFIXES + prefix) * TAGS + LABEL_TAG
+                    if code < MAX_INLINE:
+                        return -code - 1
+        elif isinstance(value, list):
+            value = ("list", tuple(self.intern(item) for item in value))
+        key = _intern_key(value)
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def value(self, code: int):
+        """Значение по коду из ячейки slots."""
+        if code < 0:
+            number, tag = divmod(-code - 1, TAGS)
+            if tag == LABEL_TAG:
+                number, prefix = divmod(number, MAX_PREFIXES)
+                return f"{self.prefixes[prefix]}_{number}"
+            return Temp(f"t{number}", TEMP_TYPES[tag])
+        value = self.values[code]
+        if isinstance(value, tuple):
+            return [self.value(item) for item in value[1]]
+        return value
+
+    def append(self, instr):
+        cls = type(instr)
+        code = OPCODE.get(cls)
+        if code is None:
+            raise TypeError(f"{cls.__name__} не хранится в CompactIR")
+        self.opcodes.append(code)
+        fields = cls.fields
+        for k, column in enumerate(self.slots):
+            column.append(self.intern(getattr(instr, fields[k])) if k < len(fields) else 0)
+
+    def extend(self, instructions):
+        for instr in instructions:
+            self.append(instr)
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return VIEWS[self.opcodes[i]](self, i)
+
+    def __iter__(self):
+        views, opcodes = VIEWS, self.opcodes
+        for i in range(len(opcodes)):
+            yield views[opcodes[i]](self, i)
+
+    def instruction(self, i):
+        """Обычный объект IR для i-й инструкции."""
+        cls = OPCODES[self.opcodes[i]]
+        return cls(*(self.value(self.slots[k][i]) for k in range(len(cls.fields))))
+
+    def to_instructions(self) -> list:
+        return [self.instruction(i) for i in range(len(self))]
+
+    # --- сканирование без создания объектов ---
+
+    def count(self, cls) -> int:
+        return self.opcodes.count(OPCODE[cls])
+
+    def names(self) -> set:
+        """Имена всех переменных и временных, упомянутых в IR."""
+        codes = set()
+        for column in self.slots:
+            codes.update(column)
+        for code in list(codes):
+            if code >= 0 and isinstance(self.values[code], tuple):
+                codes.update(self.values[code][1])
+        names = set()
+        for code in codes:
+            if code < 0:
+                number, tag = divmod(-code - 1, TAGS)
+                if tag != LABEL_TAG:
+                    names.add(f"t{number}")
+            elif isinstance(self.values[code], Name):
+                names.add(self.values[code].name)
+        return names
+
+
+def _intern_key(value):
+    # Var("x", "int") и Var("x", "float") равны как операнды, но хранить их надо раздельно
+    if isinstance(value, Name):
+        return type(value), value.name, value.type_
+    if isinstance(value, tuple):
+        return value
+    return type(value), value
+
+
+def _view_class(cls):
+    def field(k):
+        def get(self):
+            return self._ir.value(self._ir.slots[k][self._i])
+
+        def set_(self, value):
+            self._ir.slots[k][self._i] = self._ir.intern(value)
+        return property(get, set_)
+
+    def __init__(self, ir, i):
+        self._ir = ir
+        self._i = i
+
+    namespace = {name: field(k) for k, name in enumerate(cls.fields)}
+    namespace.update(__slots__=("_ir", "_i"), __init__=__init__)
+    return type(f"{cls.__name__}View", (cls,), namespace)
+
+
+VIEWS = tuple(_view_class(cls) for cls in OPCODES)
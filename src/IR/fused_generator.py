@@ -0,0 +1,283 @@
+from src.IR.instructions import *
+from src.IR.ir_generator import IRGenerator
+from src.semantic.checks import *
+from src.semantic.semantic_analyzer import SemanticAnalyzer
+from src.semantic.symbol_table import SymbolTable
+from src.semantic.type_checker import check_binary_op
+from src.AST.Karkas import *
+from src.AST.traversal import iterate
+from src.dispatch import DispatchTable
+
+
+class FusedIRGenerator(IRGenerator):
+    """Семантический анализ и генерация IR за один обход AST.
+
+    Каждый узел проверяется по тем же правилам, что и в SemanticAnalyzer
+    (и аннотируется type_/symbol так же), и тут же переводится в IR. Результат
+    совпадает с IRGenerator().generate() после SemanticAnalyzer().analyze().
+
+    Порядок обхода задаёт IR, а он местами расходится с порядком проверок
+    SemanticAnalyzer (case-ветки match). Поэтому при ошибке программа
+    проверяется ещё раз обычным SemanticAnalyzer: наружу уходит та же
+    первая ошибка, что и в двухпроходном конвейере. Корректные программы
+    обходятся ровно один раз.
+    """
+
+    # Инструкции: свои обработчики; выражения-инструкции без вызова
+    # SemanticAnalyzer не проверяет — для них остаются обработчики IRGenerator
+    dispatch = DispatchTable(default=IRGenerator.generic_visit)
+    dispatch.update(IRGenerator.dispatch)
+
+    def __init__(self):
+        super().__init__()
+        self.scope = SymbolTable()
+        self.analyzer = SemanticAnalyzer()
+
+    def generate(self, node):
+        self.scope = SymbolTable()
+        try:
+            return super().generate(node)
+        except Exception:
+            SemanticAnalyzer().analyze(node)
+            raise
+
+    def block(self, node: Block):
+        for stmt in node.statements:
+            if stmt is not None:
+                self.visit(stmt)
+
+    def condition(self, node, statement: str):
+        value, cond_type = self.expression(node)
+        check_condition(cond_type, statement)
+        return value
+
+    @dispatch.on(Block)
+    def visit_Block(self, node):
+        with self.scope.nested():
+            self.block(node)
+
+    @dispatch.on(VarDeclaration)
+    def visit_VarDeclaration(self, node):
+        check_not_declared(self.scope, node.name)
+        value, expr_type = self.expression(node.value)
+        check_initializer(node.name, node.type_, expr_type)
+        node.symbol = self.scope.define(node.name, node.type_, node)
+        self.instructions.append(IRAssign(Var(node.name, node.type_), value, type_=node.type_))
+
+    @dispatch.on(Assignment)
+    def visit_Assignment(self, node):
+        symbol = lookup_variable(self.scope, node.name)
+        value, expr_type = self.expression(node.value)
+        check_assignment(node.name, symbol, expr_type)
+        node.symbol = symbol
+        node.type_ = symbol.type_
+        self.instructions.append(IRAssign(Var(node.name, node.type_), value, type_=node.type_))
+
+    @dispatch.on(PrintStatement)
+    def visit_PrintStatement(self, node):
+        value, expr_type = self.expression(node.expression)
+        self.instructions.append(IRPrint(value, expr_type))
+
+    @dispatch.on(ReturnStatement)
+    def visit_ReturnStatement(self, node):
+        if node.value is None:
+            self.instructions.append(IRReturn(None))
+            return
+        value, actual = self.expression(node.value)
+        check_return(self.scope, actual)
+        self.instructions.append(IRReturn(value))
+
+    @dispatch.on(IfStatement)
+    def visit_IfStatement(self, node):
+        else_label = self._unique_label("else")
+        end_label = self._unique_label("endif")
+
+        cond = self.condition(node.condition, "if")
+
+        negated = self.temp.new_temp("bool")
+        self.instructions.append(IRUnary(negated, "!", cond))
+
+        self.instructions.append(IRIfGoto(negated, else_label))
+        with self.scope.nested():
+            self.block(node.then_block)
+        self.instructions.append(IRGoto(end_label))
+        self.instructions.append(IRLabel(else_label))
+        if node.else_block:
+            with self.scope.nested():
+                self.block(node.else_block)
+        self.instructions.append(IRLabel(end_label))
+
+    @dispatch.on(WhileStatement)
+    def visit_WhileStatement(self, node):
+        start_label = self._unique_label("while_start")
+        end_label = self._unique_label("while_end")
+        self.instructions.append(IRLabel(start_label))
+        condition = self.condition(node.condition, "while")
+        self.instructions.append(IRIfGoto(condition, end_label, negated=True))
+        with self.scope.nested():
+            self.block(node.body)
+        self.instructions.append(IRGoto(start_label))
+        self.instructions.append(IRLabel(end_label))
+
+    @dispatch.on(ForStatement)
+    def visit_ForStatement(self, node):
+        with self.scope.nested():
+            self.visit(node.init)
+            start_label = self._unique_label("for_start")
+            end_label = self._unique_label("for_end")
+            self.instructions.append(IRLabel(start_label))
+            condition = self.condition(node.condition, "for")
+            # Шаг проверяется до тела, как в SemanticAnalyzer: объявления тела
+            # ему не видны. IR шага строится после тела по готовым аннотациям.
+            if node.update:
+                self.analyzer.visit_statement(node.update, self.scope)
+            self.instructions.append(IRIfGoto(condition, end_label, negated=True))
+            self.block(node.body)
+            self.lower_update(node.update)
+            self.instructions.append(IRGoto(start_label))
+            self.instructions.append(IRLabel(end_label))
+
+    def lower_update(self, node):
+        if not isinstance(node, Assignment):
+            self.visit(node)
+            return
+        # Выражение уже проверено и аннотировано: строим IR как IRGenerator
+        value = iterate(self._expression_step, node.value)
+        self.instructions.append(IRAssign(Var(node.name, node.type_), value, type_=node.type_))
+
+    @dispatch.on(FunctionDeclaration)
+    def visit_FunctionDeclaration(self, node):
+        declare_function(self.scope, node)
+        func_name = f"func_{node.name}"
+        with self.scope.nested():
+            declare_parameters(self.scope, node)
+            if func_name in self.defined_funcs:
+                # Как IRGenerator, одноимённую функцию из другой области не выпускаем
+                # повторно, но тело проверяем — как SemanticAnalyzer
+                self.analyzer.visit_block(node.body, self.scope)
+                return
+
+            self.defined_funcs.add(func_name)
+            self.instructions.append(IRFunctionStart(func_name, [Var(name, type_) for name, type_ in node.params]))
+            self.block(node.body)
+            self.instructions.append(IRFunctionEnd(func_name))
+
+    @dispatch.on(TryCatchStatement)
+    def visit_TryCatchStatement(self, node):
+        try_label = self._unique_label("try")
+        catch_label = self._unique_label("catch")
+        end_label = self._unique_label("end_try")
+        self.instructions.append(IRLabel(try_label))
+        with self.scope.nested():
+            self.block(node.try_block)
+        self.instructions.append(IRGoto(end_label))
+
+        check_catch_variable(self.scope)
+
+        self.instructions.append(IRLabel(catch_label))
+        with self.scope.nested():
+            self.scope.define("e", "string")
+            self.block(node.catch_block)
+        self.instructions.append(IRLabel(end_label))
+
+    @dispatch.on(MatchStatement)
+    def visit_MatchStatement(self, node):
+        expr_temp, expr_type = self.expression(node.expr)
+        end_label = self._unique_label("end_match")
+        case_labels = []
+
+        for i, case in enumerate(node.cases):
+            label = self._unique_label(f"case_{i}")
+            case_labels.append((label, case))
+            cond = self.temp.new_temp("bool")
+            value, value_type = self.expression(case.value)
+            check_case(value_type, expr_type)
+            self.instructions.append(IRBinary(cond, expr_temp, "==", value))
+            self.instructions.append(IRIfGoto(cond, label))
+
+        default_label = self._unique_label("default_case") if node.default else end_label
+        self.instructions.append(IRGoto(default_label))
+
+        for label, case in case_labels:
+            self.instructions.append(IRLabel(label))
+            with self.scope.nested():
+                for stmt in case.body:
+                    self.visit(stmt)
+            self.instructions.append(IRGoto(end_label))
+
+        if node.default:
+            self.instructions.append(IRLabel(default_label))
+            with self.scope.nested():
+                for stmt in node.default.body:
+                    self.visit(stmt)
+
+        self.instructions.append(IRLabel(end_label))
+
+    @dispatch.on(FunctionCall)
+    def visit_FunctionCall(self, node):
+        return self.expression(node)[0]
+
+    # Выражения: шаг возвращает пару (значение в IR, тип)
+
+    def expression(self, node):
+        return iterate(self._fused_step, node)
+
+    fused_steps = DispatchTable()
+
+    def _fused_step(self, node):
+        return self.fused_steps[type(node)](self, node)
+
+    @fused_steps.otherwise
+    def _unknown_step(self, node):
+        # Как и SemanticAnalyzer, тип неизвестного узла — None; IR — по IRGenerator
+        return self.visit(node), None
+
+    # Листья — без вызовов SemanticAnalyzer/IRGenerator: их на выражение больше всего
+
+    @fused_steps.on(Literal)
+    def _literal_step(self, node):
+        # Тип константы-операнда совпадает с SemanticAnalyzer._literal_type
+        operand = const(node.value)
+        node.type_ = operand.type_
+        return operand, node.type_
+
+    @fused_steps.on(Identifier)
+    def _identifier_step(self, node):
+        symbol = lookup_variable(self.scope, node.name)
+        node.symbol = symbol
+        node.type_ = symbol.type_
+        return Var(node.name, symbol.type_), symbol.type_
+
+    @fused_steps.on(BinaryOp)
+    def _binary_op_step(self, node):
+        left, left_type = yield node.left
+        right, right_type = yield node.right
+        node.type_ = check_binary_op(left_type, node.op, right_type)
+        result = self.temp.new_temp(node.type_)
+        self.instructions.append(IRBinary(result, left, node.op, right, type_=node.type_))
+        return result, node.type_
+
+    @fused_steps.on(UnaryOp)
+    def _unary_op_step(self, node):
+        operand, operand_type = yield node.operand
+        node.type_ = check_unary_op(node.op, operand_type)
+        result = self.temp.new_temp("bool")
+        self.instructions.append(IRUnary(result, node.op, operand))
+        return result, node.type_
+
+    @fused_steps.on(FunctionCall)
+    def _function_call_step(self, node):
+        symbol_entry = lookup_function(self.scope, node)
+        function_info = symbol_entry.type_
+
+        args = []
+        for arg, (param_name, param_type) in zip(node.arguments, function_info["params"]):
+            value, arg_type = yield arg
+            check_argument(param_name, param_type, arg_type)
+            args.append(value)
+
+        node.symbol = symbol_entry
+        node.type_ = function_info["return_type"]
+        result = self.temp.new_temp(node.type_)
+        self.instructions.append(IRCall(result, f"func_{node.name}", args))
+        return result, node.type_
@@ -1,8 +1,31 @@
+from src.IR.operands import *
+
+
 class IRInstruction:
-    pass
+    # Поля в порядке аргументов конструктора: по ним инструкции обходятся
+    # без vars() (см. CompactIR в src/IR/compact.py)
+    fields = ()
+    # Какие поля инструкция пишет и читает: по ним работают CFG-анализы
+    def_field = None
+    use_fields = ()
+
+    def defined(self):
+        return getattr(self, self.def_field) if self.def_field else None
+
+    def used(self):
+        for field in self.use_fields:
+            value = getattr(self, field)
+            if isinstance(value, list):
+                yield from value
+            elif value is not None:
+                yield value
 
 
 class IRAssign(IRInstruction):
+    fields = ("target", "value", "type_")
+    def_field = "target"
+    use_fields = ("value",)
+
     def __init__(self, target, value, type_=None):
         self.target = target
         self.value = value
@@ -13,6 +36,9 @@ class IRAssign(IRInstruction):
 
 
 class IRPrint(IRInstruction):
+    fields = ("value", "type_")
+    use_fields = ("value",)
+
     def __init__(self, value, type_=None):
         self.value = value
         self.type_ = type_
@@ -22,6 +48,9 @@ class IRPrint(IRInstruction):
 
 
 class IRReturn(IRInstruction):
+    fields = ("value",)
+    use_fields = ("value",)
+
     def __init__(self, value):
         self.value = value
     def __repr__(self):
@@ -29,6 +58,8 @@ class IRReturn(IRInstruction):
 
 
 class IRLabel(IRInstruction):
+    fields = ("label",)
+
     def __init__(self, label):
         self.label = label
     def __repr__(self):
@@ -36,6 +67,8 @@ class IRLabel(IRInstruction):
 
 
 class IRGoto(IRInstruction):
+    fields = ("label",)
+
     def __init__(self, label):
         self.label = label
     def __repr__(self):
@@ -43,14 +76,23 @@ class IRGoto(IRInstruction):
 
 
 class IRIfGoto(IRInstruction):
-    def __init__(self, condition, label):
+    # negated: переход, когда условие ложно (if !cond goto label)
+    fields = ("condition", "label", "negated")
+    use_fields = ("condition",)
+
+    def __init__(self, condition, label, negated=False):
         self.condition = condition
         self.label = label
+        self.negated = negated
     def __repr__(self):
-        return f"if {self.condition} goto {self.label}"
+        return f"if {'!' if self.negated else ''}{self.condition} goto {self.label}"
 
 
 class IRCall(IRInstruction):
+    fields = ("target", "name", "args")
+    def_field = "target"
+    use_fields = ("args",)
+
     def __init__(self, target, name, args):
         self.target = target
         self.name = name
@@ -62,14 +104,18 @@ class IRCall(IRInstruction):
 
 
 class IRFunctionStart:
+    fields = ("name", "params")
+
     def __init__(self, name, params=None):
         self.name = name
         self.params = params or []
 
     def __str__(self):
-        return f"{self.name}:\nparams: {', '.join(self.params)}"
+        return f"{self.name}:\nparams: {', '.join(map(str, self.params))}"
 
 class IRFunctionEnd:
+    fields = ("name",)
+
     def __init__(self, name):
         self.name = name
     def __str__(self):
@@ -77,6 +123,10 @@ class IRFunctionEnd:
 
 
 class IRBinary(IRInstruction):
+    fields = ("result", "left", "op", "right", "type_")
+    def_field = "result"
+    use_fields = ("left", "right")
+
     def __init__(self, result, left, op, right, type_=None):
         self.result = result
         self.left = left
@@ -89,6 +139,10 @@ class IRBinary(IRInstruction):
 
 
 class IRUnary(IRInstruction):
+    fields = ("result", "op", "operand")
+    def_field = "result"
+    use_fields = ("operand",)
+
     def __init__(self, result, op, operand):
         self.result = result
         self.op = op
@@ -97,7 +151,30 @@ class IRUnary(IRInstruction):
         return f"{self.result} = {self.op}{self.operand}"
 
 
+class IRPhi(IRInstruction):
+    """target = phi(...): значение из sources по ребру, которым пришли в блок.
+
+    sources — список пар [блок-предшественник, операнд]; встречается только
+    в SSA-форме (src/IR/ssa.py) в начале базового блока.
+    """
+    fields = ("target", "sources")
+    def_field = "target"
+
+    def __init__(self, target, sources):
+        self.target = target
+        self.sources = sources
+
+    def used(self):
+        return (value for _, value in self.sources)
+
+    def __repr__(self):
+        args = ", ".join(f"B{block.index}: {value}" for block, value in self.sources)
+        return f"{self.target} = phi({args})"
+
+
 class IRTryCatch(IRInstruction):
+    fields = ("try_block", "catch_block", "exception_var")
+
     def __init__(self, try_block, catch_block, exception_var):
         self.try_block = try_block
         self.catch_block = catch_block
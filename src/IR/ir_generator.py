@@ -1,7 +1,8 @@
 from src.IR.temp_manager import TempManager
 from src.IR.instructions import *
-from src.semantic.symbol_table import SymbolTable
-from src.AST.Karkas import Literal, Identifier, BinaryOp
+from src.AST.Karkas import *
+from src.AST.traversal import iterate
+from src.dispatch import DispatchTable
 
 class IRGenerator:
     def __init__(self):
@@ -9,7 +10,6 @@ class IRGenerator:
         self.instructions = []
         self.defined_funcs = set()
         self.generated_labels = set()
-        self.current_scope = SymbolTable()
 
     def generate(self, node):
         self.instructions = []
@@ -19,60 +19,47 @@ class IRGenerator:
         self.visit(node)
         return self.instructions
 
+    # Обработчики узлов регистрируются в таблице один раз при определении класса
+    dispatch = DispatchTable()
+
     def visit(self, node):
-        if isinstance(node, list):
-            for item in node:
-                self.visit(item)
-            return
-        method = f"visit_{type(node).__name__}"
-        return getattr(self, method, self.generic_visit)(node)
+        return self.dispatch[type(node)](self, node)
 
+    @dispatch.otherwise
     def generic_visit(self, node):
         raise Exception(f"No visit method for {type(node).__name__}")
 
+    @dispatch.on(list)
+    def visit_list(self, node):
+        for item in node:
+            self.visit(item)
+
+    @dispatch.on(Program)
     def visit_Program(self, node):
         for stmt in node.statements:
             if stmt is not None:
                 self.visit(stmt)
 
+    @dispatch.on(VarDeclaration)
     def visit_VarDeclaration(self, node):
         value = self.visit(node.value)
-        self.current_scope.define(node.name, node.type_)
-        if isinstance(value, (IRCall, IRBinary, IRUnary)):
-            self.instructions.append(IRAssign(node.name, value.result, type_=node.type_))
-        else:
-            self.instructions.append(IRAssign(node.name, value, type_=node.type_))
+        self.instructions.append(IRAssign(Var(node.name, node.type_), value, type_=node.type_))
 
 
 
+    @dispatch.on(Assignment)
     def visit_Assignment(self, node):
         value = self.visit(node.value)
-        self.instructions.append(IRAssign(node.name, value))
-
-    def visit_expression(self, node):
-        if isinstance(node, Literal):
-            if isinstance(node.value, str):
-                return "string"
-            elif isinstance(node.value, int):
-                return "int"
-            elif isinstance(node.value, float):
-                return "float"
-            elif isinstance(node.value, bool):
-                return "bool"
-        elif isinstance(node, Identifier):
-            symbol = self.current_scope.lookup(node.name)
-            if symbol:
-                return symbol.type_
-        elif isinstance(node, BinaryOp):
-            return node.type_
-
-        return "int"
+        # Тип присваивания — тип переменной, проставленный семантическим анализом
+        self.instructions.append(IRAssign(Var(node.name, node.type_), value, type_=node.type_))
 
+    @dispatch.on(PrintStatement)
     def visit_PrintStatement(self, node):
-        expr_type = self.visit_expression(node.expression)
+        # Тип выражения уже записан в узел семантическим анализом
         value = self.visit(node.expression)
-        self.instructions.append(IRPrint(value, expr_type))
+        self.instructions.append(IRPrint(value, node.expression.type_))
 
+    @dispatch.on(ReturnStatement)
     def visit_ReturnStatement(self, node):
         if node.value is None:
             self.instructions.append(IRReturn(None))
@@ -91,13 +78,14 @@ class IRGenerator:
             value = self.visit(node.value)
             self.instructions.append(IRReturn(value))
 
+    @dispatch.on(IfStatement)
     def visit_IfStatement(self, node):
         else_label = self._unique_label("else")
         end_label = self._unique_label("endif")
 
         cond = self.visit(node.condition)
 
-        negated = self.temp.new_temp()
+        negated = self.temp.new_temp("bool")
         self.instructions.append(IRUnary(negated, "!", cond))
 
         self.instructions.append(IRIfGoto(negated, else_label))
@@ -108,63 +96,83 @@ class IRGenerator:
             self.visit(node.else_block)
         self.instructions.append(IRLabel(end_label))
 
+    @dispatch.on(WhileStatement)
     def visit_WhileStatement(self, node):
         start_label = self._unique_label("while_start")
         end_label = self._unique_label("while_end")
         self.instructions.append(IRLabel(start_label))
         condition = self.visit(node.condition)
-        self.instructions.append(IRIfGoto(f"!{condition}", end_label))
+        self.instructions.append(IRIfGoto(condition, end_label, negated=True))
         self.visit(node.body)
         self.instructions.append(IRGoto(start_label))
         self.instructions.append(IRLabel(end_label))
 
+    @dispatch.on(ForStatement)
     def visit_ForStatement(self, node):
         self.visit(node.init)
         start_label = self._unique_label("for_start")
         end_label = self._unique_label("for_end")
         self.instructions.append(IRLabel(start_label))
         condition = self.visit(node.condition)
-        self.instructions.append(IRIfGoto(f"!{condition}", end_label))
+        self.instructions.append(IRIfGoto(condition, end_label, negated=True))
         self.visit(node.body)
         self.visit(node.update)
         self.instructions.append(IRGoto(start_label))
         self.instructions.append(IRLabel(end_label))
 
+    @dispatch.on(FunctionDeclaration)
     def visit_FunctionDeclaration(self, node):
-        # Создаём новую область видимости для функции
-        func_scope = SymbolTable(parent=self.current_scope)
-        self.current_scope = func_scope  # Обновляем текущую область
-
         func_name = f"func_{node.name}"
         if func_name in self.defined_funcs:
             return
 
-        # Добавляем параметры функции в область видимости
-        for param_name, param_type in node.params:
-            func_scope.define(param_name, param_type)
-
         self.defined_funcs.add(func_name)
-        self.instructions.append(IRFunctionStart(func_name, [name for name, _ in node.params]))
+        self.instructions.append(IRFunctionStart(func_name, [Var(name, type_) for name, type_ in node.params]))
         self.visit(node.body)
         self.instructions.append(IRFunctionEnd(func_name))
 
-        # Возвращаемся к родительской области видимости
-        self.current_scope = func_scope.parent
+    # Выражения (вызовы, бинарные и унарные операции) обходятся итеративно:
+    # шаг — генератор, который yield-ит подвыражения и получает их значения
+    # (см. src/AST/traversal.py). Порядок инструкций тот же, что при рекурсии.
 
+    @dispatch.on(FunctionCall)
     def visit_FunctionCall(self, node):
+        return iterate(self._expression_step, node)
+
+    @dispatch.on(BinaryOp)
+    def visit_BinaryOp(self, node):
+        return iterate(self._expression_step, node)
+
+    @dispatch.on(UnaryOp)
+    def visit_UnaryOp(self, node):
+        return iterate(self._expression_step, node)
+
+    # Шаги составных выражений; листья (литералы, идентификаторы) — обычный visit
+    expression_steps = DispatchTable()
+
+    def _expression_step(self, node):
+        return self.expression_steps[type(node)](self, node)
+
+    @expression_steps.otherwise
+    def _leaf_step(self, node):
+        return self.visit(node)
+
+    @expression_steps.on(FunctionCall)
+    def _function_call_step(self, node):
         args = []
         for arg in node.arguments:
-            val = self.visit(arg)
+            val = yield arg
             # если это вызов, уже IRCall, то будет обработан до
             args.append(val)
-        result = self.temp.new_temp()
+        result = self.temp.new_temp(node.type_)
         self.instructions.append(IRCall(result, f"func_{node.name}", args))
         return result
 
-    def visit_BinaryOp(self, node):
+    @expression_steps.on(BinaryOp)
+    def _binary_op_step(self, node):
         # Обрабатываем левый и правый аргументы
-        left = self.visit(node.left)
-        right = self.visit(node.right)
+        left = yield node.left
+        right = yield node.right
 
         # если результат вложенной функции — не переменная, сохранить в temp
         if isinstance(node.left, IRCall):
@@ -177,43 +185,32 @@ class IRGenerator:
             self.instructions.append(IRAssign(tmp_right, right))
             right = tmp_right
 
-        result = self.temp.new_temp()
+        result = self.temp.new_temp(node.type_)
         self.instructions.append(IRBinary(result, left, node.op, right, type_=node.type_))  # Передаём тип
         return result
 
-    def visit_UnaryOp(self, node):
-        operand = self.visit(node.operand)
-        result = self.temp.new_temp()
+    @expression_steps.on(UnaryOp)
+    def _unary_op_step(self, node):
+        operand = yield node.operand
+        result = self.temp.new_temp(node.type_)
         self.instructions.append(IRUnary(result, node.op, operand))
         return result
 
+    @dispatch.on(Identifier)
     def visit_Identifier(self, node):
-        if not self.current_scope:
-            raise Exception("Ошибка: Область видимости не инициализирована")
-
-        # Ищем переменную в текущей области и родительских
-        symbol = self.current_scope.lookup(node.name)
-        if not symbol:
-            raise Exception(f"Ошибка: Переменная '{node.name}' не объявлена")
-
-        # Аннотируем узел типом из таблицы символов
-        node.type_ = symbol.type_
-        return node.name
+        return Var(node.name, node.type_)
 
+    @dispatch.on(Literal)
     def visit_Literal(self, node):
-        if isinstance(node.value, float):
-            node.type_ = "float"
-        elif isinstance(node.value, int):
-            node.type_ = "int"
-        elif isinstance(node.value, str):
-            return f'"{node.value}"'
-        return str(node.value)
+        return const(node.value)
 
+    @dispatch.on(Block)
     def visit_Block(self, node):
         for stmt in node.statements:
             if stmt is not None:
                 self.visit(stmt)
 
+    @dispatch.on(TryCatchStatement)
     def visit_TryCatchStatement(self, node):
         try_label = self._unique_label("try")
         catch_label = self._unique_label("catch")
@@ -225,6 +222,7 @@ class IRGenerator:
         self.visit(node.catch_block)
         self.instructions.append(IRLabel(end_label))
 
+    @dispatch.on(MatchStatement)
     def visit_MatchStatement(self, node):
         expr_temp = self.visit(node.expr)
         end_label = self._unique_label("end_match")
@@ -233,7 +231,7 @@ class IRGenerator:
         for i, case in enumerate(node.cases):
             label = self._unique_label(f"case_{i}")
             case_labels.append((label, case))
-            cond = self.temp.new_temp()
+            cond = self.temp.new_temp("bool")
             self.instructions.append(IRBinary(cond, expr_temp, "==", self.visit(case.value)))
             self.instructions.append(IRIfGoto(cond, label))
 
@@ -0,0 +1,199 @@
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+from src.IR.instructions import *
+
+MAIN = "main"
+
+
+class FunctionUnit:
+    """Одна функция IR или main: заголовок и тело без IRFunctionStart/End.
+
+    position — сколько инструкций main стояло перед объявлением функции;
+    нужен только для раскладки обратно в плоский список.
+    """
+    __slots__ = ("name", "params", "body", "position")
+
+    def __init__(self, name: str, params=None, body=None, position: int = 0):
+        self.name = name
+        self.params = params or []
+        self.body = body if body is not None else []
+        self.position = position
+
+    @property
+    def is_main(self) -> bool:
+        return self.name == MAIN
+
+    def with_body(self, body) -> "FunctionUnit":
+        return FunctionUnit(self.name, self.params, body, self.position)
+
+    def instructions(self) -> list:
+        if self.is_main:
+            return list(self.body)
+        return [IRFunctionStart(self.name, self.params), *self.body, IRFunctionEnd(self.name)]
+
+    def __repr__(self):
+        return f"FunctionUnit({self.name}, {len(self.body)} инструкций)"
+
+
+class ModuleData:
+    """Глобальные таблицы данных: всё, что попадает в секцию .data.
+
+    variables — имя → тип памяти ("float" или "int") в порядке первого
+    появления; strings и floats — текст литерала → метка; bools —
+    логические константы, на которые есть ссылки; var_types — тип имени
+    из первой инструкции, которая его определяет.
+    """
+    __slots__ = ("variables", "strings", "floats", "bools", "var_types", "function_params")
+
+    def __init__(self):
+        self.variables = {}
+        self.strings = {}
+        self.floats = {}
+        self.bools = set()
+        self.var_types = {}
+        self.function_params = {}
+
+
+class IRModule:
+    """Программа в IR: функции отдельными единицами, явный main и таблицы данных.
+
+    Единицы независимы друг от друга, поэтому их можно оптимизировать и
+    транслировать по отдельности, в том числе на пуле процессов
+    (map_units, map_bodies). Итерация по модулю даёт прежний плоский
+    список с IRFunctionStart/End.
+    """
+
+    def __init__(self, functions=(), main: FunctionUnit = None):
+        self.functions = list(functions)
+        self.main = main if main is not None else FunctionUnit(MAIN)
+
+    @classmethod
+    def from_instructions(cls, instructions) -> "IRModule":
+        """Один проход по плоскому IR; вложенные функции становятся отдельными единицами."""
+        functions, main, open_units = [], [], []
+        for instr in instructions:
+            if isinstance(instr, IRFunctionStart):
+                unit = FunctionUnit(instr.name, instr.params, position=len(main))
+                functions.append(unit)
+                open_units.append(unit)
+            elif isinstance(instr, IRFunctionEnd):
+                open_units.pop()
+            elif open_units:
+                open_units[-1].body.append(instr)
+            else:
+                main.append(instr)
+        return cls(functions, FunctionUnit(MAIN, body=main))
+
+    def units(self) -> list:
+        return [*self.functions, self.main]
+
+    def instructions(self) -> list:
+        """Плоский список: функции на прежних местах среди инструкций main."""
+        functions = sorted(self.functions, key=lambda unit: unit.position)
+        result, pending = [], iter(functions)
+        unit = next(pending, None)
+        body = self.main.body
+        for i in range(len(body) + 1):
+            while unit is not None and (unit.position <= i or i == len(body)):
+                result.extend(unit.instructions())
+                unit = next(pending, None)
+            if i < len(body):
+                result.append(body[i])
+        return result
+
+    def __iter__(self):
+        return iter(self.instructions())
+
+    def __len__(self):
+        return sum(len(unit.body) for unit in self.units()) + 2 * len(self.functions)
+
+    def function_params(self) -> dict:
+        return {unit.name: unit.params for unit in self.functions}
+
+    # --- обработка по единицам ---
+
+    def map_units(self, func, jobs: int = 1) -> list:
+        """func(unit) для каждой единицы в порядке units().
+
+        При jobs > 1 единицы обрабатываются на пуле процессов; func должна
+        сериализоваться pickle (функция модуля или functools.partial).
+        """
+        units = self.units()
+        if jobs <= 1 or len(units) <= 1:
+            return [func(unit) for unit in units]
+        workers = min(jobs, len(units))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(func, units, chunksize=max(1, len(units) // (workers * 4))))
+
+    def map_bodies(self, func, jobs: int = 1) -> "IRModule":
+        """Новый модуль, где тело каждой единицы заменено на func(body)."""
+        return self.with_bodies(self.map_units(functools.partial(_map_body, func), jobs))
+
+    def with_bodies(self, bodies) -> "IRModule":
+        """Новый модуль с теми же единицами и телами bodies (в порядке units())."""
+        units = [unit.with_body(body) for unit, body in zip(self.units(), bodies)]
+        return IRModule(units[:-1], units[-1])
+
+    # --- данные ---
+
+    def collect_data(self) -> ModuleData:
+        """Таблицы .data в порядке единиц (units()) — том же, в котором
+        NASMGenerator выводит код. От раскладки функций среди main порядок
+        не зависит: после оптимизации position может быть неточным."""
+        data = ModuleData()
+        data.function_params = self.function_params()
+        instructions = [instr for unit in self.units() for instr in unit.instructions()]
+        assign_types = {}
+        for instr in instructions:
+            for value in _field_values(instr):
+                if isinstance(value, BoolConst):
+                    data.bools.add(value)
+            if isinstance(instr, IRCall):
+                # Аргументы вызова тоже читаются из [rel True]/[rel False]
+                data.bools.update(arg for arg in instr.args if isinstance(arg, BoolConst))
+            if isinstance(instr, IRFunctionStart):
+                continue
+            if isinstance(instr, IRAssign):
+                assign_types.setdefault(instr.target, instr.type_)
+            if hasattr(instr, "target"):
+                data.var_types.setdefault(instr.target, getattr(instr, "type_", "int"))
+            elif hasattr(instr, "result"):
+                data.var_types.setdefault(instr.result, getattr(instr, "type_", "int"))
+
+        def add_variable(var, type_hint=None):
+            # Память нужна только переменным и временным; константы идут в код как есть
+            if isinstance(var, Name) and var.name not in data.variables:
+                data.variables[var.name] = assign_types.get(var) or type_hint or "int"
+
+        for instr in instructions:
+            for attr in ("value", "left", "right"):
+                value = getattr(instr, attr, None)
+                if isinstance(value, FloatConst) and str(value) not in data.floats:
+                    data.floats[str(value)] = f"float_{len(data.floats)}"
+            for attr in ("target", "result"):
+                if hasattr(instr, attr):
+                    add_variable(getattr(instr, attr), getattr(instr, "type_", None))
+            for attr in ("left", "right", "value", "condition"):
+                if hasattr(instr, attr):
+                    add_variable(getattr(instr, attr))
+            if isinstance(instr, IRFunctionStart):
+                for param in instr.params:
+                    add_variable(param)
+            if isinstance(instr, IRCall):
+                for arg in instr.args:
+                    add_variable(arg)
+
+        for instr in instructions:
+            for value in _field_values(instr):
+                if isinstance(value, StrConst) and value.value not in data.strings:
+                    data.strings[value.value] = f"str_{len(data.strings)}"
+        return data
+
+
+def _map_body(func, unit):
+    return func(unit.body)
+
+
+def _field_values(instr):
+    return (getattr(instr, field) for field in instr.fields)
@@ -0,0 +1,98 @@
+class Operand:
+    """Операнд IR-инструкции.
+
+    Вид операнда задаётся классом и доступен без разбора строки:
+    kind — короткое имя вида, is_const — константа ли это, type_ — тип
+    значения (у констант он следует из класса). Операнды неизменяемы,
+    сравниваются и хэшируются по виду и значению, а str() даёт прежнюю
+    текстовую запись: t0, x, 42, 2.5, "text", True.
+    """
+    __slots__ = ()
+    kind = None
+    is_const = False
+    is_name = False  # переменная или временная — то, что занимает память
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash((type(self), self.key()))
+
+    def __repr__(self):
+        return str(self)
+
+
+class Name(Operand):
+    __slots__ = ("name", "type_")
+    is_name = True
+
+    def __init__(self, name: str, type_: str = None):
+        self.name = name
+        self.type_ = type_
+
+    def key(self):
+        return self.name
+
+    def __str__(self):
+        return self.name
+
+
+class Temp(Name):
+    """Временная переменная, созданная генератором IR."""
+    __slots__ = ()
+    kind = "temp"
+
+
+class Var(Name):
+    """Переменная или параметр из исходной программы."""
+    __slots__ = ()
+    kind = "var"
+
+
+class Const(Operand):
+    __slots__ = ("value",)
+    is_const = True
+
+    def __init__(self, value):
+        self.value = value
+
+    def key(self):
+        return self.value
+
+    def __str__(self):
+        return str(self.value)
+
+
+class IntConst(Const):
+    __slots__ = ()
+    kind = "int"
+    type_ = "int"
+
+
+class FloatConst(Const):
+    __slots__ = ()
+    kind = "float"
+    type_ = "float"
+
+
+class StrConst(Const):
+    __slots__ = ()
+    kind = "str"
+    type_ = "string"
+
+    def __str__(self):
+        return f'"{self.value}"'
+
+
+class BoolConst(Const):
+    __slots__ = ()
+    kind = "bool"
+    type_ = "bool"
+
+
+def const(value) -> Const:
+    """Константа-операнд для значения Python."""
+    return CONST_CLASSES[type(value)](value)
+
+
+CONST_CLASSES = {bool: BoolConst, int: IntConst, float: FloatConst, str: StrConst}
@@ -0,0 +1,259 @@
+import copy
+
+from src.IR.instructions import *
+
+
+def pinned_names(cfgs) -> set:
+    """Имена, которые нельзя переименовывать: они живут в общей памяти.
+
+    В NASM все переменные глобальные: имя, встречающееся в нескольких
+    функциях, может измениться при вызове, а параметры записывает
+    вызывающая сторона.
+    """
+    owner, pinned = {}, set()
+    for cfg in cfgs:
+        if cfg.params is not None:
+            pinned.update(param.name for param in cfg.params)
+        for block in cfg.blocks:
+            for instr in block.instructions:
+                for operand in _operands(instr):
+                    if owner.setdefault(operand.name, cfg) is not cfg:
+                        pinned.add(operand.name)
+    return pinned
+
+
+def to_ssa(cfgs) -> list:
+    """Переводит все графы программы в SSA-форму на месте."""
+    pinned = pinned_names(cfgs)
+    for cfg in cfgs:
+        construct_ssa(cfg, pinned)
+    return cfgs
+
+
+def construct_ssa(cfg, pinned=frozenset()) -> dict:
+    """Строит SSA-форму графа: phi по границам доминирования и переименование.
+
+    Версия имени x — x.1, x.2, ...; нулевая версия — само x, то есть
+    значение на входе (параметр или глобальная переменная). Имена с одним
+    определением (временные, большинство let) уже в SSA и не меняются.
+    Инструкции копируются, исходный список IR не меняется. Возвращает
+    словарь новое имя → исходное.
+    """
+    blocks = [b for b in cfg.blocks if cfg.reachable(b)]
+    def_blocks, crossing, counts = {}, set(), {}
+    for block in blocks:
+        defined_here = set()
+        for instr in block.instructions:
+            for operand in _operands(instr, defs=False):
+                if operand.name not in pinned and operand.name not in defined_here:
+                    crossing.add(operand.name)
+            target = _defined_name(instr)
+            if target is not None and target.name not in pinned:
+                defined_here.add(target.name)
+                def_blocks.setdefault(target.name, {})[block] = target
+                counts[target.name] = counts.get(target.name, 0) + 1
+
+    single = {name for name, count in counts.items() if count == 1}
+    _insert_phis(cfg, def_blocks, crossing - single)
+    return _rename(cfg, set(pinned) | single)
+
+
+def _insert_phis(cfg, def_blocks, crossing):
+    # Полуусечённая SSA: phi только для имён, живущих дольше одного блока
+    frontiers = cfg.dominance_frontiers()
+    for name in crossing:
+        sites = def_blocks.get(name)
+        if not sites:
+            continue
+        operand = next(iter(sites.values()))
+        has_phi, work = set(), list(sites)
+        while work:
+            block = work.pop()
+            for frontier in frontiers[block]:
+                if frontier in has_phi:
+                    continue
+                has_phi.add(frontier)
+                phi = IRPhi(operand, [[pred, operand] for pred in frontier.preds])
+                frontier.instructions.insert(_phi_position(frontier), phi)
+                if frontier not in sites:
+                    work.append(frontier)
+
+
+def _rename(cfg, pinned) -> dict:
+    stacks, counters, origin = {}, {}, {}
+
+    def current(operand):
+        if not operand.is_name or operand.name in pinned:
+            return operand
+        stack = stacks.get(operand.name)
+        return stack[-1] if stack else operand
+
+    def new_version(operand, pushed):
+        n = counters[operand.name] = counters.get(operand.name, 0) + 1
+        version = type(operand)(f"{operand.name}.{n}", operand.type_)
+        origin[version.name] = operand.name
+        stacks.setdefault(operand.name, []).append(version)
+        pushed.append(operand.name)
+        return version
+
+    # Обход дерева доминаторов без рекурсии: (блок, None) — вход, (блок, pushed) — выход
+    work = [(cfg.entry, None)]
+    while work:
+        block, pushed = work.pop()
+        if pushed is not None:
+            for name in pushed:
+                stacks[name].pop()
+            continue
+        pushed = []
+        for i, instr in enumerate(block.instructions):
+            target = _defined_name(instr)
+            if isinstance(instr, IRPhi):
+                instr.target = new_version(target, pushed)
+                continue
+            renamed = copy.copy(instr)
+            for field in instr.use_fields:
+                value = getattr(instr, field)
+                if isinstance(value, list):
+                    setattr(renamed, field, [current(v) for v in value])
+                elif value is not None:
+                    setattr(renamed, field, current(value))
+            if target is not None and target.name not in pinned:
+                setattr(renamed, instr.def_field, new_version(target, pushed))
+            block.instructions[i] = renamed
+        for succ in block.succs:
+            for phi in _phis(succ):
+                for source in phi.sources:
+                    if source[0] is block:
+                        source[1] = current(source[1])
+        work.append((block, pushed))
+        work.extend((child, None) for child in reversed(block.dom_children))
+    return origin
+
+
+def destruct_ssa(cfg):
+    """Выводит граф из SSA: phi заменяются копиями в конце предшественников.
+
+    Критические рёбра расщепляются, копии одного ребра выполняются как
+    параллельные (с временной переменной при циклическом обмене).
+    """
+    copies, split = {}, False
+    for block in list(cfg.blocks):
+        phis = _phis(block)
+        if not phis:
+            continue
+        for pred in list(block.preds):
+            edge_block = pred
+            if len(pred.succs) > 1:
+                edge_block = cfg.split_edge(pred, block)
+                split = True
+            for phi in phis:
+                for source in phi.sources:
+                    if source[0] is pred:
+                        source[0] = edge_block
+                        copies.setdefault(edge_block, []).append((phi.target, source[1]))
+        del block.instructions[_phi_position(block):_phi_position(block) + len(phis)]
+
+    swaps = 0
+    for block, pending in copies.items():
+        sequence = []
+        pending = [(dst, src) for dst, src in pending if dst != src]
+        while pending:
+            read = {src for _, src in pending}
+            ready = next((c for c in pending if c[0] not in read), None)
+            if ready is None:
+                # Цикл копий: сохраняем одну цель во временную и читаем её оттуда
+                dst = pending[0][0]
+                saved = Temp(f"{cfg.name}.swap{swaps}", dst.type_)
+                swaps += 1
+                sequence.append(IRAssign(saved, dst, type_=dst.type_))
+                pending = [(d, saved if s == dst else s) for d, s in pending]
+                continue
+            pending.remove(ready)
+            sequence.append(IRAssign(ready[0], ready[1], type_=ready[0].type_))
+        end = len(block.instructions) - (block.terminator is not None)
+        block.instructions[end:end] = sequence
+
+    if split:
+        cfg.compute_dominators()
+        cfg.compute_loops()
+    return cfg
+
+
+def verify_ssa(cfg, pinned=frozenset()):
+    """Проверяет SSA-форму: одно определение на имя, phi в начале блоков
+    с аргументом на каждого предшественника, определение доминирует над
+    каждым использованием. Имена из pinned не проверяются. Бросает
+    Exception при нарушении."""
+    defs = {}
+    for block in cfg.blocks:
+        if not cfg.reachable(block):
+            continue
+        in_phis = True
+        for i, instr in enumerate(block.instructions):
+            if isinstance(instr, IRLabel) and i == 0:
+                continue
+            if isinstance(instr, IRPhi):
+                if not in_phis:
+                    _fail(cfg, f"phi {instr} не в начале блока B{block.index}")
+                if sorted(b.index for b, _ in instr.sources) != sorted(b.index for b in block.preds):
+                    _fail(cfg, f"аргументы {instr} не совпадают с предшественниками B{block.index}")
+            else:
+                in_phis = False
+            target = _defined_name(instr)
+            if target is not None and target.name not in pinned:
+                if target.name in defs:
+                    _fail(cfg, f"'{target}' определена дважды")
+                defs[target.name] = (block, i)
+
+    for block in cfg.blocks:
+        if not cfg.reachable(block):
+            continue
+        for i, instr in enumerate(block.instructions):
+            if isinstance(instr, IRPhi):
+                uses = [(pred, len(pred.instructions), value) for pred, value in instr.sources
+                        if cfg.reachable(pred)]
+            else:
+                uses = [(block, i, value) for value in instr.used()]
+            for use_block, position, value in uses:
+                if not value.is_name or value.name not in defs:
+                    continue
+                def_block, def_position = defs[value.name]
+                if def_block is use_block:
+                    ok = def_position < position
+                else:
+                    ok = cfg.dominates(def_block, use_block)
+                if not ok:
+                    _fail(cfg, f"определение '{value}' не доминирует над использованием в B{use_block.index}")
+
+
+def _fail(cfg, message):
+    raise Exception(f"Ошибка SSA в {cfg.name}: {message}")
+
+
+def _phis(block) -> list:
+    start = _phi_position(block)
+    end = start
+    while end < len(block.instructions) and isinstance(block.instructions[end], IRPhi):
+        end += 1
+    return block.instructions[start:end]
+
+
+def _phi_position(block) -> int:
+    return 1 if block.label is not None else 0
+
+
+def _defined_name(instr):
+    target = instr.defined() if isinstance(instr, IRInstruction) else None
+    return target if target is not None and target.is_name else None
+
+
+def _operands(instr, defs=True):
+    if not isinstance(instr, IRInstruction):
+        return
+    for value in instr.used():
+        if value.is_name:
+            yield value
+    if defs:
+        target = _defined_name(instr)
+        if target is not None:
+            yield target
@@ -1,13 +1,16 @@
 
+from src.IR.operands import Temp
+
+
 class TempManager:
     def __init__(self):
         self.temp_counter = 0
         self.label_counter = 0
 
-    def new_temp(self):
+    def new_temp(self, type_=None):
         name = f"t{self.temp_counter}"
         self.temp_counter += 1
-        return name
+        return Temp(name, type_)
 
     def new_label(self, prefix="label"):
         name = f"{prefix}_{self.label_counter}"
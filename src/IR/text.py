@@ -0,0 +1,330 @@
+"""Текстовый формат IR: запись и обратный разбор без потерь.
+
+Одна инструкция на строку, тела функций с отступом (отступы и пустые
+строки при разборе не важны, ';' — комментарий до конца строки):
+
+    ; MyLang IR 1
+    g:float = 1.5 (type=float)
+    function func_inc(a:int)
+        %t0:int = a:int + 1 (type=int)
+        return %t0:int
+    end func_inc
+    %t1:int = call func_inc(2)
+    while_start_0:
+    if !%t3:bool goto while_end_1
+    %t6:bool = ! %t5:bool
+    print "no" (type=string)
+
+Операнды: %имя — временная (Temp), имя — переменная (Var), после ':' —
+тип операнда; 42, 2.5, "строка" (экранирование JSON), true/false —
+константы. Операторы отделяются пробелами, унарный — тоже: '-5' это
+константа, а '- 5' — унарный минус.
+"""
+import json
+import math
+import re
+
+from src.dispatch import DispatchTable
+from src.IR.instructions import *
+from src.IR.module import IRModule
+
+FORMAT_VERSION = 1
+HEADER = f"; MyLang IR {FORMAT_VERSION}"
+IR_EXTENSION = ".ir"
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+      (?P<str>"(?:[^"\\]|\\.)*")
+    | (?P<float>-?(?:\d+\.\d*(?:[eE][-+]?\d+)?|\d+[eE][-+]?\d+)|[-+](?:inf|nan))
+    | (?P<int>-?\d+)
+    | (?P<type>\(type=(?P<type_name>\w+)\))
+    | (?P<name>%?[A-Za-z_][\w.]*(?::\w+)?)
+    | (?P<op>==|!=|<=|>=|&&|\|\||[-+*/%<>!=(),:])
+    )""", re.VERBOSE)
+_HEADER = re.compile(r";\s*MyLang IR (\d+)\s*$")
+
+
+def format_ir(ir) -> str:
+    """Текст IR для списка инструкций, IRModule или CompactIR."""
+    writer = IRWriter()
+    lines = [HEADER]
+    for instr in ir:
+        lines.append(writer.line(instr))
+    return "\n".join(lines) + "\n"
+
+
+def parse_ir(text: str) -> IRModule:
+    return IRModule.from_instructions(IRReader().read(text))
+
+
+def write_ir(path: str, ir):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(format_ir(ir))
+
+
+def read_ir(path: str) -> IRModule:
+    with open(path, encoding="utf-8") as f:
+        return parse_ir(f.read())
+
+
+# --- запись ---
+
+def format_operand(operand) -> str:
+    if isinstance(operand, Name):
+        text = f"%{operand.name}" if isinstance(operand, Temp) else operand.name
+        return f"{text}:{operand.type_}" if operand.type_ else text
+    if isinstance(operand, BoolConst):
+        return "true" if operand.value else "false"
+    if isinstance(operand, StrConst):
+        return json.dumps(operand.value, ensure_ascii=False)
+    if isinstance(operand, FloatConst):
+        text = repr(float(operand.value))
+        # inf и nan без знака читались бы как имя переменной
+        return f"+{text}" if not math.isfinite(operand.value) and text[0] != "-" else text
+    if isinstance(operand, IntConst):
+        return str(operand.value)
+    raise Exception(f"Ошибка: операнд {operand!r} не записывается в текст IR")
+
+
+class IRWriter:
+    dispatch = DispatchTable()
+
+    def __init__(self):
+        self.indent = 0
+
+    def line(self, instr) -> str:
+        # Тело функции пишется с отступом, вложенная функция — с двойным
+        if isinstance(instr, IRFunctionEnd):
+            self.indent -= 1
+        text = "    " * self.indent + self.dispatch[type(instr)](self, instr)
+        if isinstance(instr, IRFunctionStart):
+            self.indent += 1
+        return text
+
+    @staticmethod
+    def typed(text, type_):
+        return f"{text} (type={type_})" if type_ else text
+
+    @dispatch.on(IRAssign)
+    def write_assign(self, instr):
+        return self.typed(f"{format_operand(instr.target)} = {format_operand(instr.value)}", instr.type_)
+
+    @dispatch.on(IRBinary)
+    def write_binary(self, instr):
+        return self.typed(f"{format_operand(instr.result)} = {format_operand(instr.left)} "
+                          f"{instr.op} {format_operand(instr.right)}", instr.type_)
+
+    @dispatch.on(IRUnary)
+    def write_unary(self, instr):
+        return f"{format_operand(instr.result)} = {instr.op} {format_operand(instr.operand)}"
+
+    @dispatch.on(IRPrint)
+    def write_print(self, instr):
+        return self.typed(f"print {format_operand(instr.value)}", instr.type_)
+
+    @dispatch.on(IRReturn)
+    def write_return(self, instr):
+        return "return" if instr.value is None else f"return {format_operand(instr.value)}"
+
+    @dispatch.on(IRLabel)
+    def write_label(self, instr):
+        return f"{instr.label}:"
+
+    @dispatch.on(IRGoto)
+    def write_goto(self, instr):
+        return f"goto {instr.label}"
+
+    @dispatch.on(IRIfGoto)
+    def write_if_goto(self, instr):
+        return f"if {'!' if instr.negated else ''}{format_operand(instr.condition)} goto {instr.label}"
+
+    @dispatch.on(IRCall)
+    def write_call(self, instr):
+        call = f"call {instr.name}({', '.join(map(format_operand, instr.args))})"
+        return call if instr.target is None else f"{format_operand(instr.target)} = {call}"
+
+    @dispatch.on(IRFunctionStart)
+    def write_function_start(self, instr):
+        return f"function {instr.name}({', '.join(map(format_operand, instr.params))})"
+
+    @dispatch.on(IRFunctionEnd)
+    def write_function_end(self, instr):
+        return f"end {instr.name}"
+
+    @dispatch.otherwise
+    def write_unknown(self, instr):
+        raise Exception(f"Ошибка: инструкция {type(instr).__name__} не записывается в текст IR")
+
+
+# --- разбор ---
+
+class IRReader:
+    """Разбор текста IR в плоский список инструкций."""
+
+    def read(self, text: str) -> list:
+        instructions = []
+        for number, raw in enumerate(text.splitlines(), 1):
+            self.number = number
+            header = _HEADER.match(raw.strip())
+            if header and int(header.group(1)) != FORMAT_VERSION:
+                self.fail(f"формат {header.group(1)}, поддерживается {FORMAT_VERSION}")
+            self.tokens = self.tokenize(raw)
+            self.pos = 0
+            if self.tokens:
+                instructions.append(self.statement())
+        return instructions
+
+    def fail(self, message):
+        raise Exception(f"Ошибка IR в строке {self.number}: {message}")
+
+    def tokenize(self, line: str) -> list:
+        tokens, pos = [], 0
+        while pos < len(line):
+            rest = line[pos:].lstrip()
+            if not rest or rest.startswith(";"):
+                break
+            match = _TOKEN.match(line, pos)
+            if match is None:
+                self.fail(f"не разобрано: {rest}")
+            kind = match.lastgroup if match.lastgroup != "type_name" else "type"
+            value = match.group("type_name") if kind == "type" else match.group(kind)
+            tokens.append((kind, value))
+            pos = match.end()
+        return tokens
+
+    # --- токены ---
+
+    def peek(self, offset=0):
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def take(self, kind=None, value=None):
+        token = self.peek()
+        if token[0] is None or (kind and token[0] != kind) or (value and token[1] != value):
+            self.fail(f"ожидалось {value or kind}, получено {token[1] or 'конец строки'}")
+        self.pos += 1
+        return token[1]
+
+    def at(self, kind, value=None) -> bool:
+        token = self.peek()
+        return token[0] == kind and (value is None or token[1] == value)
+
+    def done(self):
+        if self.pos != len(self.tokens):
+            self.fail(f"лишнее в конце строки: {self.peek()[1]}")
+
+    def type_suffix(self):
+        return self.take("type") if self.at("type") else None
+
+    # --- операнды ---
+
+    def operand(self):
+        kind, value = self.peek()
+        self.pos += 1
+        if kind == "str":
+            return StrConst(json.loads(value))
+        if kind == "float":
+            return FloatConst(float(value))
+        if kind == "int":
+            return IntConst(int(value))
+        if kind == "name":
+            if value in ("true", "false"):
+                return BoolConst(value == "true")
+            name, _, type_ = value.partition(":")
+            if name.startswith("%"):
+                return Temp(name[1:], type_ or None)
+            return Var(name, type_ or None)
+        self.pos -= 1
+        self.fail(f"ожидался операнд, получено {value or 'конец строки'}")
+
+    def operand_list(self) -> list:
+        self.take("op", "(")
+        items = []
+        while not self.at("op", ")"):
+            if items:
+                self.take("op", ",")
+            items.append(self.operand())
+        self.take("op", ")")
+        return items
+
+    def label(self) -> str:
+        name = self.take("name")
+        if ":" in name or name.startswith("%"):
+            self.fail(f"неверная метка {name}")
+        return name
+
+    # --- инструкции ---
+
+    def statement(self):
+        if self.peek(1) == ("op", "="):
+            target = self.operand()
+            self.take("op", "=")
+            instr = self.assignment(target)
+        elif self.peek(1) == ("op", ":") and len(self.tokens) == 2:
+            instr = IRLabel(self.label())
+            self.take("op", ":")
+        else:
+            handler = self.KEYWORDS.get(self.peek()[1]) if self.at("name") else None
+            if handler is None:
+                self.fail(f"неизвестная инструкция {self.peek()[1]}")
+            self.pos += 1
+            instr = handler(self)
+        self.done()
+        return instr
+
+    def assignment(self, target):
+        if self.at("name", "call") and self.peek(2) == ("op", "("):
+            self.pos += 1
+            return self.call(target)
+        if self.at("op") and self.peek()[1] in ("-", "!"):
+            op = self.take("op")
+            return IRUnary(target, op, self.operand())
+        value = self.operand()
+        if self.at("op"):
+            op = self.take("op")
+            right = self.operand()
+            return IRBinary(target, value, op, right, self.type_suffix())
+        return IRAssign(target, value, self.type_suffix())
+
+    def call(self, target):
+        name = self.take("name")
+        return IRCall(target, name, self.operand_list())
+
+    def read_call(self):
+        return self.call(None)
+
+    def read_print(self):
+        value = self.operand()
+        return IRPrint(value, self.type_suffix())
+
+    def read_return(self):
+        return IRReturn(self.operand() if self.pos < len(self.tokens) else None)
+
+    def read_goto(self):
+        return IRGoto(self.label())
+
+    def read_if_goto(self):
+        negated = self.at("op", "!")
+        if negated:
+            self.pos += 1
+        condition = self.operand()
+        self.take("name", "goto")
+        return IRIfGoto(condition, self.label(), negated)
+
+    def read_function_start(self):
+        name = self.label()
+        return IRFunctionStart(name, self.operand_list())
+
+    def read_function_end(self):
+        return IRFunctionEnd(self.label())
+
+    # Инструкции, которые начинаются с ключевого слова
+    KEYWORDS = {
+        "call": read_call,
+        "print": read_print,
+        "return": read_return,
+        "goto": read_goto,
+        "if": read_if_goto,
+        "function": read_function_start,
+        "end": read_function_end,
+    }
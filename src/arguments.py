@@ -0,0 +1,95 @@
+import argparse
+import os
+
+# Модуль не импортирует конвейер компилятора: клиент (src.client) разбирает
+# те же опции, что и src.main, и при этом стартует мгновенно.
+
+LEXER_NAMES = ("antlr", "fast")
+PARSERS = ("antlr", "rd")
+PREDICTION_MODES = ("sll-ll", "ll")
+DEFAULT_CACHE_MB = 256
+
+# Опции-пути: клиент переводит их в абсолютные, сервер работает в своём каталоге
+PATH_OPTIONS = ("atn_snapshot", "cache_dir", "passes_json")
+
+
+def add_frontend_arguments(arg_parser: argparse.ArgumentParser):
+    arg_parser.add_argument("--lexer", choices=LEXER_NAMES, default="antlr",
+                            help="лексер: сгенерированный ANTLR или рукописный fast")
+    arg_parser.add_argument("--parser", choices=PARSERS, default="antlr",
+                            help="парсер: ANTLR + ASTBuilder или рекурсивный спуск rd, строящий AST напрямую")
+    arg_parser.add_argument("--atn-snapshot", default=os.environ.get("MYLANG_ATN_SNAPSHOT"),
+                            help="снимок DFA лексера/парсера ANTLR (python -m src.parser.atn_snapshot)")
+    arg_parser.add_argument("--prediction", choices=PREDICTION_MODES, default="sll-ll",
+                            help="предсказание ANTLR: SLL с откатом на LL при ошибке или только полный LL")
+    arg_parser.add_argument("--fused", action="store_true",
+                            help="семантический анализ и генерация IR за один обход AST")
+
+
+def add_cache_arguments(arg_parser: argparse.ArgumentParser):
+    arg_parser.add_argument("--cache-dir", default=os.environ.get("MYLANG_CACHE_DIR"),
+                            help="каталог кэша стадий компиляции (по умолчанию выключен)")
+    arg_parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_MB,
+                            help="максимальный размер кэша в МБ")
+
+
+def add_timing_arguments(arg_parser: argparse.ArgumentParser):
+    arg_parser.add_argument("--time-passes", action="store_true",
+                            help="вывести время каждой стадии и каждого прохода оптимизатора")
+    arg_parser.add_argument("--mem-passes", action="store_true",
+                            help="дополнительно измерить пик памяти (tracemalloc) по проходам")
+    arg_parser.add_argument("--passes-json", metavar="FILE",
+                            help="сохранить отчёт по проходам в JSON")
+
+
+def make_arg_parser(prog: str = "python -m src.main") -> argparse.ArgumentParser:
+    """Разбор командной строки компилятора одного файла (src.main и src.client)."""
+    arg_parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Компилятор MyLang → NASM",
+        usage=f"{prog} <входной_файл.my|.ir> <выходной_файл.asm> [опции]",
+    )
+    arg_parser.add_argument("source_path")
+    arg_parser.add_argument("output_path")
+    add_frontend_arguments(arg_parser)
+    arg_parser.add_argument("--function-jobs", type=int, default=1,
+                            help="число процессов для оптимизации и трансляции функций по отдельности")
+    arg_parser.add_argument("--emit-ir", action="store_true",
+                            help="записать в выходной файл оптимизированный IR (формат .ir) вместо NASM")
+    add_cache_arguments(arg_parser)
+    add_timing_arguments(arg_parser)
+    return arg_parser
+
+
+def compile_options(args) -> dict:
+    """Опции компиляции из разобранных аргументов — без путей к файлам, пути абсолютные."""
+    options = {name: value for name, value in vars(args).items()
+               if name not in ("source_path", "output_path")}
+    for name in PATH_OPTIONS:
+        if options.get(name):
+            options[name] = os.path.abspath(options[name])
+    return options
+
+
+def check_compile_options(options) -> dict:
+    """Опции из запроса к серверу: только те, что разбирает make_arg_parser(), и значения их типов."""
+    if not isinstance(options, dict):
+        raise Exception("Ошибка: опции компиляции должны быть JSON-объектом")
+    # Допустимые ключи и типы берутся из того же разбора, что у src.main
+    actions = {action.dest: action for action in make_arg_parser()._actions
+               if action.dest not in ("help", "source_path", "output_path")}
+    for name, value in options.items():
+        action = actions.get(name)
+        if action is None:
+            raise Exception(f"Ошибка: неизвестная опция компиляции '{name}'")
+        if action.nargs == 0:  # флаг
+            valid = isinstance(value, bool)
+        elif action.type is int:
+            valid = isinstance(value, int) and not isinstance(value, bool)
+        else:
+            valid = isinstance(value, str) or (value is None and action.choices is None)
+        if valid and action.choices is not None:
+            valid = value in action.choices
+        if not valid:
+            raise Exception(f"Ошибка: недопустимое значение опции '{name}': {value!r}")
+    return options
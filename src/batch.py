@@ -0,0 +1,136 @@
+import argparse
+import glob
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+from src.cache import DEFAULT_MAX_BYTES, StageCache
+from src.arguments import add_cache_arguments, add_frontend_arguments
+from src.main import compile_source, load_frontend_snapshot, make_options
+
+# Кэш и настройки создаются один раз на процесс-исполнитель, а не на каждый файл
+_worker_cache = None
+_worker_options = None
+
+
+def _init_worker(cache_dir, max_bytes, options):
+    global _worker_cache, _worker_options
+    _worker_options = options
+    _worker_cache = None
+    if options is not None:
+        load_frontend_snapshot(options)
+    if cache_dir:
+        key_options = options.cache_key() if options is not None else None
+        _worker_cache = StageCache(cache_dir, max_bytes=max_bytes, options=key_options)
+
+
+def _compile_one(source_file: str, output_file: str) -> dict:
+    started = time.perf_counter()
+    hits_before = _worker_cache.hits if _worker_cache is not None else 0
+    try:
+        with redirect_stdout(io.StringIO()):
+            compile_source(source_file, output_file, cache=_worker_cache, options=_worker_options)
+    except Exception as e:
+        ok, error = False, f"{type(e).__name__}: {e}"
+    else:
+        ok, error = True, None
+    return {
+        "source": source_file,
+        "output": output_file,
+        "ok": ok,
+        "error": error,
+        "cached": _worker_cache is not None and _worker_cache.hits > hits_before,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def expand_sources(patterns) -> list:
+    """Раскрывает glob-шаблоны (включая **) в упорядоченный список файлов без повторов."""
+    sources = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            path = os.path.normpath(path)
+            if path not in seen:
+                seen.add(path)
+                sources.append(path)
+    return sources
+
+
+def output_paths(sources, output_dir: str) -> list:
+    """Сохраняет относительную структуру каталогов, чтобы a/x.my и b/x.my не конфликтовали."""
+    if not sources:
+        return []
+    dirs = [os.path.dirname(os.path.abspath(s)) for s in sources]
+    root = os.path.commonpath(dirs)
+    outputs = []
+    for source in sources:
+        rel = os.path.relpath(os.path.abspath(source), root)
+        outputs.append(os.path.join(output_dir, os.path.splitext(rel)[0] + ".asm"))
+    return outputs
+
+
+def compile_batch(sources, output_dir: str, jobs: int = None, cache_dir: str = None,
+                  cache_max_bytes: int = None, options=None) -> list:
+    """Компилирует файлы на пуле процессов (по умолчанию — по одному на ядро).
+
+    Возвращает результаты в порядке входного списка.
+    """
+    outputs = output_paths(sources, output_dir)
+    jobs = jobs or os.cpu_count() or 1
+    init_args = (cache_dir, cache_max_bytes or DEFAULT_MAX_BYTES, options)
+    if jobs == 1 or len(sources) <= 1:
+        _init_worker(*init_args)
+        return [_compile_one(s, o) for s, o in zip(sources, outputs)]
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(sources)),
+                             initializer=_init_worker, initargs=init_args) as pool:
+        futures = [pool.submit(_compile_one, s, o) for s, o in zip(sources, outputs)]
+        return [f.result() for f in futures]
+
+
+def format_summary(results, wall_seconds: float) -> str:
+    lines = []
+    width = max([len(r["source"]) for r in results] + [4])
+    lines.append(f"{'Файл':<{width}}  {'Статус':<8}  {'Время, мс':>10}")
+    for r in results:
+        status = "кэш" if r["cached"] else ("ok" if r["ok"] else "ошибка")
+        lines.append(f"{r['source']:<{width}}  {status:<8}  {r['seconds'] * 1000:>10.1f}")
+        if r["error"]:
+            lines.append(f"    ❌ {r['error']}")
+    failed = sum(1 for r in results if not r["ok"])
+    cpu_total = sum(r["seconds"] for r in results)
+    lines.append(f"Итого: {len(results)} файлов, ошибок: {failed}, "
+                 f"суммарно {cpu_total:.2f} с, по часам {wall_seconds:.2f} с")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(prog="python -m src.batch",
+                                         description="Пакетная компиляция файлов MyLang")
+    arg_parser.add_argument("sources", nargs="+", help="файлы .my или glob-шаблоны")
+    arg_parser.add_argument("-o", "--output-dir", required=True, help="каталог для .asm")
+    arg_parser.add_argument("-j", "--jobs", type=int, default=None,
+                            help="число процессов (по умолчанию — число ядер)")
+    add_frontend_arguments(arg_parser)
+    add_cache_arguments(arg_parser)
+    args = arg_parser.parse_args(argv)
+
+    sources = expand_sources(args.sources)
+    if not sources:
+        print("❗ Не найдено ни одного входного файла")
+        return 1
+
+    started = time.perf_counter()
+    results = compile_batch(sources, args.output_dir, jobs=args.jobs, cache_dir=args.cache_dir,
+                            cache_max_bytes=args.cache_size * 1024 * 1024, options=make_options(args))
+    print(format_summary(results, time.perf_counter() - started))
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
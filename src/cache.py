@@ -0,0 +1,216 @@
+import functools
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+
+from antlr4 import CommonTokenStream
+from antlr4.ListTokenSource import ListTokenSource
+from antlr4.Token import CommonToken
+
+from src.IR.text import IR_EXTENSION, format_ir, parse_ir
+from src.arguments import DEFAULT_CACHE_MB
+
+# Слоты кэша в порядке конвейера; у asm свой формат — готовый файл,
+# чтобы попадание стоило ровно одного копирования.
+CACHE_SLOTS = ("tokens", "ast", "ir", "optimized_ir", "asm")
+# IR хранится в текстовом формате src/IR/text.py: запись можно прочитать,
+# сравнить с другой сборкой или передать компилятору как файл .ir
+IR_SLOTS = ("ir", "optimized_ir")
+
+DEFAULT_MAX_BYTES = DEFAULT_CACHE_MB * 1024 * 1024
+
+_SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+@functools.lru_cache(maxsize=None)
+def compiler_fingerprint() -> str:
+    """Хэш исходников компилятора: любая правка кода инвалидирует кэш."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(_SRC_DIR):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, _SRC_DIR).encode("utf-8"))
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def encode_tokens(token_stream):
+    return [(t.type, t.text, t.channel, t.start, t.stop, t.line, t.column)
+            for t in token_stream.tokens]
+
+
+def decode_tokens(rows):
+    tokens = []
+    for index, (type_, text, channel, start, stop, line, column) in enumerate(rows):
+        token = CommonToken(type=type_, channel=channel, start=start, stop=stop)
+        token.text = text
+        token.line = line
+        token.column = column
+        token.tokenIndex = index
+        tokens.append(token)
+    return CommonTokenStream(ListTokenSource(tokens))
+
+
+class StageCache:
+    """Дисковый кэш промежуточных результатов конвейера.
+
+    Ключ — хэш исходника вместе с отпечатком компилятора и опциями, так что
+    один ключ адресует все стадии одного файла. Размер каталога ограничен
+    max_bytes; при переполнении удаляются давно не использованные записи
+    (время последнего доступа хранится в mtime файла).
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = DEFAULT_MAX_BYTES, options=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.options = options or {}
+        self.hits = 0
+        self.misses = 0
+        self._size = None
+
+    def key(self, source: bytes) -> str:
+        digest = hashlib.sha256()
+        digest.update(compiler_fingerprint().encode("ascii"))
+        digest.update(json.dumps(self.options, sort_keys=True).encode("utf-8"))
+        digest.update(source)
+        return digest.hexdigest()
+
+    def path(self, slot: str, key: str) -> str:
+        if slot == "asm":
+            ext = "asm"
+        elif slot in IR_SLOTS:
+            ext = IR_EXTENSION[1:]
+        else:
+            ext = "pkl"
+        return os.path.join(self.cache_dir, slot, f"{key}.{ext}")
+
+    def load(self, slot: str, key: str):
+        """Возвращает (True, значение) при попадании и (False, None) при промахе."""
+        path = self.path(slot, key)
+        try:
+            if slot == "asm":
+                with open(path, "r", encoding="utf-8") as f:
+                    value = f.read()
+            elif slot in IR_SLOTS:
+                with open(path, "r", encoding="utf-8") as f:
+                    value = parse_ir(f.read())
+            else:
+                with open(path, "rb") as f:
+                    value = pickle.load(f)
+                if slot == "tokens":
+                    value = decode_tokens(value)
+        except FileNotFoundError:
+            self.misses += 1
+            return False, None
+        except Exception:
+            # Битая запись (например, прерванная запись другим процессом)
+            self._discard(path)
+            self.misses += 1
+            return False, None
+        self._touch(path)
+        self.hits += 1
+        return True, value
+
+    def latest(self, key: str, slots):
+        """Ищет самую позднюю из перечисленных стадий, которая есть в кэше."""
+        for slot in reversed(slots):
+            if os.path.exists(self.path(slot, key)):
+                found, value = self.load(slot, key)
+                if found:
+                    return slot, value
+        return None, None
+
+    def copy_asm(self, key: str, output_file: str) -> bool:
+        path = self.path("asm", key)
+        try:
+            os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+            shutil.copyfile(path, output_file)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        self._touch(path)
+        self.hits += 1
+        return True
+
+    def store(self, slot: str, key: str, value):
+        try:
+            if slot == "asm":
+                data = value.encode("utf-8")
+            elif slot in IR_SLOTS:
+                data = format_ir(value).encode("utf-8")
+            else:
+                if slot == "tokens":
+                    value = encode_tokens(value)
+                data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, RecursionError, TypeError, AttributeError):
+            # Не всё сериализуется (например, очень глубокие AST) — просто не кэшируем
+            return
+        path = self.path(slot, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # Перезаписанная запись уже учтена в размере — вычитаем её прежний объём
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        os.replace(tmp_path, path)
+
+        if self._size is None:
+            self._size = self._scan_size()
+        else:
+            self._size += len(data) - replaced
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= self.max_bytes:
+                break
+            self._discard(path)
+            total -= size
+        self._size = total
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self._size = 0
+
+    def _entries(self):
+        for slot in CACHE_SLOTS:
+            slot_dir = os.path.join(self.cache_dir, slot)
+            if not os.path.isdir(slot_dir):
+                continue
+            for entry in os.scandir(slot_dir):
+                if entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield entry.path, stat.st_mtime, stat.st_size
+
+    def _scan_size(self) -> int:
+        return sum(size for _, _, size in self._entries())
+
+    @staticmethod
+    def _touch(path: str):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _discard(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,54 @@
+import json
+import os
+import socket
+import sys
+import tempfile
+
+from src.arguments import compile_options, make_arg_parser
+
+# Клиент намеренно не импортирует antlr4 и конвейер компилятора:
+# весь смысл в том, чтобы процесс стартовал мгновенно, а работу делал сервер.
+# Опции те же, что у src.main: разбор общий, из лёгкого src.arguments.
+DEFAULT_SOCKET = os.environ.get(
+    "MYLANG_SERVER_SOCKET",
+    os.path.join(tempfile.gettempdir(), "mylang-compiler.sock"),
+)
+
+
+def send_request(payload: dict, socket_path: str = DEFAULT_SOCKET) -> dict:
+    """Отправляет один JSON-запрос серверу компиляции и возвращает ответ."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8"))
+        with sock.makefile("r", encoding="utf-8") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("Сервер компиляции закрыл соединение без ответа")
+    return json.loads(line)
+
+
+def main(argv=None) -> int:
+    args = make_arg_parser(prog="python -m src.client").parse_args(argv)
+    payload = {
+        "command": "compile",
+        "source": os.path.abspath(args.source_path),
+        "output": os.path.abspath(args.output_path),
+        "options": compile_options(args),
+    }
+    try:
+        response = send_request(payload)
+    except OSError:
+        # Сервер не запущен — компилируем в этом же процессе, как src.main
+        from src.main import run
+        run(args)
+        return 0
+
+    print(response.get("log", ""), end="")
+    if not response.get("ok"):
+        print(f"❌ Ошибка компиляции: {response.get('error')}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
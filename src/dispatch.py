@@ -0,0 +1,47 @@
+class DispatchTable(dict):
+    """Таблица «класс узла → обработчик» для проходов компилятора.
+
+    Заполняется декоратором on() при определении класса прохода, то есть один
+    раз, а не на каждом узле. Диспетчеризация — один поиск в словаре по
+    type(node) и вызов функции:
+
+        class Pass:
+            dispatch = DispatchTable()
+
+            def visit(self, node):
+                return self.dispatch[type(node)](self, node)
+
+            @dispatch.on(BinaryOp)
+            def visit_BinaryOp(self, node): ...
+
+    Для класса без своего обработчика берётся обработчик ближайшего предка
+    (по MRO), иначе — обработчик по умолчанию; результат кэшируется в таблице.
+    """
+
+    def __init__(self, default=None):
+        super().__init__()
+        self.default = default
+
+    def on(self, *node_types):
+        def register(handler):
+            for node_type in node_types:
+                self[node_type] = handler
+            return handler
+        return register
+
+    def otherwise(self, handler):
+        """Декоратор для обработчика по умолчанию."""
+        self.default = handler
+        return handler
+
+    def __missing__(self, node_type):
+        for base in node_type.__mro__[1:]:
+            if dict.__contains__(self, base):
+                handler = dict.__getitem__(self, base)
+                break
+        else:
+            handler = self.default
+            if handler is None:
+                raise KeyError(node_type)
+        self[node_type] = handler
+        return handler
@@ -0,0 +1,9 @@
+class MyLangSyntaxError(Exception):
+    """Синтаксическая ошибка с позицией во входном файле."""
+
+    def __init__(self, message: str, line: int = None, column: int = None):
+        if line is not None:
+            message = f"line {line}:{column} {message}"
+        super().__init__(message)
+        self.line = line
+        self.column = column
@@ -0,0 +1,208 @@
+import re
+
+from antlr4 import InputStream
+from antlr4.CommonTokenFactory import CommonTokenFactory
+from antlr4.Lexer import TokenSource
+from antlr4.Recognizer import Recognizer
+from antlr4.Token import CommonToken, Token
+
+# Типы токенов совпадают с MyLangLexer/MyLangParser (проверяется тестом
+# соответствия). Сгенерированные модули здесь не импортируются, чтобы не
+# платить за десериализацию ATN, когда используется только этот лексер.
+LE = 1
+GE = 2
+LBRACE = 3
+RBRACE = 4
+LPAREN = 5
+RPAREN = 6
+SEMI = 7
+COLON = 8
+COMMA = 9
+ASSIGN = 10
+PLUS = 11
+MINUS = 12
+STAR = 13
+SLASH = 14
+LT = 15
+GT = 16
+EQ = 17
+NEQ = 18
+AND = 19
+OR = 20
+NOT = 21
+LET = 22
+IF = 23
+ELSE = 24
+WHILE = 25
+FOR = 26
+TRY = 27
+CATCH = 28
+MATCH = 29
+CASE = 30
+BREAK = 31
+FUNCTION = 32
+RETURN = 33
+PRINT = 34
+DEFAULT = 35
+INT = 36
+FLOAT = 37
+STRING = 38
+BOOL = 39
+VOID = 40
+ID = 41
+INT_LITERAL = 42
+FLOAT_LITERAL = 43
+STRING_LITERAL = 44
+BOOL_LITERAL = 45
+WS = 46
+
+KEYWORDS = {
+    "let": LET, "if": IF, "else": ELSE, "while": WHILE, "for": FOR,
+    "try": TRY, "catch": CATCH, "match": MATCH, "case": CASE, "break": BREAK,
+    "function": FUNCTION, "return": RETURN, "print": PRINT, "default": DEFAULT,
+    "int": INT, "float": FLOAT, "string": STRING, "bool": BOOL, "void": VOID,
+}
+# true/false в грамматике объявлены после ID, поэтому ANTLR отдаёт их как ID —
+# BOOL_LITERAL лексер не порождает никогда, и здесь тоже.
+
+OPERATORS = {
+    "<=": LE, ">=": GE, "==": EQ, "!=": NEQ, "&&": AND, "||": OR,
+    "{": LBRACE, "}": RBRACE, "(": LPAREN, ")": RPAREN, ";": SEMI, ":": COLON,
+    ",": COMMA, "=": ASSIGN, "+": PLUS, "-": MINUS, "*": STAR, "/": SLASH,
+    "<": LT, ">": GT, "!": NOT,
+}
+
+# Порядок альтернатив обеспечивает «самое длинное совпадение» как у ANTLR:
+# FLOAT раньше INT, двухсимвольные операторы раньше односимвольных,
+# ключевые слова распознаются как ID и уточняются по таблице.
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>[ \t\r\n]+)
+  | (?P<id>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<float>[0-9]+\.[0-9]+)
+  | (?P<int>[0-9]+)
+  | (?P<string>"[^"\r\n']*")
+  | (?P<op><=|>=|==|!=|&&|\|\||[{}();:,=+\-*/<>!])
+""", re.VERBOSE)
+
+_new_token = CommonToken.__new__
+
+# Символы, допустимые внутри строкового литерала
+_STRING_BODY_RE = re.compile(r"[^\"\r\n']*")
+
+
+class FastLexer(Recognizer, TokenSource):
+    """Рукописный табличный лексер, выдающий тот же поток токенов, что MyLangLexer.
+
+    Совпадают типы, текст, позиции (start/stop, line/column), каналы и
+    сообщения об ошибках распознавания, включая восстановление после них.
+    """
+
+    grammarFileName = "MyLang.g4"
+    # Нужна стратегии восстановления парсера для синтеза пропущенных токенов
+    _factory = CommonTokenFactory.DEFAULT
+
+    def __init__(self, input=None):
+        super().__init__()
+        if isinstance(input, str):
+            input = InputStream(input)
+        self._input = input
+        self._text = input.strdata if input is not None else ""
+        self._pos = 0
+        self.line = 1
+        self.column = 0
+        self._source_pair = (self, input)
+
+    def getInputStream(self):
+        return self._input
+
+    def getSourceName(self):
+        return self._input.name if self._input is not None else "<empty>"
+
+    def nextToken(self):
+        text = self._text
+        size = len(text)
+        while self._pos < size:
+            pos = self._pos
+            m = _TOKEN_RE.match(text, pos)
+            if m is None:
+                self._recover(pos)
+                continue
+            kind = m.lastgroup
+            end = m.end()
+            value = m.group()
+            if kind == "ws":
+                self._advance(value)
+                self._pos = end
+                continue
+            if kind == "id":
+                ttype = KEYWORDS.get(value, ID)
+            elif kind == "op":
+                ttype = OPERATORS[value]
+            elif kind == "int":
+                ttype = INT_LITERAL
+            elif kind == "float":
+                ttype = FLOAT_LITERAL
+            else:
+                ttype = STRING_LITERAL
+            token = self._make_token(ttype, pos, end - 1, value)
+            # В токенах (кроме пробельных) переводов строк не бывает
+            self.column += end - pos
+            self._pos = end
+            return token
+
+        return self._make_token(Token.EOF, size, size - 1, None)
+
+    def getAllTokens(self):
+        tokens = []
+        token = self.nextToken()
+        while token.type != Token.EOF:
+            tokens.append(token)
+            token = self.nextToken()
+        return tokens
+
+    def _make_token(self, ttype, start, stop, value):
+        # Заполняем слоты напрямую: CommonToken.__init__ заметно дороже
+        token = _new_token(CommonToken)
+        token.source = self._source_pair
+        token.type = ttype
+        token.channel = Token.DEFAULT_CHANNEL
+        token.start = start
+        token.stop = stop
+        token.tokenIndex = -1
+        token.line = self.line
+        token.column = self.column
+        token._text = value
+        return token
+
+    def _advance(self, chunk: str):
+        newlines = chunk.count("\n")
+        if newlines:
+            self.line += newlines
+            self.column = len(chunk) - chunk.rfind("\n") - 1
+        else:
+            self.column += len(chunk)
+
+    def _recover(self, pos: int):
+        """Повторяет поведение ANTLR при token recognition error.
+
+        ANTLR продвигается, пока префикс может начинать какой-то токен,
+        сообщает об ошибке с текстом до первого неподходящего символа
+        включительно и пропускает этот символ.
+        """
+        text = self._text
+        size = len(text)
+        first = text[pos]
+        if first in "&|":
+            fail = pos + 1
+        elif first == '"':
+            fail = _STRING_BODY_RE.match(text, pos + 1).end()
+        else:
+            fail = pos
+        resume = min(fail + 1, size)
+        bad = text[pos:resume]
+        display = bad.replace("\n", "\\n").replace("\t", "\\t").replace("\r", "\\r")
+        self.getErrorListenerDispatch().syntaxError(
+            self, None, self.line, self.column,
+            f"token recognition error at: '{display}'", None)
+        self._advance(bad)
+        self._pos = resume
@@ -1,56 +1,266 @@
 import sys
-from antlr4 import FileStream, CommonTokenStream
+from antlr4 import CommonTokenStream, InputStream
 from src.lexer.MyLangLexer import MyLangLexer
+from src.lexer.fast_lexer import FastLexer
 from src.parser.MyLangParser import MyLangParser
+from src.parser.rd_parser import RDParser
+from src.parser.two_stage import TwoStageParser
+from src.parser.atn_snapshot import load_snapshot
 from src.AST.ASTBuilder import ASTBuilder
 from src.semantic.semantic_analyzer import SemanticAnalyzer
 from src.IR.ir_generator import IRGenerator
+from src.IR.fused_generator import FusedIRGenerator
+from src.IR.module import IRModule
+from src.IR.text import IR_EXTENSION, format_ir, parse_ir
 from src.optimizer.ir_optimizer import IROptimizer
 from src.Nasm.nasm_generator import NASMGenerator
+from src.cache import StageCache
+from src.pass_timer import PassTimer
+from src.arguments import make_arg_parser
 import os
 
 
-def compile_source(source_file: str, output_file: str):
-    print(f"🔧 Компиляция файла: {source_file}")
+class CompileOptions:
+    """Настройки одного запуска конвейера.
+
+    cache_key() возвращает только те настройки, что влияют на результат,
+    — служебные (таймер) в ключ кэша не попадают.
+    """
+
+    def __init__(self, timer: PassTimer = None, lexer: str = "antlr", parser: str = "antlr",
+                 prediction: str = "sll-ll", atn_snapshot: str = None, fused: bool = False,
+                 function_jobs: int = 1):
+        self.timer = timer
+        # Оба лексера выдают одинаковый поток токенов, а оба парсера — одинаковое AST,
+        # поэтому в ключ кэша выбор не входит
+        self.lexer = lexer
+        self.parser = parser
+        # Режим предсказания ANTLR: SLL с откатом на LL или сразу полный LL
+        self.prediction = prediction
+        self.two_stage = TwoStageParser()
+        # Снимок прогретых DFA ANTLR, загружается один раз на процесс
+        self.atn_snapshot = atn_snapshot
+        # Семантический анализ и генерация IR одним обходом AST
+        self.fused = fused
+        # Процессов для оптимизации и трансляции функций; на результат не влияет
+        self.function_jobs = function_jobs
+
+    def cache_key(self) -> dict:
+        # В однопроходном режиме стадия semantic отдаёт непроверенное AST
+        return {"fused": True} if self.fused else {}
+
+
+LEXERS = {
+    "antlr": MyLangLexer,
+    "fast": FastLexer,
+}
 
-    # 1. Лексер и парсер
-    input_stream = FileStream(source_file, encoding="utf-8")
-    lexer = MyLangLexer(input_stream)
-    token_stream = CommonTokenStream(lexer)
-    parser = MyLangParser(token_stream)
-    tree = parser.program()
 
-    # 2. Построение AST
-    ast = ASTBuilder().visit(tree)
+def lex(input_stream, options: CompileOptions):
+    token_stream = CommonTokenStream(LEXERS[options.lexer](input_stream))
+    token_stream.fill()
+    return token_stream
+
+
+def parse(token_stream, options: CompileOptions):
+    # Рекурсивный спуск строит AST сразу, без дерева разбора ANTLR
+    if options.parser == "rd":
+        return RDParser(token_stream).parse()
+    if options.prediction == "ll":
+        return MyLangParser(token_stream).program()
+    fallbacks = options.two_stage.ll_fallbacks
+    tree = options.two_stage.parse(token_stream)
+    if options.two_stage.ll_fallbacks != fallbacks:
+        print("⚠️ SLL-разбор не удался, выполнен повторный разбор в режиме LL")
+    return tree
+
+
+def build_ast(tree, options: CompileOptions):
+    ast = tree if options.parser == "rd" else ASTBuilder().visit(tree)
     print("✅ AST построено")
+    return ast
+
 
-    # 3. Семантический анализ
+def analyze(ast, options: CompileOptions):
+    if options.fused:
+        # Проверка выполняется вместе с генерацией IR
+        return ast
     SemanticAnalyzer().analyze(ast)
     print("✅ Семантический анализ пройден")
+    return ast
+
 
-    # 4. Генерация IR
+def generate_ir(ast, options: CompileOptions):
+    if options.fused:
+        ir = FusedIRGenerator().generate(ast)
+        print("✅ Семантический анализ пройден, IR сгенерирован за один обход")
+        return IRModule.from_instructions(ir)
     ir = IRGenerator().generate(ast)
     print("✅ IR сгенерирован")
+    return IRModule.from_instructions(ir)
 
-    # 5. Оптимизация IR
-    optimized_ir = IROptimizer().optimize(ir)
+
+def optimize(module: IRModule, options: CompileOptions):
+    optimizer = IROptimizer()
+    optimized = optimizer.optimize_module(module, timer=options.timer, jobs=options.function_jobs)
     print("✅ IR оптимизирован")
+    for name, count in optimizer.stats.items():
+        if count:
+            action = "вынесено из циклов" if name == "loop_invariant_code_motion" else "убрано"
+            print(f"   {name}: {action} инструкций — {count}")
+    return optimized
 
-    # 6. Генерация NASM
-    nasm_code = NASMGenerator().generate(optimized_ir)
 
-    print("✅ Используется NASMGenerator из:", NASMGenerator.__module__)
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+def generate_nasm(module: IRModule, options: CompileOptions):
+    return NASMGenerator(jobs=options.function_jobs).generate(module)
+
+
+# Стадии конвейера: (имя, функция, слот кэша). Результат стадии со слотом
+# сохраняется в кэш, и с него же можно продолжить компиляцию.
+STAGES = [
+    ("lex", lex, "tokens"),
+    ("parse", parse, None),
+    ("ast", build_ast, None),
+    ("semantic", analyze, "ast"),
+    ("ir", generate_ir, "ir"),
+    ("optimize", optimize, "optimized_ir"),
+    ("nasm", generate_nasm, "asm"),
+]
+
+
+def stage_index(name: str) -> int:
+    return next(i for i, stage in enumerate(STAGES) if stage[0] == name)
+
+
+def compile_stream(input_stream, cache: StageCache = None, key: str = None,
+                   options: CompileOptions = None, first_stage: str = "lex",
+                   last_stage: str = "nasm"):
+    """Прогоняет конвейер со стадии first_stage по last_stage включительно.
+
+    По умолчанию вход — готовый ANTLR-поток, а результат — NASM-код; с
+    first_stage="optimize" вход — IRModule (например, прочитанный из .ir).
+    """
+    options = options or CompileOptions()
+    start, stop = stage_index(first_stage), stage_index(last_stage) + 1
+    value = input_stream
+    if cache is not None:
+        slots = [slot for _, _, slot in STAGES[start:stop] if slot]
+        slot, cached = cache.latest(key, slots)
+        if slot is not None:
+            print(f"♻️ Из кэша взята стадия: {slot}")
+            start = next(i for i, stage in enumerate(STAGES) if stage[2] == slot) + 1
+            value = cached
+
+    timer = options.timer
+    for name, stage, slot in STAGES[start:stop]:
+        if timer is not None:
+            value = timer.run(name, lambda v: stage(v, options), value)
+        else:
+            value = stage(value, options)
+        if cache is not None and slot:
+            cache.store(slot, key, value)
+    return value
+
+
+def write_output(output_file: str, nasm_code: str):
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
     with open(output_file, "w", encoding="utf-8") as f:
         f.write(nasm_code)
+
+
+def compile_source(source_file: str, output_file: str, cache: StageCache = None,
+                   options: CompileOptions = None, emit_ir: bool = False):
+    """Компилирует файл .my (или уже готовый IR из файла .ir) в NASM.
+
+    С emit_ir в output_file вместо NASM пишется оптимизированный IR в
+    текстовом формате src/IR/text.py.
+    """
+    print(f"🔧 Компиляция файла: {source_file}")
+
+    with open(source_file, "rb") as f:
+        source = f.read()
+
+    key = None
+    if cache is not None:
+        key = cache.key(source)
+        # Неизменённый файл стоит одного хэша и одного копирования
+        if not emit_ir and cache.copy_asm(key, output_file):
+            print(f"♻️ NASM-код взят из кэша и сохранён в {output_file}")
+            return
+
+    last_stage = "optimize" if emit_ir else "nasm"
+    if source_file.endswith(IR_EXTENSION):
+        # Фронтенд не нужен: IR читается из файла и идёт сразу в оптимизатор
+        module = parse_ir(source.decode("utf-8"))
+        print("✅ IR прочитан из файла")
+        result = compile_stream(module, cache, key, options, first_stage="optimize", last_stage=last_stage)
+    else:
+        input_stream = InputStream(source.decode("utf-8"))
+        input_stream.name = source_file
+        result = compile_stream(input_stream, cache, key, options, last_stage=last_stage)
+
+    if emit_ir:
+        write_output(output_file, format_ir(result))
+        print(f"✅ IR сохранён в {output_file}")
+        return
+    print("✅ Используется NASMGenerator из:", NASMGenerator.__module__)
+    write_output(output_file, result)
     print(f"✅ NASM-код сохранён в {output_file}")
 
 
-if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("❗ Использование: python main.py <входной_файл.my> <выходной_файл.asm>")
-        sys.exit(1)
+def make_cache(args, options: CompileOptions = None) -> StageCache:
+    if not args.cache_dir:
+        return None
+    options = options or CompileOptions()
+    return StageCache(args.cache_dir, max_bytes=args.cache_size * 1024 * 1024,
+                      options=options.cache_key())
+
+
+def make_options(args, timer: PassTimer = None) -> CompileOptions:
+    return CompileOptions(timer=timer, lexer=args.lexer, parser=args.parser,
+                          prediction=args.prediction, atn_snapshot=args.atn_snapshot, fused=args.fused,
+                          function_jobs=getattr(args, "function_jobs", 1))
 
-    source_path = sys.argv[1]
-    output_path = sys.argv[2]
-    compile_source(source_path, output_path)
+
+def load_frontend_snapshot(options: CompileOptions):
+    """Прогревает ANTLR-фронтенд процесса снимком DFA, если он задан."""
+    if not options.atn_snapshot:
+        return
+    if not load_snapshot(options.atn_snapshot):
+        print(f"⚠️ Снимок ATN {options.atn_snapshot} не загружен: нет файла или он устарел",
+              file=sys.stderr)
+
+
+def make_timer(args) -> PassTimer:
+    if args.time_passes or args.mem_passes or args.passes_json:
+        return PassTimer(track_memory=args.mem_passes)
+    return None
+
+
+def report_timer(timer: PassTimer, args):
+    if timer is None:
+        return
+    if args.time_passes or args.mem_passes:
+        print(timer.format_table())
+    if args.passes_json:
+        with open(args.passes_json, "w", encoding="utf-8") as f:
+            f.write(timer.to_json())
+
+
+def run(args):
+    """Компиляция одного файла по разобранным аргументам make_arg_parser()."""
+    compile_options = make_options(args, timer=make_timer(args))
+    load_frontend_snapshot(compile_options)
+    compile_source(args.source_path, args.output_path,
+                   cache=make_cache(args, compile_options), options=compile_options,
+                   emit_ir=args.emit_ir)
+    report_timer(compile_options.timer, args)
+
+
+def main(argv=None) -> int:
+    run(make_arg_parser().parse_args(argv))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
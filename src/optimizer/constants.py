@@ -0,0 +1,197 @@
+"""Свёртка и распространение констант: общие шаги для constant_folding
+и условного распространения по CFG (src/optimizer/sccp.py)."""
+import copy
+import functools
+import math
+import operator
+import struct
+from collections import Counter
+
+from src.IR.instructions import *
+
+COMPARISONS = {"==": operator.eq, "!=": operator.ne, "<": operator.lt,
+               "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+INT_MIN, INT_MAX = -2 ** 63, 2 ** 63 - 1
+# Целое можно подставить прямо в add/cmp/mov qword только как imm32
+IMM32 = range(-2 ** 31, 2 ** 31)
+
+
+def fold_binary(op, left, right, type_):
+    """Значение `left op right` для констант или None, если свернуть нельзя."""
+    if isinstance(left, StrConst) or isinstance(right, StrConst):
+        return None
+    if op in ("&&", "||"):
+        if isinstance(left, BoolConst) and isinstance(right, BoolConst):
+            return BoolConst(left.value and right.value if op == "&&" else left.value or right.value)
+        return None
+    if isinstance(left, BoolConst) or isinstance(right, BoolConst):
+        # Логические значения только сравниваются на равенство
+        if op in ("==", "!=") and type(left) is type(right):
+            return BoolConst(COMPARISONS[op](left.value, right.value))
+        return None
+    a, b = left.value, right.value
+    if op in COMPARISONS:
+        if isinstance(a, float) or isinstance(b, float):
+            a, b = f32(a), f32(b)
+        return BoolConst(COMPARISONS[op](a, b))
+    if op not in ("+", "-", "*", "/"):
+        return None
+    if type_ == "float" or isinstance(a, float) or isinstance(b, float):
+        # float в сгенерированном коде 32-битный: считаем так же
+        a, b = f32(a), f32(b)
+        if op == "/" and b == 0:
+            return None  # деление на ноль остаётся проверке во время выполнения
+        value = f32({"+": lambda: a + b, "-": lambda: a - b,
+                     "*": lambda: a * b, "/": lambda: a / b}[op]())
+        if not math.isfinite(value):
+            return None  # inf и nan не записать константой в секцию данных NASM
+        return FloatConst(value)
+    if op == "+":
+        return IntConst(i64(a + b))
+    if op == "-":
+        return IntConst(i64(a - b))
+    if op == "*":
+        return IntConst(i64(a * b))
+    if b == 0 or (a == INT_MIN and b == -1):
+        return None  # idiv здесь падает во время выполнения
+    # idiv: частное округляется к нулю
+    quotient = abs(a) // abs(b)
+    return IntConst(quotient if (a < 0) == (b < 0) else -quotient)
+
+
+def fold_unary(op, operand):
+    if op == "!" and isinstance(operand, (BoolConst, IntConst)):
+        return BoolConst(not operand.value)
+    if op == "-" and isinstance(operand, IntConst):
+        return IntConst(i64(-operand.value))
+    if op == "-" and isinstance(operand, FloatConst):
+        return FloatConst(-operand.value)
+    return None
+
+
+def fold_logic(op, left, right):
+    """a && true → a, a && false → false (и так же для ||), если a — логическая
+    переменная. Возвращает константу, операнд или None."""
+    for known, other in ((left, right), (right, left)):
+        if isinstance(known, BoolConst) and not isinstance(other, BoolConst):
+            if known.value == (op == "||"):
+                return known
+            if getattr(other, "type_", None) == "bool":
+                return other
+    return None
+
+
+def f32(value) -> float:
+    return struct.unpack("f", struct.pack("f", value))[0]
+
+
+def i64(value) -> int:
+    # Целые в сгенерированном коде 64-битные и переполняются по модулю 2**64
+    return (value - INT_MIN) % 2 ** 64 + INT_MIN
+
+
+def holds(target, constant, type_) -> bool:
+    """Лежит ли в target после `target = constant (type=type_)` ровно эта константа."""
+    if isinstance(constant, FloatConst):
+        return type_ == "float" and target.type_ in (None, "float")
+    if isinstance(constant, (IntConst, BoolConst)):
+        return type_ in (None, constant.type_) and target.type_ in (None, constant.type_)
+    return False
+
+
+def substitutable(instr, constant) -> bool:
+    """Можно ли записать константу прямо в инструкцию вместо переменной.
+
+    NASMGenerator читает float-константы из .data только там, где тип
+    инструкции float, а целые идут в код непосредственным операндом.
+    """
+    float_context = getattr(instr, "type_", None) == "float"
+    if isinstance(constant, FloatConst):
+        return float_context and isinstance(instr, (IRAssign, IRBinary, IRPrint))
+    if isinstance(constant, IntConst):
+        return not float_context and constant.value in IMM32
+    return isinstance(constant, BoolConst) and not float_context
+
+
+def fold_instruction(instr, value):
+    """Инструкция с подставленными известными значениями; вычислимое
+    выражение заменяется присваиванием константы. Исходная не меняется.
+
+    value(operand) — известная константа операнда или None.
+    """
+    if isinstance(instr, IRBinary):
+        left, right = value(instr.left), value(instr.right)
+        folded = None
+        if left is not None and right is not None:
+            folded = fold_binary(instr.op, left, right, instr.type_)
+        elif instr.op in ("&&", "||"):
+            folded = fold_logic(instr.op, left or instr.left, right or instr.right)
+        if folded is not None:
+            return IRAssign(instr.result, folded, type_=instr.type_)
+    elif isinstance(instr, IRUnary):
+        operand = value(instr.operand)
+        folded = fold_unary(instr.op, operand) if operand is not None else None
+        if folded is not None:
+            return IRAssign(instr.result, folded, type_=folded.type_)
+
+    changed = None
+    for field in instr.use_fields:
+        operands = getattr(instr, field)
+        if isinstance(operands, list):
+            replaced = [_substitute(instr, operand, value) for operand in operands]
+            if replaced != operands:
+                changed = changed or copy.copy(instr)
+                setattr(changed, field, replaced)
+        elif operands is not None:
+            replaced = _substitute(instr, operands, value)
+            if replaced is not operands:
+                changed = changed or copy.copy(instr)
+                setattr(changed, field, replaced)
+    return changed or instr
+
+
+def _substitute(instr, operand, value):
+    constant = value(operand) if operand.is_name else None
+    if constant is not None and substitutable(instr, constant):
+        return constant
+    return operand
+
+
+def single_definitions(instructions) -> set:
+    """Временные с единственным определением: их значение одно на всё тело."""
+    counts = Counter(instr.defined() for instr in instructions
+                     if isinstance(instr, IRInstruction) and isinstance(instr.defined(), Temp))
+    return {temp for temp, count in counts.items() if count == 1}
+
+
+def propagate(instr, known: dict, stable=frozenset()):
+    """Один шаг прямого распространения констант.
+
+    known — операнд → константа, которая сейчас лежит в его памяти;
+    обновляется на месте. Возвращает свёрнутую инструкцию или None, если
+    она ничего не меняет (запись уже лежащего значения). После вызова
+    забываются все значения, кроме временных из stable.
+    """
+    value = functools.partial(_known_value, known)
+    instr = fold_instruction(instr, value)
+    if isinstance(instr, IRCall):
+        forget(known, stable)
+    target = instr.defined()
+    if target is not None and target.is_name:
+        constant = value(instr.value) if isinstance(instr, IRAssign) else None
+        if constant is not None and holds(target, constant, instr.type_):
+            if known.get(target) == constant:
+                return None
+            known[target] = constant
+        else:
+            known.pop(target, None)
+    return instr
+
+
+def forget(known: dict, stable=frozenset()):
+    for name in [name for name in known if name not in stable]:
+        del known[name]
+
+
+def _known_value(known, operand):
+    return operand if isinstance(operand, Const) else known.get(operand)
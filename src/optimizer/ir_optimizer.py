@@ -1,45 +1,164 @@
+import functools
+from collections import Counter
+
 from src.IR.instructions import *
+from src.IR.module import IRModule
+from src.optimizer.constants import forget, propagate, single_definitions
+from src.optimizer.licm import licm_body, pure_functions
+from src.optimizer.liveness import dead_store_body, function_reads
+from src.optimizer.sccp import sccp_body
+from src.optimizer.value_numbering import value_numbering_body
 
 
 class IROptimizer:
-    def optimize(self, instructions):
-        instructions = self.constant_folding(instructions)
-        instructions = self.copy_propagation(instructions)
-        instructions = self.remove_unused_temps(instructions)
-        instructions = self.remove_self_assignments(instructions)
-        instructions = self.simplify_if_true(instructions)
-        instructions = self.remove_dead_code_after_return(instructions)
+    PASSES = (
+        "constant_folding",
+        "conditional_constants",
+        "value_numbering",
+        "loop_invariant_code_motion",
+        "copy_propagation",
+        "remove_dead_stores",
+        "remove_self_assignments",
+        "simplify_if_true",
+        "remove_dead_code_after_return",
+    )
+
+    def __init__(self):
+        # Сколько инструкций убрал проход (только для проходов, которые считают)
+        self.stats = Counter()
+        # Имя единицы, когда на вход идёт тело одной функции, а не плоский IR
+        self.unit = None
+        # Сведения о других функциях модуля, когда на вход идёт тело одной единицы:
+        # какие переменные они читают и вызовы каких можно выносить из циклов
+        self.call_reads = None
+        self.pure_functions = None
+
+    def optimize(self, instructions, timer=None):
+        for name in self.PASSES:
+            ir_pass = getattr(self, name)
+            if timer is not None:
+                instructions = timer.run(name, ir_pass, instructions)
+            else:
+                instructions = ir_pass(instructions)
         return instructions
 
+    def optimize_module(self, module: IRModule, timer=None, jobs: int = 1) -> IRModule:
+        """Оптимизирует каждую функцию модуля отдельно, при jobs > 1 — на пуле процессов.
+
+        С таймером проходы идут по очереди над всеми функциями, чтобы время
+        каждого прохода было видно отдельно.
+        """
+        self.call_reads = function_reads(module)
+        self.pure_functions = pure_functions(module)
+        if timer is None:
+            results = module.map_units(
+                functools.partial(_optimize_unit, self.call_reads, self.pure_functions), jobs)
+            for _, stats in results:
+                self.stats.update(stats)
+            return module.with_bodies([body for body, _ in results])
+        for name in self.PASSES:
+            module = timer.run(name, lambda m: m.with_bodies(
+                [self.run_on_unit(name, unit) for unit in m.units()]), module)
+        return module
+
+    def run_on_unit(self, name: str, unit):
+        """Проход name над телом одной единицы модуля."""
+        self.unit = unit.name
+        try:
+            return getattr(self, name)(unit.body)
+        finally:
+            self.unit = None
+
+    def optimize_unit(self, unit):
+        self.unit = unit.name
+        try:
+            return self.optimize(unit.body)
+        finally:
+            self.unit = None
+
+    def per_unit(self, instructions, func):
+        """func(body, name) для каждой функции плоского IR или для одного тела."""
+        if self.unit is not None:
+            return func(instructions, self.unit)
+        module = IRModule.from_instructions(instructions)
+        for unit in module.units():
+            unit.body = func(unit.body, unit.name)
+        return module.instructions()
+
+    NUMERIC = (IntConst, FloatConst)
+
     def constant_folding(self, instructions):
-        result = []
+        """Распространение и свёртка констант: арифметика, сравнения, &&, ||, !.
+
+        Значения прослеживаются через временные и переменные пользователя
+        вперёд по коду. На метке (туда можно прийти переходом), после вызова
+        (функция может изменить глобальные переменные) и на границе функции
+        значения переменных забываются; временная с единственным
+        определением остаётся известной и после них. Тело функции
+        разбирается отдельно от окружающего кода.
+        """
+        stable = single_definitions(instructions)
+        known, outer, result = {}, [], []
         for instr in instructions:
-            if isinstance(instr, IRBinary) and isinstance(instr.left, (int, float)) and isinstance(instr.right, (int, float)):
-                try:
-                    if instr.op == "+":
-                        v = instr.left + instr.right
-                    elif instr.op == "-":
-                        v = instr.left - instr.right
-                    elif instr.op == "*":
-                        v = instr.left * instr.right
-                    elif instr.op == "/":
-                        v = instr.left / instr.right if instr.right != 0 else 0
-                    else:
-                        result.append(instr)
-                        continue
-                    result.append(IRAssign(instr.result, v))
-                except Exception:
-                    result.append(instr)
-            else:
-                result.append(instr)
+            if isinstance(instr, IRFunctionStart):
+                # Объявление функции ничего не исполняет: после её тела
+                # продолжаем с тем, что было известно до него
+                outer.append(known)
+                known = {}
+            elif isinstance(instr, IRFunctionEnd):
+                known = outer.pop() if outer else {}
+            elif isinstance(instr, IRLabel):
+                forget(known, stable)
+            elif isinstance(instr, IRInstruction):
+                instr = propagate(instr, known, stable)
+                if instr is None:
+                    continue  # в памяти уже это значение
+            result.append(instr)
         return result
 
+    def conditional_constants(self, instructions):
+        """Условное распространение констант по CFG (src/optimizer/sccp.py).
+
+        Переходы с условием, известным на всех путях, становятся безусловными
+        или исчезают, а недостижимые после этого блоки удаляются. Плоский IR
+        разбирается по функциям, каждая — своим графом.
+        """
+        return self.per_unit(instructions, sccp_body)
+
+    def value_numbering(self, instructions):
+        """Нумерация значений (src/optimizer/value_numbering.py): повторное
+        вычисление выражения заменяется результатом прежнего — внутри блока
+        и по дереву доминаторов. Число убранных вычислений — в stats.
+        """
+        def number(body, name):
+            body, eliminated = value_numbering_body(body, name)
+            self.stats["value_numbering"] += eliminated
+            return body
+        return self.per_unit(instructions, number)
+
+    def loop_invariant_code_motion(self, instructions):
+        """Вынос инвариантных вычислений из циклов (src/optimizer/licm.py).
+
+        IRBinary, IRUnary и вызовы чистых функций, операнды которых в цикле
+        не меняются, переносятся в предзаголовок цикла и выполняются один
+        раз. Число вынесенных — в stats.
+        """
+        pure = self.pure_functions
+        if self.unit is None:
+            pure = pure_functions(IRModule.from_instructions(instructions))
+
+        def hoist(body, name):
+            body, hoisted = licm_body(body, name, pure)
+            self.stats["loop_invariant_code_motion"] += hoisted
+            return body
+        return self.per_unit(instructions, hoist)
+
     def copy_propagation(self, instructions):
         result = []
         env = {}
 
         def is_temp(n):
-            return isinstance(n, str) and n.startswith("t")
+            return isinstance(n, Temp)
 
         for instr in instructions:
 
@@ -50,7 +169,6 @@ class IROptimizer:
 
             if isinstance(instr, IRAssign) \
                     and is_temp(instr.target) \
-                    and isinstance(instr.value, str) \
                     and is_temp(instr.value):
                 src = instr.value
                 final = env.get(src, src)
@@ -84,16 +202,33 @@ class IROptimizer:
                 used.update(instr.args)
             elif isinstance(instr, IRIfGoto):
                 used.add(instr.condition)
-            elif isinstance(instr, IRAssign) and isinstance(instr.value, str):
+            elif isinstance(instr, IRAssign) and instr.value.is_name:
                 used.add(instr.value)
 
         cleaned = []
         for instr in instructions:
-            if isinstance(instr, IRAssign) and isinstance(instr.target, str) and instr.target.startswith("t") and instr.target not in used:
+            if isinstance(instr, IRAssign) and isinstance(instr.target, Temp) and instr.target not in used:
                 continue
             cleaned.append(instr)
         return cleaned
 
+    def remove_dead_stores(self, instructions):
+        """Удаление мёртвых записей по живости на CFG (src/optimizer/liveness.py).
+
+        В отличие от remove_unused_temps убирает и вычисления (IRBinary,
+        IRUnary), и записи в переменные пользователя, которые дальше никто
+        не прочитает, — до неподвижной точки. Число убранных — в stats.
+        """
+        call_reads = self.call_reads
+        if self.unit is None:
+            call_reads = function_reads(IRModule.from_instructions(instructions))
+
+        def sweep(body, name):
+            body, removed = dead_store_body(body, name, call_reads)
+            self.stats["remove_dead_stores"] += removed
+            return body
+        return self.per_unit(instructions, sweep)
+
     def remove_self_assignments(self, instructions):
         return [instr for instr in instructions if not (isinstance(instr, IRAssign) and instr.target == instr.value)]
 
@@ -101,20 +236,16 @@ class IROptimizer:
         result = []
         for instr in instructions:
             if isinstance(instr, IRIfGoto):
-                if instr.condition == "true" or instr.condition is True:
-                    result.append(IRGoto(instr.label))
-                elif instr.condition == "false" or instr.condition is False:
-                    continue
-                elif isinstance(instr.condition, str) and instr.condition.startswith("t"):
-
+                condition = instr.condition
+                if isinstance(condition, BoolConst):
+                    # Переход выполняется, если значение условия не равно negated
+                    if condition.value != instr.negated:
+                        result.append(IRGoto(instr.label))
+                elif isinstance(condition, Temp):
                     prev = result[-1] if result else None
-                    if isinstance(prev, IRAssign) and prev.target == instr.condition:
-                        if prev.value == "!True":
-                            continue
-                        if prev.value == "!False":
+                    if isinstance(prev, IRAssign) and prev.target == condition and isinstance(prev.value, BoolConst):
+                        if prev.value.value != instr.negated:
                             result.append(IRGoto(instr.label))
-                        else:
-                            result.append(instr)
                     else:
                         result.append(instr)
                 else:
@@ -127,7 +258,8 @@ class IROptimizer:
         result = []
         skip = False
         for instr in instructions:
-            if isinstance(instr, (IRFunctionStart, IRFunctionEnd)):
+            if isinstance(instr, (IRFunctionStart, IRFunctionEnd, IRLabel)):
+                # На метку можно прийти переходом — после неё код снова достижим
                 result.append(instr)
                 skip = False
                 continue
@@ -137,3 +269,10 @@ class IROptimizer:
             if isinstance(instr, IRReturn):
                 skip = True
         return result
+
+
+def _optimize_unit(call_reads, pure, unit):
+    optimizer = IROptimizer()
+    optimizer.call_reads = call_reads
+    optimizer.pure_functions = pure
+    return optimizer.optimize_unit(unit), optimizer.stats
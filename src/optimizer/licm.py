@@ -0,0 +1,158 @@
+"""Вынос инвариантных вычислений из циклов (LICM).
+
+Циклы — естественные циклы CFG (ControlFlowGraph.loops), от внутренних к
+внешним: вынесенное из внутреннего цикла попадает в его предзаголовок и
+при следующем, внешнем цикле может уйти ещё выше.
+"""
+from src.IR.cfg import ControlFlowGraph
+from src.IR.instructions import *
+from src.IR.module import FunctionUnit
+from src.optimizer.constants import single_definitions
+
+# Инструкции, которые может выполнить чистая функция
+PURE_BODY = (IRAssign, IRBinary, IRUnary, IRReturn, IRLabel, IRGoto, IRIfGoto)
+
+
+def pure_functions(module) -> dict:
+    """Функции, вызов которых можно вынести из цикла: имя → параметры.
+
+    Такая функция не печатает, никого не вызывает, не зацикливается, пишет
+    только свои временные, читает только их и параметры и не делит на
+    возможный ноль. Её параметры (это глобальная память, которую пишет
+    вызывающий) не встречаются ни в одной другой единице — вынесенный
+    вызов меняет только состояние самой функции.
+    """
+    names = {unit.name: _names(unit) for unit in module.units()}
+    pure = {}
+    for unit in module.functions:
+        params = set(unit.params)
+        if not all(_pure_instruction(instr, params) for instr in unit.body):
+            continue
+        if any(params & other for name, other in names.items() if name != unit.name):
+            continue
+        if ControlFlowGraph.from_unit(unit).loops:
+            continue
+        pure[unit.name] = list(unit.params)
+    return pure
+
+
+def _names(unit) -> set:
+    names = set(unit.params)
+    for instr in unit.body:
+        if isinstance(instr, IRInstruction):
+            names.update(name for name in (instr.defined(), *instr.used()) if name is not None and name.is_name)
+    return names
+
+
+def _pure_instruction(instr, params) -> bool:
+    if not isinstance(instr, PURE_BODY):
+        return False
+    target = instr.defined()
+    if target is not None and not isinstance(target, Temp):
+        return False
+    if any(name.is_name and not isinstance(name, Temp) and name not in params for name in instr.used()):
+        return False
+    return not isinstance(instr, IRBinary) or _cannot_fault(instr)
+
+
+def _cannot_fault(instr) -> bool:
+    # Деление на ноль завершает программу: выносить можно только деление на известное ненулевое
+    return instr.op != "/" or (instr.right.is_const and instr.right.value != 0)
+
+
+class LoopInvariantMotion:
+    """LICM над одним графом; hoisted — сколько инструкций вынесено.
+
+    Выносится вычисление во временную с единственным определением, все
+    чтения которой им доминируются, если его операнды в цикле не пишутся.
+    Вызов внутри цикла может изменить переменные, а в функции (через
+    рекурсию) и временные — тогда инвариантны только константы и то, что
+    вызов изменить не может.
+    """
+
+    def __init__(self, cfg: ControlFlowGraph, is_main: bool = True, pure=None):
+        self.cfg = cfg
+        self.is_main = is_main
+        self.pure = pure or {}
+        self.stable = single_definitions(instr for block in cfg.blocks for instr in block.instructions)
+        self.hoisted = 0
+
+    def run(self) -> list:
+        for loop in list(self.cfg.loops):  # внутренние раньше внешних
+            if self.cfg.reachable(loop.header):
+                self.hoist_loop(loop)
+        return self.cfg.linearize()
+
+    def hoist_loop(self, loop):
+        blocks = [block for block in self.cfg.blocks if block in loop.blocks]
+        instrs = [instr for block in blocks for instr in block.instructions if isinstance(instr, IRInstruction)]
+        calls = [instr for instr in instrs if isinstance(instr, IRCall)]
+        clobbering = any(call.name not in self.pure for call in calls)
+        defined = {instr.defined() for instr in instrs} - {None}
+        uses = self.uses()
+
+        def invariant(operand) -> bool:
+            if operand.is_const:
+                return True
+            if operand in defined:
+                return False
+            # Непростой вызов пишет переменные, а при рекурсии — и временные функции
+            return not clobbering or (isinstance(operand, Temp) and self.is_main)
+
+        # Порядок выноса сохраняет зависимости: операнды выносятся раньше
+        moved, moved_ids = [], set()
+        changed = True
+        while changed:
+            changed = False
+            for block in blocks:
+                for i, instr in enumerate(block.instructions):
+                    if id(instr) in moved_ids or not self.movable(instr):
+                        continue
+                    if all(invariant(operand) for operand in instr.used()) \
+                            and self.dominates_uses(block, i, instr.defined(), uses):
+                        moved.append(instr)
+                        moved_ids.add(id(instr))
+                        defined.discard(instr.defined())
+                        changed = True
+        if not moved:
+            return
+        preheader = self.cfg.preheader(loop)
+        for block in blocks:
+            block.instructions = [instr for instr in block.instructions if id(instr) not in moved_ids]
+        at = len(preheader.instructions) - (1 if preheader.terminator is not None else 0)
+        preheader.instructions[at:at] = moved
+        self.hoisted += len(moved)
+
+    def movable(self, instr) -> bool:
+        target = instr.defined() if isinstance(instr, IRInstruction) else None
+        if target not in self.stable:
+            return False
+        if isinstance(instr, IRUnary):
+            return True
+        if isinstance(instr, IRBinary):
+            return _cannot_fault(instr)
+        # Результат чистой функции зависит только от аргументов
+        return isinstance(instr, IRCall) and instr.name in self.pure
+
+    def uses(self) -> dict:
+        """Имя → [(блок, позиция)] всех чтений в графе."""
+        uses = {}
+        for block in self.cfg.blocks:
+            for i, instr in enumerate(block.instructions):
+                if isinstance(instr, IRInstruction):
+                    for name in instr.used():
+                        if name.is_name:
+                            uses.setdefault(name, []).append((block, i))
+        return uses
+
+    def dominates_uses(self, block, index: int, target, uses: dict) -> bool:
+        # Каждое чтение видит значение именно этого определения
+        return all((use is block and i > index) or (use is not block and self.cfg.dominates(block, use))
+                   for use, i in uses.get(target, ()))
+
+
+def licm_body(body, name: str = "main", pure=None):
+    """LICM для тела одной единицы: (новое тело, число вынесенных инструкций)."""
+    unit = FunctionUnit(name, body=body)
+    motion = LoopInvariantMotion(ControlFlowGraph.from_unit(unit), unit.is_main, pure)
+    return motion.run(), motion.hoisted
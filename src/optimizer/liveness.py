@@ -0,0 +1,107 @@
+"""Обратный анализ живости по CFG и удаление мёртвых записей.
+
+Все имена — глобальная память, поэтому живость учитывает, кто ещё может
+прочитать переменную: вызванная функция читает переменные (но не
+временные вызывающего), а после выхода из функции её переменные может
+прочитать вызывающий. После конца main не читается ничего.
+"""
+from src.IR.cfg import ControlFlowGraph
+from src.IR.instructions import *
+from src.IR.module import FunctionUnit
+
+
+def removable(instr) -> bool:
+    """Инструкция без побочных эффектов: её можно убрать, если результат не читают."""
+    if isinstance(instr, (IRAssign, IRUnary)):
+        return True
+    if isinstance(instr, IRBinary):
+        # Деление проверяет делитель и при нуле завершает программу
+        return instr.op != "/" or (instr.right.is_const and instr.right.value != 0)
+    return False
+
+
+class Liveness:
+    """Живые на выходе каждого блока имена; пересчитывается до неподвижной точки."""
+
+    def __init__(self, cfg: ControlFlowGraph, is_main: bool = True, call_reads=None):
+        self.cfg = cfg
+        variables = {name for block in cfg.blocks for instr in block.instructions
+                     if isinstance(instr, IRInstruction)
+                     for name in (instr.defined(), *instr.used())
+                     if isinstance(name, Var)}
+        # Что может прочитать вызванная функция: если неизвестно — любая переменная
+        self.call_live = variables if call_reads is None else variables & set(call_reads)
+        self.exit_live = frozenset() if is_main else frozenset(variables)
+        self.live_out = {}
+
+    def compute(self):
+        live_in = {block: set() for block in self.cfg.blocks}
+        order = list(reversed(self.cfg.blocks))
+        changed = True
+        while changed:
+            changed = False
+            for block in order:
+                out = self.out_of(block, live_in)
+                self.live_out[block] = out
+                new_in = self.transfer(block, set(out))
+                if new_in != live_in[block]:
+                    live_in[block] = new_in
+                    changed = True
+        return self
+
+    def out_of(self, block, live_in) -> set:
+        if not block.succs or isinstance(block.terminator, IRReturn):
+            return set(self.exit_live)
+        out = set()
+        for succ in block.succs:
+            out |= live_in[succ]
+        return out
+
+    def transfer(self, block, live: set, sweep: bool = False):
+        """Проходит блок снизу вверх. С sweep убирает мёртвые записи и
+        возвращает (новые инструкции, число убранных), иначе — живые на входе."""
+        kept, removed = [], 0
+        for instr in reversed(block.instructions):
+            if not isinstance(instr, IRInstruction):
+                kept.append(instr)
+                continue
+            target = instr.defined()
+            if sweep and target is not None and target.is_name and target not in live and removable(instr):
+                removed += 1
+                continue
+            live.discard(target)
+            live.update(name for name in instr.used() if name.is_name)
+            if isinstance(instr, IRCall):
+                live |= self.call_live
+            kept.append(instr)
+        if sweep:
+            kept.reverse()
+            return kept, removed
+        return live
+
+
+def function_reads(module) -> set:
+    """Переменные, которые читает хоть одна функция модуля."""
+    return {name for unit in module.functions for instr in unit.body
+            if isinstance(instr, IRInstruction)
+            for name in instr.used() if isinstance(name, Var)}
+
+
+def dead_store_body(body, name: str = "main", call_reads=None):
+    """Удаляет записи, которые никто не читает, пока они находятся: (тело, сколько убрано).
+
+    call_reads — переменные, которые могут прочитать вызываемые функции
+    (см. function_reads); None — любые.
+    """
+    unit = FunctionUnit(name, body=body)
+    cfg = ControlFlowGraph.from_unit(unit)
+    total = 0
+    while True:
+        liveness = Liveness(cfg, unit.is_main, call_reads).compute()
+        removed = 0
+        for block in cfg.blocks:
+            block.instructions, count = liveness.transfer(block, set(liveness.live_out[block]), sweep=True)
+            removed += count
+        if not removed:
+            return cfg.linearize(), total
+        total += removed
@@ -0,0 +1,124 @@
+"""Условное распространение констант по графу потока управления (SCCP).
+
+В отличие от constant_folding, значения не забываются на каждой метке:
+на входе в блок берутся константы, совпадающие на всех исполнимых
+входящих рёбрах. Исполнимость рёбер выводится вместе со значениями —
+из перехода с известным условием исполнимо только одно ребро, — поэтому
+константы из недостижимых веток не мешают, а сами ветки удаляются.
+"""
+from src.IR.cfg import ControlFlowGraph
+from src.IR.instructions import *
+from src.IR.module import FunctionUnit
+from src.optimizer.constants import forget, propagate, single_definitions
+
+
+def branch_taken(instr: IRIfGoto):
+    """True/False, если условие перехода известно, иначе None."""
+    condition = instr.condition
+    if isinstance(condition, (BoolConst, IntConst)):
+        # Переход выполняется, если значение условия не равно negated
+        return bool(condition.value) != instr.negated
+    return None
+
+
+class ConditionalConstants:
+    """SCCP над одним графом: анализ (run) и переписывание (rewrite).
+
+    Значения — словари операнд → константа в памяти на выходе блока;
+    отсутствие имени значит «неизвестно». Все имена глобальные, и вызов
+    может изменить любое, поэтому решётка плотная — по блокам, а не по
+    цепочкам определение–использование SSA.
+    """
+
+    def __init__(self, cfg: ControlFlowGraph):
+        self.cfg = cfg
+        self.stable = single_definitions(instr for block in cfg.blocks for instr in block.instructions)
+        self.executable = set()     # исполнимые рёбра (из блока, в блок)
+        self.reached = {cfg.entry}  # блоки, в которые есть исполнимое ребро
+        self.out = {}
+
+    def run(self):
+        worklist = [self.cfg.entry]
+        while worklist:
+            block = worklist.pop()
+            known = self.entry_state(block)
+            _, edges = self.transfer(block, known)
+            if self.out.get(block) == known and edges <= self.executable:
+                continue
+            self.out[block] = known
+            for edge in edges:
+                self.executable.add(edge)
+                self.reached.add(edge[1])
+            worklist.extend(succ for succ in block.succs if (block, succ) in edges)
+        return self
+
+    def entry_state(self, block) -> dict:
+        """Пересечение констант всех исполнимых входящих рёбер."""
+        if block is self.cfg.entry:
+            # В функцию приходят вызовом, в main — с начала программы: ничего не известно
+            return {}
+        states = [self.out[pred] for pred in block.preds
+                  if (pred, block) in self.executable and pred in self.out]
+        known = dict(states[0]) if states else {}
+        for state in states[1:]:
+            for name in [name for name, value in known.items() if state.get(name) != value]:
+                del known[name]
+        return known
+
+    def transfer(self, block, known: dict):
+        """Проходит блок, обновляя known; возвращает новые инструкции и исполнимые рёбра."""
+        result = []
+        for instr in block.instructions:
+            if isinstance(instr, IRInstruction) and not isinstance(instr, IRLabel):
+                instr = propagate(instr, known, self.stable)
+                if instr is None:
+                    continue  # в памяти уже это значение
+            result.append(instr)
+
+        targets = block.succs
+        last = result[-1] if result else None
+        taken = branch_taken(last) if isinstance(last, IRIfGoto) else None
+        if taken:
+            result[-1] = IRGoto(last.label)
+            targets = block.succs[:1]  # succs[0] — цель перехода
+        elif taken is not None:
+            result.pop()
+            targets = [block.fallthrough]
+        return result, {(block, target) for target in targets if target is not None}
+
+    def rewrite(self) -> list:
+        """Тело без недостижимых блоков, с известными переходами вместо условных."""
+        cfg = self.cfg
+        for block in cfg.blocks:
+            if block not in self.reached:
+                continue
+            instructions, edges = self.transfer(block, self.entry_state(block))
+            block.instructions = instructions
+            if block.fallthrough is not None and (block, block.fallthrough) not in edges:
+                block.fallthrough = None
+        cfg.blocks = [block for block in cfg.blocks if block in self.reached]
+        return remove_unused_labels(remove_jumps_to_next(cfg.linearize()))
+
+
+def remove_jumps_to_next(instructions) -> list:
+    """goto L сразу перед меткой L лишний."""
+    result = []
+    for i, instr in enumerate(instructions):
+        following = instructions[i + 1] if i + 1 < len(instructions) else None
+        if (isinstance(instr, IRGoto) and isinstance(following, IRLabel)
+                and following.label == instr.label):
+            continue
+        result.append(instr)
+    return result
+
+
+def remove_unused_labels(instructions) -> list:
+    used = {instr.label for instr in instructions if isinstance(instr, (IRGoto, IRIfGoto))}
+    return [instr for instr in instructions
+            if not isinstance(instr, IRLabel) or instr.label in used]
+
+
+def sccp_body(body, name: str = "main") -> list:
+    """SCCP для тела одной единицы (без IRFunctionStart/End)."""
+    cfg = ControlFlowGraph.from_unit(FunctionUnit(name, body=body))
+    return ConditionalConstants(cfg).run().rewrite()
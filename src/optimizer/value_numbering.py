@@ -0,0 +1,154 @@
+"""Нумерация значений: повторно вычисленные выражения берутся из прошлых.
+
+Сначала внутри базового блока (локально), затем по дереву доминаторов:
+выражение, вычисленное в блоке, доступно во всех блоках, которые он
+доминирует. Все имена — глобальная память, поэтому между блоками
+переносятся только выражения над тем, что в теле не переопределяется:
+константами, временными с единственным определением и (если в теле нет
+вызовов) именами, которые тело не пишет вовсе. Переменную или параметр,
+записанные один раз, могут прочитать и до записи — их ключ берётся с версией.
+"""
+import copy
+
+from src.IR.cfg import ControlFlowGraph
+from src.IR.instructions import *
+from src.IR.module import FunctionUnit
+from src.optimizer.constants import single_definitions
+
+# Порядок операндов у этих операций не важен
+COMMUTATIVE = {"+", "*", "==", "!=", "&&", "||"}
+
+
+class ValueNumbering:
+    """Нумерация значений в одном графе; eliminated — сколько вычислений убрано.
+
+    Повторное вычисление удаляется, а его результат заменяется во всём
+    теле на прежний, если оба — временные с единственным определением и
+    их память не может перезаписать вызов (main или функция без вызовов:
+    рекурсия пишет в те же глобальные временные). Иначе оно становится
+    копированием `t5 = t3` — одна пересылка вместо вычисления.
+    """
+
+    def __init__(self, cfg: ControlFlowGraph, is_main: bool = True):
+        self.cfg = cfg
+        body = [instr for block in cfg.blocks for instr in block.instructions]
+        has_calls = any(isinstance(instr, IRCall) for instr in body)
+        self.stable = single_definitions(body)
+        # Глобальная нумерация и переименование безопасны, только если
+        # вызов не перезапишет временные этого тела
+        self.dominator_scope = is_main or not has_calls
+        self.invariant = set(self.stable)
+        if not has_calls:
+            # Без вызовов имя меняет только само тело: то, что оно не пишет, постоянно
+            instrs = [instr for instr in body if isinstance(instr, IRInstruction)]
+            written = {instr.defined() for instr in instrs}
+            self.invariant.update(name for instr in instrs for name in instr.used()
+                                  if name.is_name and name not in written)
+        self.renames = {}
+        self.versions = {}
+        self.eliminated = 0
+
+    def run(self) -> list:
+        available = {}
+        # Обход дерева доминаторов: (блок, ключи, добавленные блоком) — для отката
+        stack = [(self.cfg.entry, None)]
+        while stack:
+            block, added = stack.pop()
+            if added is not None:
+                for key in added:
+                    del available[key]
+                continue
+            added = []
+            self.number_block(block, available, added)
+            stack.append((block, added))
+            stack.extend((child, None) for child in reversed(block.dom_children))
+        for block in self.cfg.blocks:
+            block.instructions = [self.rename(instr) for instr in block.instructions]
+        return self.cfg.linearize()
+
+    def number_block(self, block, available: dict, added: list):
+        local = {}
+        result = []
+        for instr in block.instructions:
+            instr = self.rename(instr)
+            if isinstance(instr, IRCall):
+                local = {}  # вызов мог изменить любое имя вне available
+            key = self.key(instr)
+            if key is not None:
+                holder = available.get(key)
+                if holder is None and key in local:
+                    holder, version = local[key]
+                    if self.versions.get(holder, 0) != version:
+                        holder = None
+                if holder is not None and holder != instr.result:
+                    instr = self.reuse(instr, holder)
+                    self.eliminated += 1
+                    if instr is None:
+                        continue
+                    key = None
+            target = instr.defined() if isinstance(instr, IRInstruction) else None
+            if target is not None and target.is_name:
+                self.versions[target] = self.versions.get(target, 0) + 1
+            if key is not None:
+                result_ = instr.result
+                if self.dominator_scope and result_ in self.stable and self.invariant_key(key):
+                    available[key] = result_
+                    added.append(key)
+                else:
+                    local[key] = (result_, self.versions[result_])
+            result.append(instr)
+        block.instructions = result
+
+    def key(self, instr):
+        """Ключ выражения или None, если инструкция — не чистое вычисление."""
+        if isinstance(instr, IRBinary):
+            left, right = self.operand_key(instr.left), self.operand_key(instr.right)
+            if instr.op in COMMUTATIVE and repr(right) < repr(left):
+                left, right = right, left
+            return instr.op, left, right, instr.type_, instr.result.type_
+        if isinstance(instr, IRUnary):
+            return instr.op, self.operand_key(instr.operand), None, None, instr.result.type_
+        return None
+
+    def operand_key(self, operand):
+        if operand.is_const:
+            # repr различает 0.0 и -0.0, а nan равен сам себе
+            return operand.type_, repr(operand.value)
+        if operand in self.invariant:
+            return operand
+        # Изменяемое имя: ключ действителен до следующей записи в него
+        return operand, self.versions.get(operand, 0)
+
+    def invariant_key(self, key) -> bool:
+        return not any(isinstance(part, tuple) and part and isinstance(part[0], Name)
+                       for part in key[1:3])
+
+    def reuse(self, instr, holder):
+        result = instr.result
+        if self.dominator_scope and result in self.stable and holder in self.stable:
+            self.renames[result] = holder
+            return None
+        return IRAssign(result, holder, type_=getattr(instr, "type_", None) or result.type_)
+
+    def rename(self, instr):
+        if not self.renames or not isinstance(instr, IRInstruction):
+            return instr
+        changed = None
+        for field in instr.use_fields:
+            operands = getattr(instr, field)
+            if isinstance(operands, list):
+                replaced = [self.renames.get(operand, operand) for operand in operands]
+                if replaced != operands:
+                    changed = changed or copy.copy(instr)
+                    setattr(changed, field, replaced)
+            elif operands is not None and operands in self.renames:
+                changed = changed or copy.copy(instr)
+                setattr(changed, field, self.renames[operands])
+        return changed or instr
+
+
+def value_numbering_body(body, name: str = "main"):
+    """Нумерация значений для тела одной единицы: (новое тело, число убранных вычислений)."""
+    unit = FunctionUnit(name, body=body)
+    numbering = ValueNumbering(ControlFlowGraph.from_unit(unit), unit.is_main)
+    return numbering.run(), numbering.eliminated
@@ -0,0 +1,193 @@
+import argparse
+import hashlib
+import io
+import os
+import pickle
+import sys
+import tempfile
+
+from antlr4 import CommonTokenStream, InputStream
+from antlr4.PredictionContext import PredictionContext
+from antlr4.atn.ATN import ATN
+from antlr4.atn.ATNSimulator import ATNSimulator
+from antlr4.atn.ATNState import ATNState
+from antlr4.atn.LexerATNSimulator import LexerATNSimulator
+from antlr4.atn.LexerAction import LexerMoreAction, LexerPopModeAction, LexerSkipAction
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.atn.SemanticContext import SemanticContext
+from antlr4.error.ErrorStrategy import BailErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+
+from src.lexer.MyLangLexer import MyLangLexer
+from src.lexer.MyLangLexer import serializedATN as lexer_serialized_atn
+from src.parser.MyLangParser import MyLangParser
+from src.parser.MyLangParser import serializedATN as parser_serialized_atn
+
+SNAPSHOT_FORMAT = 1
+
+# Граф DFA/ATN глубокий: pickle обходит его рекурсивно
+_PICKLE_RECURSION_LIMIT = 100000
+
+
+def snapshot_fingerprint() -> str:
+    """Снимок годится только для той же грамматики, того же рантайма и Python:
+    состояния ATN в нём записаны номерами."""
+    import antlr4
+    digest = hashlib.sha256()
+    digest.update(repr((SNAPSHOT_FORMAT, sys.version_info[:2],
+                        getattr(antlr4, "__version__", None))).encode("utf-8"))
+    digest.update(repr(lexer_serialized_atn()).encode("utf-8"))
+    digest.update(repr(parser_serialized_atn()).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _atns():
+    return {"lexer": MyLangLexer.atn, "parser": MyLangParser.atn}
+
+
+# Рантайм сравнивает эти объекты по идентичности (`is`), поэтому после
+# распаковки они должны остаться теми же самыми синглтонами
+_SINGLETONS = {
+    "empty_context": PredictionContext.EMPTY,
+    "no_predicate": SemanticContext.NONE,
+    "parser_error": ATNSimulator.ERROR,
+    "lexer_error": LexerATNSimulator.ERROR,
+    "skip": LexerSkipAction.INSTANCE,
+    "more": LexerMoreAction.INSTANCE,
+    "pop_mode": LexerPopModeAction.INSTANCE,
+}
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """Пишет ссылки на ATN и его состояния по номеру, а не сами объекты.
+
+    ATN всё равно десериализуется при импорте сгенерированных модулей (это
+    ~2 мс), а распаковать его из pickle дороже; в снимке остаются только DFA.
+    """
+
+    def __init__(self, file):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._ids = {id(atn): name for name, atn in _atns().items()}
+        self._singletons = {id(obj): name for name, obj in _SINGLETONS.items()}
+
+    def persistent_id(self, obj):
+        name = self._singletons.get(id(obj))
+        if name is not None:
+            return ("singleton", name)
+        if isinstance(obj, ATN):
+            return ("atn", self._ids[id(obj)])
+        if isinstance(obj, ATNState):
+            return ("state", self._ids[id(obj.atn)], obj.stateNumber)
+        return None
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+
+    def __init__(self, file):
+        super().__init__(file)
+        self._atns = _atns()
+
+    def persistent_load(self, pid):
+        if pid[0] == "singleton":
+            return _SINGLETONS[pid[1]]
+        if pid[0] == "atn":
+            return self._atns[pid[1]]
+        _, name, number = pid
+        return self._atns[name].states[number]
+
+
+def train(programs):
+    """Прогоняет программы через лексер и парсер ANTLR, наполняя их DFA.
+
+    Разбор идёт и в двухэтапном режиме (SLL), и в полном LL — в снимок
+    попадают состояния для обоих режимов предсказания.
+    """
+    for code in programs:
+        for mode in (PredictionMode.SLL, PredictionMode.LL):
+            lexer = MyLangLexer(InputStream(code))
+            lexer.removeErrorListeners()
+            parser = MyLangParser(CommonTokenStream(lexer))
+            parser.removeErrorListeners()
+            parser._interp.predictionMode = mode
+            if mode == PredictionMode.SLL:
+                # Как в TwoStageParser: SLL-проход прерывается на первой ошибке
+                parser._errHandler = BailErrorStrategy()
+            try:
+                parser.program()
+            except ParseCancellationException:
+                pass
+
+
+def dfa_size() -> int:
+    """Сколько DFA-состояний накоплено лексером и парсером."""
+    return sum(len(dfa.states) for dfa in MyLangLexer.decisionsToDFA + MyLangParser.decisionsToDFA)
+
+
+def save_snapshot(path: str):
+    """Сохраняет текущие DFA лексера и парсера в файл."""
+    state = {
+        "lexer": MyLangLexer.decisionsToDFA,
+        "parser": (MyLangParser.decisionsToDFA, MyLangParser.sharedContextCache),
+    }
+    buffer = io.BytesIO()
+    # Отпечаток пишется отдельно и проверяется до распаковки DFA
+    pickle.dump(snapshot_fingerprint(), buffer)
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, _PICKLE_RECURSION_LIMIT))
+    try:
+        _SnapshotPickler(buffer).dump(state)
+    finally:
+        sys.setrecursionlimit(limit)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(buffer.getvalue())
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str) -> bool:
+    """Подменяет DFA классов MyLangLexer/MyLangParser снимком.
+
+    Действует на все создаваемые после этого лексеры и парсеры. Возвращает
+    False, если файла нет, он повреждён или снят с другой грамматики/рантайма.
+    """
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, _PICKLE_RECURSION_LIMIT))
+    try:
+        with open(path, "rb") as f:
+            if pickle.load(f) != snapshot_fingerprint():
+                return False
+            state = _SnapshotUnpickler(f).load()
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError,
+            IndexError, KeyError, RecursionError, ValueError):
+        return False
+    finally:
+        sys.setrecursionlimit(limit)
+
+    MyLangLexer.decisionsToDFA = state["lexer"]
+    MyLangParser.decisionsToDFA, MyLangParser.sharedContextCache = state["parser"]
+    return True
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(
+        prog="python -m src.parser.atn_snapshot",
+        description="Снимок ATN и прогретых DFA лексера/парсера MyLang")
+    arg_parser.add_argument("-o", "--output", required=True, help="файл снимка")
+    arg_parser.add_argument("sources", nargs="+", help="программы для обучения DFA")
+    args = arg_parser.parse_args(argv)
+
+    programs = []
+    for source in args.sources:
+        with open(source, encoding="utf-8") as f:
+            programs.append(f.read())
+    train(programs)
+    save_snapshot(args.output)
+    print(f"✅ Снимок сохранён в {args.output}: {dfa_size()} DFA-состояний")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+from antlr4.Token import Token
+
+from src.AST.Karkas import *
+from src.exceptions.syntax_error import MyLangSyntaxError
+from src.lexer.fast_lexer import (
+    AND, ASSIGN, BOOL, BOOL_LITERAL, BREAK, CASE, CATCH, COLON, COMMA, DEFAULT, ELSE, EQ,
+    FLOAT, FLOAT_LITERAL, FOR, FUNCTION, GE, GT, ID, IF, INT, INT_LITERAL, LBRACE, LE, LET,
+    LPAREN, LT, MATCH, MINUS, NEQ, NOT, OR, PLUS, PRINT, RBRACE, RETURN, RPAREN, SEMI,
+    SLASH, STAR, STRING, STRING_LITERAL, TRY, VOID, WHILE,
+)
+
+# Приоритеты бинарных операторов — те же, что у левой рекурсии в грамматике.
+# Все операторы левоассоциативны.
+BINARY_PRECEDENCE = {
+    STAR: 8, SLASH: 8,
+    PLUS: 7, MINUS: 7,
+    EQ: 6, NEQ: 6, LT: 6, GT: 6, LE: 6, GE: 6,
+    AND: 5,
+    OR: 4,
+}
+# Операнд `!` разбирается как expression(9): бинарные операторы в него не входят
+UNARY_PRECEDENCE = 9
+
+TYPES = (INT, FLOAT, STRING, BOOL, VOID)
+LITERALS = (INT_LITERAL, FLOAT_LITERAL, STRING_LITERAL, BOOL_LITERAL)
+
+
+def _at(node, token):
+    # Позиция узла — первый токен конструкции, как ctx.start в ASTBuilder
+    node.line = token.line
+    node.column = token.column
+    return node
+
+
+TOKEN_DISPLAY = {
+    LBRACE: "'{'", RBRACE: "'}'", LPAREN: "'('", RPAREN: "')'", SEMI: "';'", COLON: "':'",
+    COMMA: "','", ASSIGN: "'='", ID: "ID", CATCH: "'catch'", Token.EOF: "<EOF>",
+}
+
+
+class RDParser:
+    """Рекурсивный спуск с разбором выражений по Пратту.
+
+    Строит узлы Karkas сразу из потока токенов, минуя дерево разбора ANTLR и
+    ASTBuilder. Результат структурно совпадает с ASTBuilder().visit(tree).
+    При синтаксической ошибке бросает MyLangSyntaxError.
+    """
+
+    def __init__(self, token_stream):
+        # Принимает заполненный CommonTokenStream или готовый список токенов
+        if not isinstance(token_stream, list):
+            token_stream.fill()
+            token_stream = token_stream.tokens
+        self.tokens = [t for t in token_stream if t.channel == Token.DEFAULT_CHANNEL]
+        if not self.tokens or self.tokens[-1].type != Token.EOF:
+            raise ValueError("поток токенов должен заканчиваться EOF")
+        self.pos = 0
+
+    # --- работа с токенами ---
+
+    def peek(self, offset: int = 0) -> int:
+        index = min(self.pos + offset, len(self.tokens) - 1)
+        return self.tokens[index].type
+
+    def advance(self):
+        token = self.tokens[self.pos]
+        if token.type != Token.EOF:
+            self.pos += 1
+        return token
+
+    def expect(self, ttype: int):
+        if self.tokens[self.pos].type != ttype:
+            self.error(f"expecting {TOKEN_DISPLAY.get(ttype, ttype)}")
+        return self.advance()
+
+    def error(self, expecting: str):
+        token = self.tokens[self.pos]
+        text = "<EOF>" if token.type == Token.EOF else f"'{token.text}'"
+        raise MyLangSyntaxError(f"mismatched input {text} {expecting}", token.line, token.column)
+
+    # --- инструкции ---
+
+    def parse(self) -> Program:
+        start = self.expect(LBRACE)
+        statements = self.statements_until((RBRACE,))
+        self.expect(RBRACE)
+        self.expect(Token.EOF)
+        return _at(Program(statements=statements), start)
+
+    def statements_until(self, stop: tuple) -> list:
+        statements = []
+        while self.peek() not in stop and self.peek() != Token.EOF:
+            statements.append(self.statement())
+        return statements
+
+    def statement(self):
+        ttype = self.peek()
+        handler = self.STATEMENTS.get(ttype)
+        if handler is not None:
+            return handler(self)
+        if ttype == ID and self.peek(1) == ASSIGN:
+            node = self.assignment()
+            self.expect(SEMI)
+            return node
+        if ttype in (ID, NOT, LPAREN) or ttype in LITERALS:
+            node = self.expression()
+            self.expect(SEMI)
+            return node
+        self.error("expecting statement")
+
+    def var_declaration(self) -> VarDeclaration:
+        start = self.expect(LET)
+        name = self.expect(ID).text
+        self.expect(COLON)
+        type_ = self.type_()
+        self.expect(ASSIGN)
+        return _at(VarDeclaration(name, type_, self.expression()), start)
+
+    def var_declaration_statement(self) -> VarDeclaration:
+        node = self.var_declaration()
+        self.expect(SEMI)
+        return node
+
+    def assignment(self) -> Assignment:
+        start = self.expect(ID)
+        self.expect(ASSIGN)
+        return _at(Assignment(start.text, self.expression()), start)
+
+    def type_(self) -> str:
+        if self.peek() not in TYPES:
+            self.error("expecting type")
+        return self.advance().text
+
+    def block(self) -> Block:
+        start = self.expect(LBRACE)
+        statements = self.statements_until((RBRACE,))
+        self.expect(RBRACE)
+        return _at(Block(statements), start)
+
+    def function_declaration(self) -> FunctionDeclaration:
+        start = self.expect(FUNCTION)
+        name = self.expect(ID).text
+        self.expect(LPAREN)
+        params = []
+        if self.peek() != RPAREN:
+            while True:
+                param = self.expect(ID).text
+                self.expect(COLON)
+                params.append((param, self.type_()))
+                if self.peek() != COMMA:
+                    break
+                self.advance()
+        self.expect(RPAREN)
+        self.expect(COLON)
+        return_type = self.type_()
+        return _at(FunctionDeclaration(name, params, return_type, self.block()), start)
+
+    def if_statement(self) -> IfStatement:
+        start = self.expect(IF)
+        cond = self.parenthesized()
+        then_block = self.block()
+        else_block = None
+        if self.peek() == ELSE:
+            self.advance()
+            else_block = self.block()
+        return _at(IfStatement(cond, then_block, else_block), start)
+
+    def while_statement(self) -> WhileStatement:
+        start = self.expect(WHILE)
+        cond = self.parenthesized()
+        return _at(WhileStatement(cond, self.block()), start)
+
+    def for_statement(self) -> ForStatement:
+        start = self.expect(FOR)
+        self.expect(LPAREN)
+        init = cond = update = None
+        if self.peek() == LET:
+            init = self.var_declaration()
+        elif self.peek() == ID:
+            init = self.assignment()
+        self.expect(SEMI)
+        if self.peek() != SEMI:
+            cond = self.expression()
+        self.expect(SEMI)
+        if self.peek() == ID:
+            update = self.assignment()
+        self.expect(RPAREN)
+        return _at(ForStatement(init, cond, update, self.block()), start)
+
+    def try_catch_statement(self) -> TryCatchStatement:
+        start = self.expect(TRY)
+        try_block = self.block()
+        self.expect(CATCH)
+        self.expect(LPAREN)
+        name = self.expect(ID).text
+        self.expect(RPAREN)
+        return _at(TryCatchStatement(try_block, name, self.block()), start)
+
+    def match_statement(self) -> MatchStatement:
+        start = self.expect(MATCH)
+        expr = self.expression()
+        self.expect(LBRACE)
+        cases = []
+        while self.peek() == CASE:
+            case_start = self.advance()
+            value = self.expression()
+            self.expect(COLON)
+            body = self.statements_until((CASE, DEFAULT, BREAK, RBRACE))
+            # break в AST не попадает, как и в ASTBuilder
+            if self.peek() == BREAK:
+                self.advance()
+                self.expect(SEMI)
+            cases.append(_at(MatchCase(value, body), case_start))
+        default = None
+        if self.peek() == DEFAULT:
+            default_start = self.advance()
+            self.expect(COLON)
+            default = _at(DefaultCase(self.statements_until((RBRACE,))), default_start)
+        self.expect(RBRACE)
+        return _at(MatchStatement(expr, cases, default), start)
+
+    def return_statement(self) -> ReturnStatement:
+        start = self.expect(RETURN)
+        value = None
+        if self.peek() != SEMI:
+            value = self.expression()
+        self.expect(SEMI)
+        return _at(ReturnStatement(value), start)
+
+    def print_statement(self) -> PrintStatement:
+        start = self.expect(PRINT)
+        expr = self.parenthesized()
+        self.expect(SEMI)
+        return _at(PrintStatement(expr), start)
+
+    def parenthesized(self):
+        self.expect(LPAREN)
+        expr = self.expression()
+        self.expect(RPAREN)
+        return expr
+
+    STATEMENTS = {
+        LET: var_declaration_statement,
+        FUNCTION: function_declaration,
+        IF: if_statement,
+        WHILE: while_statement,
+        FOR: for_statement,
+        TRY: try_catch_statement,
+        MATCH: match_statement,
+        RETURN: return_statement,
+        PRINT: print_statement,
+    }
+
+    # --- выражения ---
+
+    def expression(self, min_precedence: int = 0):
+        start = self.tokens[self.pos]
+        left = self.prefix()
+        while True:
+            precedence = BINARY_PRECEDENCE.get(self.peek())
+            if precedence is None or precedence < min_precedence:
+                return left
+            op = self.advance().text
+            right = self.expression(precedence + 1)
+            left = _at(BinaryOp(left, op, right), start)
+
+    def prefix(self):
+        token = self.tokens[self.pos]
+        ttype = token.type
+        if ttype == NOT:
+            self.advance()
+            return _at(UnaryOp("!", self.expression(UNARY_PRECEDENCE)), token)
+        if ttype == ID:
+            self.advance()
+            if self.peek() == LPAREN:
+                return _at(self.function_call(token.text), token)
+            if token.text == "true":
+                return _at(Literal(True), token)
+            if token.text == "false":
+                return _at(Literal(False), token)
+            return _at(Identifier(token.text), token)
+        if ttype == LPAREN:
+            return self.parenthesized()
+        if ttype == INT_LITERAL:
+            self.advance()
+            return _at(Literal(int(token.text)), token)
+        if ttype == FLOAT_LITERAL:
+            self.advance()
+            return _at(Literal(float(token.text)), token)
+        if ttype == STRING_LITERAL:
+            self.advance()
+            return _at(Literal(token.text.strip('"')), token)
+        if ttype == BOOL_LITERAL:
+            self.advance()
+            return _at(Literal(token.text == "true"), token)
+        self.error("expecting expression")
+
+    def function_call(self, name: str) -> FunctionCall:
+        self.expect(LPAREN)
+        args = []
+        if self.peek() != RPAREN:
+            args.append(self.expression())
+            while self.peek() == COMMA:
+                self.advance()
+                args.append(self.expression())
+        self.expect(RPAREN)
+        return FunctionCall(name, args)
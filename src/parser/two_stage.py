@@ -0,0 +1,43 @@
+from antlr4.atn.PredictionMode import PredictionMode
+from antlr4.error.ErrorListener import ConsoleErrorListener
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+
+from src.parser.MyLangParser import MyLangParser
+
+
+class TwoStageParser:
+    """Двухэтапный разбор: сначала быстрый SLL с отказом при первой ошибке,
+    и только если он не справился — повторный разбор в полном режиме LL.
+
+    SLL не делает полного контекстного предсказания, поэтому на корректном
+    входе заметно дешевле. Если SLL упал (синтаксическая ошибка или
+    настоящая LL-неоднозначность), LL-проход даёт те же дерево и сообщения
+    об ошибках, что и обычный разбор. Счётчики показывают, как часто был откат.
+    """
+
+    def __init__(self):
+        self.sll_parses = 0
+        self.ll_fallbacks = 0
+
+    def parse(self, token_stream):
+        parser = MyLangParser(token_stream)
+        parser.removeErrorListeners()
+        parser._errHandler = BailErrorStrategy()
+        parser._interp.predictionMode = PredictionMode.SLL
+        try:
+            tree = parser.program()
+            self.sll_parses += 1
+            return tree
+        except ParseCancellationException:
+            self.ll_fallbacks += 1
+
+        token_stream.seek(0)
+        parser.reset()
+        parser.addErrorListener(ConsoleErrorListener.INSTANCE)
+        parser._errHandler = DefaultErrorStrategy()
+        parser._interp.predictionMode = PredictionMode.LL
+        return parser.program()
+
+    def stats(self) -> dict:
+        return {"sll_parses": self.sll_parses, "ll_fallbacks": self.ll_fallbacks}
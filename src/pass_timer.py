@@ -0,0 +1,106 @@
+import json
+import time
+import tracemalloc
+
+from src.IR.module import IRModule
+
+
+def ir_size(value):
+    """Число IR-инструкций, если значение — список инструкций или IRModule, иначе None."""
+    if isinstance(value, (list, IRModule)):
+        return len(value)
+    return None
+
+
+class PassTimer:
+    """Собирает время и память по стадиям конвейера и проходам оптимизатора.
+
+    Проходы могут быть вложенными (проходы оптимизатора внутри стадии optimize):
+    у каждого уровня свой пик tracemalloc, а пик родителя учитывает пики детей.
+    """
+
+    def __init__(self, track_memory: bool = False):
+        self.track_memory = track_memory
+        # Записи хранятся в порядке начала прохода, вложенные — сразу после родителя
+        self.records = []
+        self._stack = []
+        self._started_tracing = False
+
+    def run(self, name: str, func, value):
+        record = {"name": name, "depth": len(self._stack),
+                  "ir_before": ir_size(value), "ir_after": None}
+        self.records.append(record)
+        self._enter()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            result = func(value)
+        finally:
+            peak = self._exit()
+            record["wall_ms"] = (time.perf_counter() - wall) * 1000
+            record["cpu_ms"] = (time.process_time() - cpu) * 1000
+            record["peak_kb"] = peak / 1024 if peak is not None else None
+        record["ir_after"] = ir_size(result)
+        return result
+
+    def _enter(self):
+        frame = {"start": 0, "peak": 0}
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                parent = self._stack[-1]
+                parent["peak"] = max(parent["peak"], peak)
+            tracemalloc.reset_peak()
+            frame["start"] = current
+        self._stack.append(frame)
+
+    def _exit(self):
+        frame = self._stack.pop()
+        if not self.track_memory:
+            return None
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(frame["peak"], peak)
+        if self._stack:
+            parent = self._stack[-1]
+            parent["peak"] = max(parent["peak"], peak)
+            tracemalloc.reset_peak()
+        elif self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return peak - frame["start"]
+
+    def totals(self):
+        top = [r for r in self.records if r["depth"] == 0]
+        return sum(r["wall_ms"] for r in top), sum(r["cpu_ms"] for r in top)
+
+    def to_json(self) -> str:
+        total_wall, total_cpu = self.totals()
+        return json.dumps({
+            "passes": self.records,
+            "total_wall_ms": total_wall,
+            "total_cpu_ms": total_cpu,
+        }, ensure_ascii=False, indent=2)
+
+    def format_table(self) -> str:
+        def fmt(value, spec):
+            return "-" if value is None else format(value, spec)
+
+        header = f"{'Проход':<32} {'Wall, мс':>10} {'CPU, мс':>10}"
+        if self.track_memory:
+            header += f" {'Пик, КБ':>10}"
+        header += f" {'IR до':>7} {'IR после':>8}"
+        lines = [header, "-" * len(header)]
+        for r in self.records:
+            name = "  " * r["depth"] + r["name"]
+            line = f"{name:<32} {r['wall_ms']:>10.3f} {r['cpu_ms']:>10.3f}"
+            if self.track_memory:
+                line += f" {fmt(r['peak_kb'], '.1f'):>10}"
+            line += f" {fmt(r['ir_before'], 'd'):>7} {fmt(r['ir_after'], 'd'):>8}"
+            lines.append(line)
+        total_wall, total_cpu = self.totals()
+        lines.append("-" * len(header))
+        lines.append(f"{'Итого':<32} {total_wall:>10.3f} {total_cpu:>10.3f}")
+        return "\n".join(lines)
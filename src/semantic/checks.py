@@ -0,0 +1,100 @@
+"""Семантические проверки, общие для SemanticAnalyzer и FusedIRGenerator.
+
+Каждая функция либо возвращает результат (символ, тип), либо бросает то же
+исключение с тем же текстом — два прохода и слитный генератор не расходятся.
+"""
+from src.semantic.symbol_table import SymbolTable
+
+
+def check_not_declared(scope: SymbolTable, name: str, kind: str = "Переменная"):
+    if scope.lookup_local(name):
+        raise Exception(f"Ошибка: {kind} '{name}' уже объявлена")
+
+
+def check_initializer(name: str, declared: str, expr_type):
+    if expr_type != declared:
+        raise Exception(f"Несовпадение типов при инициализации '{name}': {declared} ≠ {expr_type}")
+
+
+def lookup_variable(scope: SymbolTable, name: str):
+    symbol = scope.lookup(name)
+    if not symbol:
+        raise Exception(f"Переменная '{name}' не объявлена")
+    return symbol
+
+
+def check_assignment(name: str, symbol, expr_type):
+    if expr_type != symbol.type_:
+        raise Exception(f"Несовпадение типов в присваивании '{name}': {symbol.type_} ≠ {expr_type}")
+
+
+def check_return(scope: SymbolTable, actual):
+    expected = scope.lookup("__return_type__")
+    if expected and actual != expected.type_:
+        raise Exception(f"Ошибка: return ожидает {expected.type_}, но получено {actual}")
+
+
+def check_condition(cond_type, statement: str):
+    if cond_type != "bool":
+        raise Exception(f"Ошибка: Условие в {statement} должно быть типа bool, а не {cond_type}")
+
+
+def declare_function(scope: SymbolTable, node):
+    """Объявляет функцию в текущей области и аннотирует узел."""
+    check_not_declared(scope, node.name, "Функция")
+    node.symbol = scope.define(node.name, {
+        "return_type": node.return_type,
+        "params": node.params
+    }, node)
+    node.type_ = node.return_type
+
+
+def declare_parameters(scope: SymbolTable, node):
+    """Тип возврата и параметры функции — в её (уже открытой) области."""
+    scope.define("__return_type__", node.return_type)
+    seen_params = set()
+    for name, type_ in node.params:
+        if name in seen_params:
+            raise Exception(f"Ошибка: Повторяющийся параметр '{name}' в функции '{node.name}'")
+        seen_params.add(name)
+        scope.define(name, type_, node)
+
+
+def check_catch_variable(scope: SymbolTable):
+    if scope.lookup_local("e"):
+        raise Exception("Ошибка: Переменная 'e' в catch уже объявлена")
+
+
+def check_case(value_type, expr_type):
+    if value_type != expr_type:
+        raise Exception(f"Тип значения case '{value_type}' не совпадает с типом match '{expr_type}'")
+
+
+def check_unary_op(op: str, operand_type) -> str:
+    if op != "!":
+        raise Exception(f"Ошибка: Неизвестный унарный оператор '{op}'")
+    if operand_type != "bool":
+        raise Exception(f"Ошибка: Оператор '!' применим только к bool, а не к {operand_type}")
+    return "bool"
+
+
+def lookup_function(scope: SymbolTable, node):
+    """Символ вызываемой функции; число аргументов уже проверено."""
+    symbol_entry = scope.lookup(node.name)
+    if not symbol_entry:
+        raise Exception(f"Функция '{node.name}' не объявлена")
+
+    function_info = symbol_entry.type_
+    if not isinstance(function_info, dict) or "params" not in function_info:
+        raise Exception(f"Функция '{node.name}' определена некорректно")
+
+    expected_params = function_info["params"]
+    if len(node.arguments) != len(expected_params):
+        raise Exception(
+            f"Функция '{node.name}' ожидает {len(expected_params)} аргумента(ов), получено {len(node.arguments)}")
+    return symbol_entry
+
+
+def check_argument(param_name: str, param_type: str, arg_type):
+    if arg_type != param_type:
+        raise Exception(f"Тип аргумента '{param_name}' не совпадает: ожидался {param_type}, получен {arg_type}")
@@ -1,30 +1,77 @@
+import sys
+from contextlib import contextmanager
+
+
 class Symbol:
-    def __init__(self, name, type_, decl=None):
+    __slots__ = ("name", "type_", "decl", "depth")
+
+    def __init__(self, name, type_, decl=None, depth=0):
         self.name = name
         self.type_ = type_
         self.decl = decl
+        self.depth = depth  # глубина области, в которой объявлен символ
 
     def __repr__(self):
         return f"Symbol(name={self.name}, type_={self.type_})"
 
 
 class SymbolTable:
-    def __init__(self, parent=None):
-        self.symbols = {}
-        self.parent = parent
+    """Плоская таблица символов с вложенными областями видимости.
 
-    def define(self, name, type_, decl=None):
-        self.symbols[name] = Symbol(name, type_, decl)
+    Один словарь «имя → стек символов»: верхний элемент стека — видимое
+    объявление, ниже — затенённые им внешние. Поиск — одно обращение к
+    словарю независимо от глубины вложенности. Вход в область (enter_scope)
+    открывает список объявленных в ней имён, выход (exit_scope) снимает их
+    со стеков. Имена интернируются, чтобы сравнение ключей шло по ссылке.
+    """
 
-    def lookup(self, name):
+    def __init__(self):
+        self._stacks = {}
+        self._scopes = [[]]
+
+    @property
+    def depth(self) -> int:
+        return len(self._scopes) - 1
+
+    def enter_scope(self):
+        self._scopes.append([])
 
-        if name in self.symbols:
-            return self.symbols[name]
-        elif self.parent:
-            return self.parent.lookup(name)
+    def exit_scope(self):
+        if len(self._scopes) == 1:
+            raise Exception("Ошибка: попытка выйти из глобальной области видимости")
+        stacks = self._stacks
+        for name in self._scopes.pop():
+            stacks[name].pop()
+
+    @contextmanager
+    def nested(self):
+        self.enter_scope()
+        try:
+            yield self
+        finally:
+            self.exit_scope()
+
+    def define(self, name, type_, decl=None):
+        name = sys.intern(name)
+        depth = len(self._scopes) - 1
+        symbol = Symbol(name, type_, decl, depth)
+        stack = self._stacks.get(name)
+        if stack is None:
+            stack = self._stacks[name] = []
+        if stack and stack[-1].depth == depth:
+            # Повторное объявление в той же области заменяет прежнее
+            stack[-1] = symbol
         else:
-            return None
+            stack.append(symbol)
+            self._scopes[-1].append(name)
+        return symbol
 
-    def lookup_local(self, name):
+    def lookup(self, name):
+        stack = self._stacks.get(name)
+        return stack[-1] if stack else None
 
-        return self.symbols.get(name)
+    def lookup_local(self, name):
+        stack = self._stacks.get(name)
+        if stack and stack[-1].depth == len(self._scopes) - 1:
+            return stack[-1]
+        return None
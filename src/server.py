@@ -0,0 +1,185 @@
+import argparse
+import io
+import json
+import os
+import socketserver
+import sys
+from contextlib import redirect_stdout
+
+from antlr4 import InputStream
+
+from src.arguments import add_cache_arguments, add_frontend_arguments, check_compile_options, make_arg_parser
+from src.client import DEFAULT_SOCKET
+from src.main import (compile_source, compile_stream, load_frontend_snapshot, make_cache, make_options,
+                      make_timer, report_timer)
+
+# Программа для прогрева: затрагивает все конструкции языка, чтобы DFA-кэши
+# лексера и парсера заполнились до первого настоящего запроса.
+WARMUP_SOURCE = r"""
+{
+    let x: int = 1 + 2 * 3;
+    let f: float = 1.5 / 2.0;
+    let s: string = "warmup";
+    let b: bool = !(x < 2) && x > 0 || false;
+    x = x - 1;
+    print(x);
+    if (x == 1) { print(s); } else { print(f); }
+    while (x != 0) { x = x - 1; }
+    for (let i: int = 0; i < 2; i = i + 1) { print(i); }
+    try { print(1); } catch (e) { print(0); }
+    match x {
+        case 0: print(0);
+        default: print(1);
+    }
+    function add(a: int, c: int): int {
+        return a + c;
+    }
+    add(1, 2);
+    print(add(add(1, 2), 3));
+}
+"""
+
+
+class CompileServer:
+    """Обслуживает запросы compile_source в одном долгоживущем процессе.
+
+    Протокол — одна JSON-строка на запрос и одна JSON-строка на ответ.
+    Команды: compile (source, output и, необязательно, options — опции
+    python -m src.main, см. src.arguments.compile_options), ping, stats, shutdown.
+    """
+
+    def __init__(self, cache=None, options=None):
+        self.cache = cache
+        self.options = options
+        self.requests_served = 0
+        self.running = True
+        # Снимок DFA, уже подставленный в ANTLR этого процесса
+        self.snapshot = options.atn_snapshot if options is not None else None
+
+    def warmup(self):
+        with redirect_stdout(io.StringIO()):
+            compile_stream(InputStream(WARMUP_SOURCE), options=self.options)
+
+    def handle(self, request: dict) -> dict:
+        command = request.get("command", "compile")
+        if command == "ping":
+            return {"ok": True}
+        if command == "stats":
+            stats = {"ok": True, "requests_served": self.requests_served}
+            if self.options is not None:
+                stats.update(self.options.two_stage.stats())
+            if self.cache is not None:
+                stats.update(cache_hits=self.cache.hits, cache_misses=self.cache.misses)
+            return stats
+        if command == "shutdown":
+            self.running = False
+            return {"ok": True}
+        if command != "compile":
+            return {"ok": False, "error": f"Неизвестная команда '{command}'"}
+
+        log = io.StringIO()
+        try:
+            with redirect_stdout(log):
+                if request.get("options") is None:
+                    compile_source(request["source"], request["output"], cache=self.cache,
+                                   options=self.options)
+                else:
+                    self.compile_with_options(request)
+        except Exception as e:
+            return {"ok": False, "log": log.getvalue(), "error": str(e)}
+        finally:
+            self.requests_served += 1
+        return {"ok": True, "log": log.getvalue()}
+
+    def compile_with_options(self, request: dict):
+        """Компиляция с опциями клиента — так же, как python -m src.main с ними."""
+        fields = check_compile_options(request["options"])
+        args = make_arg_parser().parse_args([request["source"], request["output"]])
+        vars(args).update(fields)
+        options = make_options(args, timer=make_timer(args))
+        if self.options is not None and options.timer is None and same_options(options, self.options):
+            options = self.options  # счётчики двухстадийного разбора остаются общими
+        if options.atn_snapshot and options.atn_snapshot != self.snapshot:
+            load_frontend_snapshot(options)
+            self.snapshot = options.atn_snapshot
+        cache = make_cache(args, options)
+        if cache is None and self.cache is not None and self.cache.options == options.cache_key():
+            cache = self.cache
+        compile_source(request["source"], request["output"], cache=cache, options=options,
+                       emit_ir=args.emit_ir)
+        report_timer(options.timer, args)
+
+    def handle_line(self, line: str) -> str:
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            response = {"ok": False, "error": f"Некорректный JSON: {e}"}
+        else:
+            response = self.handle(request)
+        return json.dumps(response, ensure_ascii=False)
+
+    def serve_stream(self, reader, writer):
+        """Построчный протокол поверх stdin/stdout (или любой пары потоков)."""
+        for line in reader:
+            if not line.strip():
+                continue
+            writer.write(self.handle_line(line) + "\n")
+            writer.flush()
+            if not self.running:
+                break
+
+    def serve_unix(self, socket_path: str = DEFAULT_SOCKET):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        compiler = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for raw in self.rfile:
+                    line = raw.decode("utf-8")
+                    if not line.strip():
+                        continue
+                    self.wfile.write((compiler.handle_line(line) + "\n").encode("utf-8"))
+                    if not compiler.running:
+                        break
+
+        # Однопоточный сервер: redirect_stdout глобален для процесса,
+        # поэтому запросы обрабатываются строго по очереди.
+        with socketserver.UnixStreamServer(socket_path, Handler) as server:
+            try:
+                while self.running:
+                    server.handle_request()
+            finally:
+                os.unlink(socket_path)
+
+
+def same_options(a, b) -> bool:
+    return all(getattr(a, name) == getattr(b, name)
+               for name in ("lexer", "parser", "prediction", "atn_snapshot", "fused", "function_jobs"))
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(prog="python -m src.server",
+                                         description="Сервер компиляции MyLang")
+    arg_parser.add_argument("--stdio", action="store_true",
+                            help="обслуживать запросы через stdin/stdout вместо сокета")
+    arg_parser.add_argument("--socket", default=DEFAULT_SOCKET, help="путь к Unix-сокету")
+    add_frontend_arguments(arg_parser)
+    add_cache_arguments(arg_parser)
+    args = arg_parser.parse_args(argv)
+
+    options = make_options(args)
+    load_frontend_snapshot(options)
+    server = CompileServer(cache=make_cache(args, options), options=options)
+    server.warmup()
+    if args.stdio:
+        server.serve_stream(sys.stdin, sys.stdout)
+        return 0
+
+    print(f"🚀 Сервер компиляции слушает {args.socket}")
+    server.serve_unix(args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
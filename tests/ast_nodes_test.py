@@ -0,0 +1,46 @@
+import unittest
+
+from antlr4 import CommonTokenStream, InputStream
+
+from src.AST import Karkas
+from src.AST.ASTBuilder import ASTBuilder
+from src.AST.Karkas import ASTNode, BinaryOp, Literal
+from src.lexer.MyLangLexer import MyLangLexer
+from src.parser.MyLangParser import MyLangParser
+
+
+def node_classes():
+    return [cls for cls in vars(Karkas).values()
+            if isinstance(cls, type) and issubclass(cls, ASTNode) and cls is not ASTNode]
+
+
+class TestASTNodes(unittest.TestCase):
+
+    def test_nodes_have_slots_and_no_dict(self):
+        for cls in node_classes():
+            with self.subTest(cls=cls.__name__):
+                self.assertIn("__slots__", vars(cls))
+                self.assertEqual(cls._fields[:3], ("type_", "line", "column"))
+
+    def test_common_fields_default_to_none(self):
+        node = BinaryOp(Literal(1), "+", Literal(2))
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual((node.type_, node.line, node.column), (None, None, None))
+        with self.assertRaises(AttributeError):
+            node.unknown = 1
+
+    def test_builder_records_source_spans(self):
+        code = "{\n  let x: int = (1 + 2) * 3;\n  print(x);\n}"
+        tree = MyLangParser(CommonTokenStream(MyLangLexer(InputStream(code)))).program()
+        program = ASTBuilder().visit(tree)
+        decl, printed = program.statements
+        self.assertEqual((decl.line, decl.column), (2, 2))
+        self.assertEqual(decl.type_, "int")
+        # Позиция бинарной операции — её первый токен, скобка включительно
+        self.assertEqual((decl.value.line, decl.value.column), (2, 15))
+        self.assertEqual((decl.value.left.line, decl.value.left.column), (2, 16))
+        self.assertEqual((printed.expression.line, printed.expression.column), (3, 8))
+
+
+if __name__ == "__main__":
+    unittest.main()
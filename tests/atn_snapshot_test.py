@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+from antlr4 import CommonTokenStream, InputStream
+from antlr4.dfa.DFA import DFA
+
+from src.lexer.MyLangLexer import MyLangLexer
+from src.parser import atn_snapshot
+from src.parser.MyLangParser import MyLangParser
+from tests.lexer_conformance_test import load_corpus
+
+
+def parse_tree(code):
+    lexer = MyLangLexer(InputStream(code))
+    lexer.removeErrorListeners()
+    parser = MyLangParser(CommonTokenStream(lexer))
+    parser.removeErrorListeners()
+    return parser.program().toStringTree(recog=parser)
+
+
+def reset_dfa():
+    """Пустые DFA, как сразу после импорта сгенерированных модулей."""
+    MyLangLexer.decisionsToDFA = [DFA(ds, i) for i, ds in enumerate(MyLangLexer.atn.decisionToState)]
+    MyLangParser.decisionsToDFA = [DFA(ds, i) for i, ds in enumerate(MyLangParser.atn.decisionToState)]
+
+
+class TestATNSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.saved = (MyLangLexer.decisionsToDFA, MyLangParser.decisionsToDFA,
+                      MyLangParser.sharedContextCache)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "atn.pkl")
+
+    def tearDown(self):
+        (MyLangLexer.decisionsToDFA, MyLangParser.decisionsToDFA,
+         MyLangParser.sharedContextCache) = self.saved
+        self.tmp.cleanup()
+
+    def test_round_trip_restores_dfa_and_parses_identically(self):
+        corpus = load_corpus()
+        expected = [parse_tree(code) for code in corpus]
+        reset_dfa()
+        atn_snapshot.train(corpus)
+        trained = atn_snapshot.dfa_size()
+        atn_snapshot.save_snapshot(self.path)
+
+        reset_dfa()
+        self.assertEqual(atn_snapshot.dfa_size(), 0)
+        self.assertTrue(atn_snapshot.load_snapshot(self.path))
+        self.assertEqual(atn_snapshot.dfa_size(), trained)
+        # Состояния ссылаются на ATN текущего процесса, а не на копию
+        dfa = MyLangParser.decisionsToDFA[0]
+        self.assertIs(dfa.atnStartState, MyLangParser.atn.decisionToState[0])
+        self.assertEqual([parse_tree(code) for code in corpus], expected)
+
+    def test_missing_corrupt_or_stale_snapshot_is_rejected(self):
+        self.assertFalse(atn_snapshot.load_snapshot(self.path))
+        with open(self.path, "wb") as f:
+            f.write(b"not a pickle")
+        self.assertFalse(atn_snapshot.load_snapshot(self.path))
+
+        atn_snapshot.save_snapshot(self.path)
+        original = atn_snapshot.snapshot_fingerprint
+        atn_snapshot.snapshot_fingerprint = lambda: "other grammar"
+        try:
+            self.assertFalse(atn_snapshot.load_snapshot(self.path))
+        finally:
+            atn_snapshot.snapshot_fingerprint = original
+        self.assertTrue(atn_snapshot.load_snapshot(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
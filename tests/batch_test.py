@@ -0,0 +1,75 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from src.batch import compile_batch, expand_sources, format_summary, output_paths
+from src.main import compile_source
+
+GOOD = """
+{
+    let x: int = %d;
+    print(x + 1);
+}
+"""
+
+BAD = """
+{
+    print(y);
+}
+"""
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.sources = []
+        for i, sub in enumerate(["a", "b", "b"]):
+            os.makedirs(os.path.join(self.tmp.name, "src", sub), exist_ok=True)
+            path = os.path.join(self.tmp.name, "src", sub, f"prog{i}.my")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(GOOD % i)
+            self.sources.append(path)
+        self.bad = os.path.join(self.tmp.name, "src", "a", "bad.my")
+        with open(self.bad, "w", encoding="utf-8") as f:
+            f.write(BAD)
+        self.out_dir = os.path.join(self.tmp.name, "out")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_expand_glob(self):
+        pattern = os.path.join(self.tmp.name, "src", "**", "*.my")
+        found = expand_sources([pattern, self.sources[0]])
+        self.assertEqual(len(found), 4)
+
+    def test_outputs_keep_relative_layout(self):
+        outputs = output_paths(self.sources, self.out_dir)
+        self.assertEqual(outputs[0], os.path.join(self.out_dir, "a", "prog0.asm"))
+        self.assertEqual(outputs[2], os.path.join(self.out_dir, "b", "prog2.asm"))
+
+    def test_parallel_batch_matches_single_compile(self):
+        results = compile_batch(self.sources + [self.bad], self.out_dir, jobs=2)
+        self.assertEqual([r["ok"] for r in results], [True, True, True, False])
+        self.assertIn("не объявлена", results[-1]["error"])
+
+        reference = os.path.join(self.tmp.name, "single.asm")
+        with redirect_stdout(io.StringIO()):
+            compile_source(self.sources[1], reference)
+        with open(reference, encoding="utf-8") as a, open(results[1]["output"], encoding="utf-8") as b:
+            self.assertEqual(a.read(), b.read())
+
+        summary = format_summary(results, 0.5)
+        self.assertIn("ошибок: 1", summary)
+
+    def test_batch_with_shared_cache(self):
+        cache_dir = os.path.join(self.tmp.name, "cache")
+        compile_batch(self.sources, self.out_dir, jobs=2, cache_dir=cache_dir)
+        results = compile_batch(self.sources, self.out_dir, jobs=2, cache_dir=cache_dir)
+        self.assertTrue(all(r["cached"] for r in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from src.cache import CACHE_SLOTS, StageCache
+from src.main import compile_source
+
+CODE = """
+{
+    let x: int = 5;
+    let y: float = 2.5;
+    if (x < 10) {
+        print(y);
+    }
+    function sq(n: int): int {
+        return n * n;
+    }
+    print(sq(x));
+}
+"""
+
+
+class TestStageCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "prog.my")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write(CODE)
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def compile(self, cache, name):
+        output = os.path.join(self.tmp.name, name)
+        log = io.StringIO()
+        with redirect_stdout(log):
+            compile_source(self.source, output, cache=cache)
+        with open(output, encoding="utf-8") as f:
+            return f.read(), log.getvalue()
+
+    def test_unchanged_source_is_copied_from_cache(self):
+        reference, _ = self.compile(None, "plain.asm")
+        cache = StageCache(self.cache_dir)
+        first, first_log = self.compile(cache, "first.asm")
+        second, second_log = self.compile(cache, "second.asm")
+        self.assertEqual(first, reference)
+        self.assertEqual(second, reference)
+        self.assertNotIn("взят из кэша", first_log)
+        self.assertIn("взят из кэша", second_log)
+        self.assertNotIn("AST построено", second_log)
+
+    def test_resume_from_every_stage(self):
+        reference, _ = self.compile(None, "plain.asm")
+        cache = StageCache(self.cache_dir)
+        self.compile(cache, "warm.asm")
+        key = cache.key(CODE.encode("utf-8"))
+        # Удаляем стадии с конца и проверяем, что компиляция продолжается
+        # с самой поздней оставшейся и даёт тот же результат.
+        for index in range(len(CACHE_SLOTS) - 1, 0, -1):
+            for slot in CACHE_SLOTS[index:]:
+                os.remove(cache.path(slot, key))
+            result, log = self.compile(cache, f"resume_{index}.asm")
+            self.assertEqual(result, reference)
+            self.assertIn(f"стадия: {CACHE_SLOTS[index - 1]}", log)
+
+    def test_options_change_key(self):
+        data = CODE.encode("utf-8")
+        self.assertNotEqual(StageCache(self.cache_dir).key(data),
+                            StageCache(self.cache_dir, options={"opt": 1}).key(data))
+        self.assertNotEqual(StageCache(self.cache_dir).key(data),
+                            StageCache(self.cache_dir).key(data + b" "))
+
+    def test_lru_eviction_respects_size_limit(self):
+        cache = StageCache(self.cache_dir, max_bytes=4096)
+        for i in range(20):
+            cache.store("asm", f"{i:064x}", "x" * 1000)
+        total = sum(size for _, _, size in cache._entries())
+        self.assertLessEqual(total, 4096)
+        # Самые свежие записи должны остаться
+        self.assertTrue(cache.load("asm", f"{19:064x}")[0])
+        self.assertFalse(cache.load("asm", f"{0:064x}")[0])
+
+    def test_overwrite_is_not_counted_twice(self):
+        cache = StageCache(self.cache_dir, max_bytes=4096)
+        cache.store("asm", f"{1:064x}", "y" * 1000)
+        with mock.patch.object(cache, "evict") as evict:
+            for _ in range(3):
+                cache.store("asm", f"{0:064x}", "x" * 1000)
+        # На диске 2000 байт: перезапись не должна запускать вытеснение
+        self.assertEqual(cache._size, 2000)
+        evict.assert_not_called()
+
+    def test_corrupt_entry_is_a_miss(self):
+        cache = StageCache(self.cache_dir)
+        key = "0" * 64
+        path = cache.path("ir", key)
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(b"not a pickle")
+        self.assertEqual(cache.load("ir", key), (False, None))
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from src.IR.cfg import ControlFlowGraph, build_cfgs, linearize
+from src.IR.instructions import IRGoto, IRIfGoto, IRLabel, IRPrint
+from src.IR.ir_generator import IRGenerator
+from src.IR.module import IRModule
+from src.IR.operands import IntConst, Temp
+from src.Nasm.nasm_generator import NASMGenerator
+from src.optimizer.ir_optimizer import IROptimizer
+from src.semantic.semantic_analyzer import SemanticAnalyzer
+from tests.lexer_conformance_test import load_corpus
+from tests.rd_parser_test import antlr_ast, rd_ast
+
+
+def lower(code):
+    ast = rd_ast(code)
+    SemanticAnalyzer().analyze(ast)
+    return IRGenerator().generate(ast)
+
+
+def corpus_ir():
+    with redirect_stdout(io.StringIO()):
+        for code in load_corpus():
+            ast = antlr_ast(code)
+            if ast is None:
+                continue
+            try:
+                SemanticAnalyzer().analyze(ast)
+                yield code, IROptimizer().optimize(IRGenerator().generate(ast))
+            except Exception:
+                continue
+
+
+def asm(ir):
+    with redirect_stdout(io.StringIO()):
+        return NASMGenerator().generate(ir)
+
+
+def main_cfg(code):
+    return build_cfgs(lower(code))[-1]
+
+
+class TestCFG(unittest.TestCase):
+
+    def test_round_trip_over_corpus(self):
+        checked = 0
+        for code, ir in corpus_ir():
+            with self.subTest(code=code[:40]):
+                cfgs = build_cfgs(ir)
+                flat = linearize(cfgs)
+                # Вложенные функции раскладываются рядом, а не друг в друге
+                canonical = IRModule.from_instructions(ir).instructions()
+                self.assertEqual([str(i) for i in flat], [str(i) for i in canonical])
+                self.assertEqual(asm(flat), asm(ir))
+                for cfg in cfgs:
+                    for block in cfg.blocks:
+                        for succ in block.succs:
+                            self.assertIn(block, succ.preds)
+                checked += 1
+        self.assertGreater(checked, 10)
+
+    def test_blocks_end_at_jumps_and_start_at_labels(self):
+        cfg = main_cfg("{ let x: int = 1; if (x < 2) { print(1); } else { print(2); } print(3); }")
+        for block in cfg.blocks:
+            for instr in block.instructions[1:]:
+                self.assertNotIsInstance(instr, IRLabel)
+            for instr in block.instructions[:-1]:
+                self.assertNotIsInstance(instr, (IRGoto, IRIfGoto))
+        self.assertEqual(len(cfg.blocks), 4)
+
+    def test_if_else_diamond_dominators(self):
+        cfg = main_cfg("{ let x: int = 1; if (x < 2) { print(1); } else { print(2); } print(3); }")
+        entry, join = cfg.entry, cfg.blocks[-1]
+        self.assertEqual(len(join.preds), 2)
+        self.assertIs(join.idom, entry)
+        for branch in join.preds:
+            self.assertTrue(cfg.dominates(entry, branch))
+            self.assertFalse(cfg.dominates(branch, join))
+        self.assertEqual(cfg.loops, [])
+
+    def test_nested_loops(self):
+        cfg = main_cfg("""{
+            let i: int = 0;
+            while (i < 3) {
+                for (let j: int = 0; j < 2; j = j + 1) { print(j); }
+                i = i + 1;
+            }
+        }""")
+        self.assertEqual(len(cfg.loops), 2)
+        inner, outer = cfg.loops
+        self.assertIs(inner.parent, outer)
+        self.assertEqual(outer.children, [inner])
+        self.assertEqual((inner.depth, outer.depth), (2, 1))
+        self.assertTrue(inner.blocks < outer.blocks)
+        printing = next(b for b in cfg.blocks if any(isinstance(i, IRPrint) for i in b.instructions))
+        self.assertEqual(printing.loop_depth, 2)
+        self.assertEqual(cfg.entry.loop_depth, 0)
+        self.assertTrue(cfg.dominates(outer.header, inner.header))
+
+    def test_functions_get_own_graphs(self):
+        ir = lower("{ function f(a: int): int { if (a < 1) { return 0; } return a; } print(f(2)); }")
+        cfgs = build_cfgs(ir)
+        self.assertEqual([c.name for c in cfgs], ["func_f", "main"])
+        self.assertEqual(asm(linearize(cfgs)), asm(ir))
+
+    def test_unreachable_block_has_no_dominator(self):
+        cfg = ControlFlowGraph("main", [IRGoto("L1"), IRPrint(IntConst(1), "int"),
+                                        IRLabel("L1"), IRPrint(IntConst(2), "int")])
+        dead, target = cfg.blocks[1], cfg.blocks[2]
+        self.assertFalse(cfg.reachable(dead))
+        self.assertIs(target.idom, cfg.entry)
+        self.assertFalse(cfg.dominates(cfg.entry, dead))
+
+    def test_linearize_restores_broken_fallthrough(self):
+        cfg = ControlFlowGraph("main", [IRIfGoto(Temp("t0"), "L1"), IRPrint(IntConst(1), "int"),
+                                        IRLabel("L1"), IRPrint(IntConst(2), "int")])
+        cfg.blocks[1], cfg.blocks[2] = cfg.blocks[2], cfg.blocks[1]
+        self.assertEqual([str(i) for i in cfg.linearize()],
+                         ["if t0 goto L1", "goto main_bb_1", "L1:", "print 2 (type=int)", "main_bb_1:",
+                          "print 1 (type=int)", "goto L1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from src.IR.compact import CompactIR
+from src.IR.instructions import IRAssign, IRBinary, IRCall, IRLabel, IRPhi
+from src.IR.operands import IntConst, Temp, Var
+from src.Nasm.nasm_generator import NASMGenerator
+from src.optimizer.ir_optimizer import IROptimizer
+from tests.cfg_test import corpus_ir, lower
+
+PROGRAM = """{
+    let g: float = 1.5;
+    function inc(a: int): int { return a + 1; }
+    let x: int = inc(2);
+    while (x < 5 && true) { x = x + 1; }
+    if (!(x == 5)) { print("no"); } else { print(g); }
+}"""
+
+
+def asm(ir):
+    with redirect_stdout(io.StringIO()):
+        return NASMGenerator().generate(ir)
+
+
+class TestCompactIR(unittest.TestCase):
+
+    def test_round_trip_corpus(self):
+        for _, ir in corpus_ir():
+            compact = CompactIR.from_instructions(ir)
+            self.assertEqual(len(compact), len(ir))
+            self.assertEqual([str(i) for i in compact], [str(i) for i in ir])
+            self.assertEqual([str(i) for i in compact.to_instructions()], [str(i) for i in ir])
+
+    def test_views_are_instructions(self):
+        compact = CompactIR.from_instructions(lower(PROGRAM))
+        self.assertTrue(any(isinstance(i, IRBinary) for i in compact))
+        self.assertIsInstance(compact[-1], IRLabel)
+        self.assertEqual([str(i) for i in compact[2:5]], [str(compact[i]) for i in range(2, 5)])
+        with self.assertRaises(IndexError):
+            compact[len(compact)]
+
+    def test_temps_and_labels_stay_out_of_table(self):
+        ir = lower(PROGRAM)
+        compact = CompactIR.from_instructions(ir)
+        self.assertFalse(any(isinstance(v, Temp) for v in compact.values))
+        self.assertFalse(any(isinstance(v, str) and v.startswith("while_") for v in compact.values))
+        self.assertEqual(compact.count(IRBinary), sum(isinstance(i, IRBinary) for i in ir))
+
+    def test_odd_names_go_to_table(self):
+        ir = [IRAssign(Temp("t007", "int"), IntConst(1)), IRAssign(Temp("tmp"), Temp("t5", "list"))]
+        compact = CompactIR.from_instructions(ir)
+        self.assertEqual([str(i) for i in compact], [str(i) for i in ir])
+        self.assertEqual(compact[1].value.type_, "list")
+
+    def test_var_types_interned_separately(self):
+        compact = CompactIR.from_instructions([
+            IRAssign(Var("x", "int"), IntConst(1)),
+            IRAssign(Var("x", "float"), IntConst(1)),
+        ])
+        self.assertEqual(compact[0].target.type_, "int")
+        self.assertEqual(compact[1].target.type_, "float")
+
+    def test_names(self):
+        ir = lower(PROGRAM)
+        expected = set()
+        for instr in ir:
+            for field in instr.fields:
+                value = getattr(instr, field)
+                for item in value if isinstance(value, list) else [value]:
+                    if getattr(item, "is_name", False):
+                        expected.add(item.name)
+        self.assertEqual(CompactIR.from_instructions(ir).names(), expected)
+
+    def test_same_asm(self):
+        ir = lower(PROGRAM)
+        self.assertEqual(asm(CompactIR.from_instructions(ir)), asm(ir))
+
+    def test_optimizer_on_views(self):
+        ir = lower(PROGRAM)
+        expected = IROptimizer().optimize(ir)
+        optimized = IROptimizer().optimize(CompactIR.from_instructions(ir))
+        self.assertEqual([str(i) for i in optimized], [str(i) for i in expected])
+
+    def test_write_through_view(self):
+        compact = CompactIR.from_instructions(lower(PROGRAM))
+        call = next(i for i in compact if isinstance(i, IRCall))
+        call.args = [IntConst(7)]
+        binary = next(i for i in compact if isinstance(i, IRBinary))
+        binary.op = "*"
+        self.assertEqual(next(i for i in compact if isinstance(i, IRCall)).args, [IntConst(7)])
+        self.assertEqual(next(i for i in compact if isinstance(i, IRBinary)).op, "*")
+
+    def test_phi_rejected(self):
+        with self.assertRaises(TypeError):
+            CompactIR().append(IRPhi(Var("x"), []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from src.IR.instructions import IRBinary, IRCall
+from src.IR.ir_generator import IRGenerator
+from src.IR.text import format_ir, parse_ir
+from src.Nasm.nasm_generator import NASMGenerator
+from src.optimizer.ir_optimizer import IROptimizer
+from src.semantic.semantic_analyzer import SemanticAnalyzer
+from tests.cfg_test import lower
+from tests.lexer_conformance_test import load_corpus
+from tests.rd_parser_test import antlr_ast
+from tests.ssa_test import run_ir
+
+
+def fold(text):
+    ir = parse_ir(text).instructions()
+    return format_ir(IROptimizer().constant_folding(ir)).splitlines()[1:]
+
+
+def same_output(expected, actual):
+    # float в NASM 32-битный, интерпретатор считает в double
+    if len(expected) != len(actual):
+        return False
+    for a, b in zip(expected, actual):
+        if a != b:
+            try:
+                if abs(float(a) - float(b)) > 1e-5 * max(1.0, abs(float(a))):
+                    return False
+            except ValueError:
+                return False
+    return True
+
+
+class TestConstantPropagation(unittest.TestCase):
+
+    def test_user_variables(self):
+        ir = IROptimizer().optimize(lower("{ let x: int = 5; let z: int = x + 10; print(z); }"))
+        self.assertFalse(any(isinstance(i, IRBinary) for i in ir))
+        self.assertEqual([str(i) for i in ir][-1], "print 15 (type=int)")
+
+    def test_comparisons_and_logic(self):
+        self.assertEqual(fold("""
+            %t0:bool = 3 < 4 (type=bool)
+            %t1:bool = %t0:bool && false (type=bool)
+            %t2:bool = ! %t1:bool
+            %t3:bool = true == false (type=bool)
+            %t4:bool = 2 >= 2 (type=bool)
+        """), [
+            "%t0:bool = true (type=bool)",
+            "%t1:bool = false (type=bool)",
+            "%t2:bool = true (type=bool)",
+            "%t3:bool = false (type=bool)",
+            "%t4:bool = true (type=bool)",
+        ])
+
+    def test_logic_with_one_known_side(self):
+        self.assertEqual(fold("""
+            %t0:bool = b:bool || true (type=bool)
+            %t1:bool = b:bool && true (type=bool)
+            %t2:bool = n:int && true (type=bool)
+        """), [
+            "%t0:bool = true (type=bool)",
+            "%t1:bool = b:bool (type=bool)",
+            "%t2:bool = n:int && true (type=bool)",
+        ])
+
+    def test_label_and_call_forget_variables(self):
+        self.assertEqual(fold("""
+            x:int = 1 (type=int)
+            %t0:int = 7 (type=int)
+            loop_0:
+            print x:int (type=int)
+            print %t0:int (type=int)
+            x:int = 2 (type=int)
+            %t1:int = call func_f()
+            print x:int (type=int)
+        """)[3:], [
+            "print x:int (type=int)",
+            "print 7 (type=int)",
+            "x:int = 2 (type=int)",
+            "%t1:int = call func_f()",
+            "print x:int (type=int)",
+        ])
+
+    def test_function_body_is_separate(self):
+        lines = fold("""
+            x:int = 1 (type=int)
+            function func_f()
+                print x:int (type=int)
+            end func_f
+            print x:int (type=int)
+        """)
+        self.assertEqual(lines[2].strip(), "print x:int (type=int)")
+        self.assertEqual(lines[-1], "print 1 (type=int)")
+
+    def test_redundant_store_dropped(self):
+        self.assertEqual(fold("""
+            x:int = 5 (type=int)
+            x:int = x:int (type=int)
+            print x:int (type=int)
+        """), ["x:int = 5 (type=int)", "print 5 (type=int)"])
+
+    def test_arithmetic_edge_cases(self):
+        self.assertEqual(fold("""
+            %t0:float = 0.1 + 0.2 (type=float)
+            %t1:int = 1 / 0 (type=int)
+            %t2:int = 9223372036854775807 + 1 (type=int)
+            %t3:int = 7 / -2 (type=int)
+        """), [
+            "%t0:float = 0.30000001192092896 (type=float)",
+            "%t1:int = 1 / 0 (type=int)",
+            "%t2:int = -9223372036854775808 (type=int)",
+            "%t3:int = -3 (type=int)",
+        ])
+
+    def test_float_overflow_not_folded(self):
+        # 3e38 * 10 в 32-битном float — inf, а inf - inf — nan
+        self.assertEqual(fold("""
+            %t0:float = 3e+38 * 10.0 (type=float)
+            %t1:float = %t0:float - %t0:float (type=float)
+        """), [
+            "%t0:float = 3e+38 * 10.0 (type=float)",
+            "%t1:float = %t0:float - %t0:float (type=float)",
+        ])
+        ir = IROptimizer().optimize(lower("{ let m: float = 300000000000000000000000000000000000000.0 * 10.0; print(m); }"))
+        with redirect_stdout(io.StringIO()):
+            asm = NASMGenerator().generate(ir)
+        self.assertNotIn("inf", asm)
+
+    def test_substitution_respects_codegen(self):
+        lines = fold("""
+            f:float = 1.5 (type=float)
+            big:int = 5000000000 (type=int)
+            print f:float (type=float)
+            %t1:int = big:int + n:int (type=int)
+            %t0:int = call func_g(f:float, big:int)
+        """)
+        # float-аргумент и целое вне imm32 остаются обращением к памяти
+        self.assertEqual(lines[2:], [
+            "print 1.5 (type=float)",
+            "%t1:int = big:int + n:int (type=int)",
+            "%t0:int = call func_g(f:float, big:int)",
+        ])
+
+    def test_input_not_modified(self):
+        ir = lower("{ let x: int = 5; print(x); print(x + 1); }")
+        before = [str(i) for i in ir]
+        IROptimizer().optimize(ir)
+        self.assertEqual([str(i) for i in ir], before)
+
+    def test_corpus_behaviour(self):
+        checked = 0
+        for code in load_corpus():
+            ast = antlr_ast(code)
+            if ast is None:
+                continue
+            try:
+                with redirect_stdout(io.StringIO()):
+                    SemanticAnalyzer().analyze(ast)
+                ir = IRGenerator().generate(ast)
+                expected = run_ir(ir)
+            except Exception:
+                continue
+            with self.subTest(code=code[:40]):
+                optimized = IROptimizer().optimize(ir)
+                self.assertTrue(same_output(expected, run_ir(optimized)))
+                with redirect_stdout(io.StringIO()):
+                    NASMGenerator().generate(optimized)
+                checked += 1
+        self.assertGreater(checked, 10)
+
+    def test_calls_keep_arguments(self):
+        ir = IROptimizer().optimize(lower(
+            "{ function f(a: int, b: bool): int { return a; } let k: int = 3; print(f(k, true)); }"))
+        call = next(i for i in ir if isinstance(i, IRCall))
+        self.assertEqual([str(a) for a in call.args], ["3", "True"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from src.IR.instructions import IRAssign, IRCall
+from src.IR.ir_generator import IRGenerator
+from src.IR.module import IRModule
+from src.IR.operands import Var
+from src.IR.text import format_ir, parse_ir
+from src.Nasm.nasm_generator import NASMGenerator
+from src.optimizer.ir_optimizer import IROptimizer
+from src.optimizer.liveness import dead_store_body
+from src.semantic.semantic_analyzer import SemanticAnalyzer
+from tests.cfg_test import lower
+from tests.constant_propagation_test import same_output
+from tests.lexer_conformance_test import load_corpus
+from tests.rd_parser_test import antlr_ast
+from tests.ssa_test import run_ir
+
+
+def sweep(text, name="main", call_reads=None):
+    body, removed = dead_store_body(parse_ir(text).main.body, name, call_reads)
+    return format_ir(body).splitlines()[1:], removed
+
+
+def stores(ir):
+    return [str(i.target) for i in ir if isinstance(i, IRAssign)]
+
+
+class TestDeadStores(unittest.TestCase):
+
+    def test_chains_to_fixed_point(self):
+        lines, removed = sweep("""
+            %t0:int = a:int * b:int (type=int)
+            %t1:bool = ! %t0:int
+            x:int = %t1:bool (type=int)
+            y:int = 1 (type=int)
+            y:int = 2 (type=int)
+            print y:int (type=int)
+        """)
+        self.assertEqual(lines, ["y:int = 2 (type=int)", "print y:int (type=int)"])
+        self.assertEqual(removed, 4)
+
+    def test_loop_carried_values_live(self):
+        lines, removed = sweep("""
+            i:int = 0 (type=int)
+            loop_0:
+            %t0:bool = i:int < 3 (type=bool)
+            if !%t0:bool goto end_1
+            %t1:int = i:int + 1 (type=int)
+            %t2:int = i:int * 2 (type=int)
+            i:int = %t1:int (type=int)
+            goto loop_0
+            end_1:
+            print 0 (type=int)
+        """)
+        # i читает условие следующей итерации, а t2 не читает никто
+        self.assertEqual(removed, 1)
+        self.assertNotIn("%t2:int = i:int * 2 (type=int)", lines)
+        self.assertIn("i:int = %t1:int (type=int)", lines)
+
+    def test_side_effects_kept(self):
+        lines, removed = sweep("""
+            %t0:int = a:int / b:int (type=int)
+            %t1:int = a:int / 2 (type=int)
+            %t2:int = call func_f()
+        """)
+        self.assertEqual(removed, 1)
+        self.assertEqual(lines, ["%t0:int = a:int / b:int (type=int)", "%t2:int = call func_f()"])
+
+    def test_calls_and_function_exit(self):
+        text = """
+            z:int = 1 (type=int)
+            w:int = 2 (type=int)
+            %t0:int = call func_f()
+        """
+        # Без сведений о функциях вызов может прочитать любую переменную
+        self.assertEqual(sweep(text)[1], 0)
+        self.assertEqual(sweep(text, call_reads={Var("z")})[0][0], "z:int = 1 (type=int)")
+        self.assertEqual(sweep(text, call_reads={Var("z")})[1], 1)
+        # После выхода из функции переменные может прочитать вызывающий
+        self.assertEqual(sweep("w:int = 2 (type=int)\nreturn", "func_g")[1], 0)
+
+    def test_module_pipeline(self):
+        code = """{
+            let z: int = 1;
+            let w: int = 2;
+            function f(): int { return z; }
+            print(f());
+        }"""
+        ir = IROptimizer().optimize(lower(code))
+        self.assertEqual(stores(ir), ["z"])
+        module = IROptimizer().optimize_module(IRModule.from_instructions(lower(code)))
+        self.assertEqual(stores(module), ["z"])
+        self.assertTrue(any(isinstance(i, IRCall) for i in module))
+
+    def test_stats(self):
+        optimizer = IROptimizer()
+        ir = optimizer.optimize(lower("{ let a: int = 2; let b: int = a * 3; print(a); }"))
+        # После свёртки print(2) ни a, ни b не читаются
+        self.assertEqual(stores(ir), [])
+        self.assertEqual(optimizer.stats["remove_dead_stores"], 3)
+
+    def test_corpus_behaviour(self):
+        checked = 0
+        for code in load_corpus():
+            ast = antlr_ast(code)
+            if ast is None:
+                continue
+            try:
+                with redirect_stdout(io.StringIO()):
+                    SemanticAnalyzer().analyze(ast)
+                ir = IRGenerator().generate(ast)
+                expected = run_ir(ir)
+            except Exception:
+                continue
+            with self.subTest(code=code[:40]):
+                swept = IROptimizer().remove_dead_stores(ir)
+                self.assertTrue(same_output(expected, run_ir(swept)))
+                self.assertLessEqual(len(swept), len(ir))
+                with redirect_stdout(io.StringIO()):
+                    NASMGenerator().generate(IROptimizer().optimize(ir))
+                checked += 1
+        self.assertGreater(checked, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
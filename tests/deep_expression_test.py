@@ -0,0 +1,96 @@
+import gc
+import io
+import sys
+import time
+import unittest
+from contextlib import redirect_stdout
+
+from antlr4 import InputStream
+
+from src.AST.Karkas import BinaryOp, Identifier, Literal, PrintStatement, Program, UnaryOp, VarDeclaration
+from src.IR.instructions import IRBinary, IRUnary
+from src.IR.ir_generator import IRGenerator
+from src.main import CompileOptions, build_ast, lex, parse
+from src.semantic.semantic_analyzer import SemanticAnalyzer
+
+TERMS = 100_000
+
+
+def chain_program(terms):
+    return "{ let a: int = 1; let x: int = " + " + ".join(["a"] * terms) + "; print(x); }"
+
+
+def front_end(code, **options):
+    options = CompileOptions(lexer="fast", **options)
+    with redirect_stdout(io.StringIO()):
+        return build_ast(parse(lex(InputStream(code), options), options), options)
+
+
+def right_nested(depth):
+    """1 + (1 + (1 + ...)) — такое дерево парсер из цепочки не строит."""
+    expr = Literal(1)
+    for _ in range(depth):
+        expr = BinaryOp(Literal(1), "+", expr)
+    return Program([VarDeclaration("x", "int", expr), PrintStatement(Identifier("x"))])
+
+
+def back_end(ast):
+    SemanticAnalyzer().analyze(ast)
+    return IRGenerator().generate(ast)
+
+
+def timed(func, *args, repeat=3):
+    """Лучшее из repeat измерений; сборщик мусора выключен — его проходы зависят
+    от числа живых объектов и дают выбросы, не связанные с обходом."""
+    best = None
+    for _ in range(repeat):
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            func(*args)
+            elapsed = time.perf_counter() - started
+        finally:
+            gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class TestDeepExpressions(unittest.TestCase):
+
+    def test_long_chain_through_rd_frontend(self):
+        self.assertLess(sys.getrecursionlimit(), TERMS)
+        ast = front_end(chain_program(TERMS), parser="rd")
+        ir = back_end(ast)
+        self.assertEqual(sum(isinstance(i, IRBinary) for i in ir), TERMS - 1)
+        self.assertEqual(ast.statements[1].value.type_, "int")
+
+    def test_long_chain_through_antlr_ast_builder(self):
+        # ANTLR строит левую рекурсию циклом, дерево разбора глубиной в 20k
+        ast = front_end(chain_program(20_000))
+        expected = front_end(chain_program(20_000), parser="rd")
+        self.assertEqual(repr(ast.statements[0]), repr(expected.statements[0]))
+        node, depth = ast.statements[1].value, 0
+        while isinstance(node, BinaryOp):
+            node, depth = node.left, depth + 1
+        self.assertEqual(depth, 20_000 - 1)
+
+    def test_right_nested_and_unary_chains(self):
+        ir = back_end(right_nested(TERMS))
+        self.assertEqual(sum(isinstance(i, IRBinary) for i in ir), TERMS)
+
+        expr = Literal(True)
+        for _ in range(TERMS):
+            expr = UnaryOp("!", expr)
+        ir = back_end(Program([VarDeclaration("b", "bool", expr)]))
+        self.assertEqual(sum(isinstance(i, IRUnary) for i in ir), TERMS)
+
+    def test_linear_time(self):
+        small, large = TERMS // 4, TERMS
+        small_ast, large_ast = right_nested(small), right_nested(large)
+        ratio = timed(back_end, large_ast) / timed(back_end, small_ast)
+        # Линейный рост даёт ~4, квадратичный — ~16
+        self.assertLess(ratio, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from src.AST import Karkas
+from src.AST.Karkas import ASTNode, BinaryOp, Literal
+from src.IR import instructions
+from src.IR.ir_generator import IRGenerator
+from src.Nasm.nasm_generator import NASMGenerator
+from src.dispatch import DispatchTable
+
+
+class Base:
+    pass
+
+
+class Child(Base):
+    pass
+
+
+class TestDispatchTable(unittest.TestCase):
+
+    def test_registration_and_default(self):
+        table = DispatchTable(default="default")
+        handler = table.on(int, str)(lambda: None)
+        self.assertIs(table[int], handler)
+        self.assertIs(table[str], handler)
+        self.assertEqual(table[float], "default")
+
+    def test_subclass_falls_back_to_base_and_is_cached(self):
+        table = DispatchTable()
+        table.on(Base)("base")
+        self.assertEqual(table[Child], "base")
+        self.assertIn(Child, table)
+
+    def test_missing_without_default_raises(self):
+        table = DispatchTable()
+        with self.assertRaises(KeyError):
+            table[Child]
+        self.assertEqual(table.otherwise("fallback"), "fallback")
+        self.assertEqual(table[Child], "fallback")
+
+    def test_passes_register_handlers(self):
+        node_classes = [cls for cls in vars(Karkas).values()
+                        if isinstance(cls, type) and issubclass(cls, ASTNode) and cls is not ASTNode]
+        # MatchCase/DefaultCase обрабатываются внутри MatchStatement
+        handled = [cls for cls in node_classes if cls not in (Karkas.MatchCase, Karkas.DefaultCase)]
+        for cls in handled:
+            self.assertIsNot(IRGenerator.dispatch[cls], IRGenerator.generic_visit, cls.__name__)
+        ir_classes = [instructions.IRAssign, instructions.IRBinary, instructions.IRUnary,
+                      instructions.IRPrint, instructions.IRLabel, instructions.IRGoto,
+                      instructions.IRIfGoto, instructions.IRCall, instructions.IRReturn]
+        self.assertEqual(len({NASMGenerator.translators[cls] for cls in ir_classes}), len(ir_classes))
+
+    def test_generic_visit_error(self):
+        with self.assertRaisesRegex(Exception, "No visit method for int"):
+            IRGenerator().visit(1)
+        self.assertEqual(str(IRGenerator().visit(BinaryOp(Literal(1), "+", Literal(2), type_="int"))), "t0")
+
+
+if __name__ == "__main__":
+    unittest.main()
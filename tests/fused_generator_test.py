@@ -0,0 +1,105 @@
+import unittest
+
+from src.AST.Karkas import ASTNode
+from src.IR.fused_generator import FusedIRGenerator
+from src.IR.ir_generator import IRGenerator
+from src.semantic.semantic_analyzer import SemanticAnalyzer
+from tests.lexer_conformance_test import load_corpus
+from tests.rd_parser_test import antlr_ast, rd_ast
+
+
+def two_pass(ast):
+    try:
+        SemanticAnalyzer().analyze(ast)
+        return [str(i) for i in IRGenerator().generate(ast)]
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+def fused(ast):
+    try:
+        return [str(i) for i in FusedIRGenerator().generate(ast)]
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+def annotations(node):
+    if isinstance(node, ASTNode):
+        symbol = getattr(node, "symbol", None)
+        return (node.type_, symbol.type_ if symbol else None,
+                tuple(annotations(getattr(node, f)) for f in node._fields if f != "symbol"))
+    if isinstance(node, (list, tuple)):
+        return tuple(annotations(item) for item in node)
+    return None
+
+
+class TestFusedIRGenerator(unittest.TestCase):
+
+    def test_same_ir_and_errors_over_corpus(self):
+        checked = errors = 0
+        for code in load_corpus():
+            if antlr_ast(code) is None:
+                continue
+            expected_ast, actual_ast = antlr_ast(code), antlr_ast(code)
+            expected = two_pass(expected_ast)
+            with self.subTest(code=code[:40]):
+                self.assertEqual(fused(actual_ast), expected)
+                if isinstance(expected, list):
+                    self.assertEqual(annotations(actual_ast), annotations(expected_ast))
+                else:
+                    errors += 1
+                checked += 1
+        self.assertGreater(checked, 20)
+        self.assertGreater(errors, 5)
+
+    def test_first_error_matches_when_traversal_order_differs(self):
+        # SemanticAnalyzer проверяет тело case 1 раньше значения case 2,
+        # а IR строит сравнения всех case до тел
+        code = """{
+            let v: int = 1;
+            match v {
+                case 1: print(missing);
+                case "two": print(2);
+            }
+        }"""
+        self.assertEqual(fused(rd_ast(code)), two_pass(rd_ast(code)))
+        self.assertIn("missing", fused(rd_ast(code)))
+
+    def test_for_update_does_not_see_body_declarations(self):
+        code = "{ for (let i: int = 0; i < 3; j = i) { let j: int = 0; } }"
+        self.assertIn("'j' не объявлена", fused(rd_ast(code)))
+
+    def test_nested_redeclaration_emitted_once(self):
+        code = """{
+            function f(): int { return 1; }
+            if (true) {
+                function f(): int { return 2; }
+                print(f());
+            }
+        }"""
+        ir = fused(rd_ast(code))
+        self.assertEqual(ir, two_pass(rd_ast(code)))
+        self.assertEqual([line for line in ir if line.startswith("func_f:")], ["func_f:\nparams: "])
+        # Тело пропущенной функции всё равно проверяется
+        bad = code.replace("return 2;", "return missing;")
+        self.assertEqual(fused(rd_ast(bad)), two_pass(rd_ast(bad)))
+        self.assertIn("missing", fused(rd_ast(bad)))
+
+    def test_single_traversal(self):
+        calls = []
+        original = SemanticAnalyzer.visit_statement
+
+        def spy(self, node, scope):
+            calls.append(node)
+            return original(self, node, scope)
+
+        SemanticAnalyzer.visit_statement = spy
+        try:
+            FusedIRGenerator().generate(rd_ast("{ let x: int = 1; if (x < 2) { print(x); } }"))
+        finally:
+            SemanticAnalyzer.visit_statement = original
+        self.assertEqual(calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,8 @@
+import io
 import sys
+import unittest
+from contextlib import redirect_stdout
+
 from antlr4 import *
 from src.lexer.MyLangLexer import MyLangLexer
 from src.parser.MyLangParser import MyLangParser
@@ -8,10 +12,16 @@ from src.optimizer.ir_optimizer import IROptimizer
 
 
 def normalize_lines(lines):
-    return [line.strip() for line in lines if line.strip()]
+    # Заголовок функции печатается в две строки ("func_f:\nparams: ...")
+    return [line.strip() for text in lines for line in text.splitlines() if line.strip()]
+
+
+# Конвейер без удаления мёртвых записей: видно, что дали сами распространение
+# и свёртка констант, пока записи в переменные ещё на месте
+WITHOUT_DEAD_STORES = tuple(name for name in IROptimizer.PASSES if name != "remove_dead_stores")
 
 
-def run_ir_test(code: str, expected_ir: str, description: str) -> bool:
+def run_ir_test(code: str, expected_ir: str, description: str, passes=None) -> bool:
     print(f"\n=== Тест IR: {description} ===")
 
     # Лексер и парсер
@@ -35,6 +45,8 @@ def run_ir_test(code: str, expected_ir: str, description: str) -> bool:
 
     # Оптимизация
     optimizer = IROptimizer()
+    if passes is not None:
+        optimizer.PASSES = passes
     optimized_ir = optimizer.optimize(ir)
 
     print("=== 🧾 IR после оптимизации ===")
@@ -60,152 +72,171 @@ def run_ir_test(code: str, expected_ir: str, description: str) -> bool:
         return False
 
 
-def main():
-    tests = [
-        (
-            """
-            {
-                let x: int = 1 + 2;
-                print(x);
-            }
-            """,
-            """
-            t0 = 1 + 2
-            x = t0
-            print x
-            """,
-            "Свёртка констант (constant folding)"
-        ),
-        (
-            """
-            {
-                let a: int = 1;
-                let b: int = a;
-                let c: int = b;
-                print(c);
+TESTS = [
+    (
+        """
+        {
+            let x: int = 1 + 2;
+            print(x);
+        }
+        """,
+        """
+        print 3
+        """,
+        "Свёртка констант (constant folding)"
+    ),
+    (
+        """
+        {
+            let a: int = 1;
+            let b: int = a;
+            let c: int = b;
+            print(c);
+        }
+        """,
+        """
+        a = 1 (type=int)
+        b = 1 (type=int)
+        c = 1 (type=int)
+        print 1
+        """,
+        "Copy propagation (одно звено)",
+        WITHOUT_DEAD_STORES
+    ),
+    (
+        """
+        {
+            let t1: int = 10;
+            let t2: int = t1;
+            let x: int = 1;
+            print(x);
+        }
+        """,
+        """
+        t1 = 10 (type=int)
+        t2 = 10 (type=int)
+        x = 1 (type=int)
+        print 1
+        """,
+        "Удаление неиспользуемых временных переменных",
+        WITHOUT_DEAD_STORES
+    ),
+    (
+        """
+        {
+            let x: int = 5;
+            x = x;
+            print(x);
+        }
+        """,
+        """
+        x = 5 (type=int)
+        print 5
+        """,
+        "Удаление самоприсваивания",
+        WITHOUT_DEAD_STORES
+    ),
+    (
+        """
+        {
+            if (true) {
+                print("ok");
             }
-            """,
-            """
-            a = 1
-            b = a
-            c = b
-            print c
-            """,
-            "Copy propagation (одно звено)"
-        ),
-        (
-            """
-            {
-                let t1: int = 10;
-                let t2: int = t1;
-                let x: int = 1;
-                print(x);
+        }
+        """,
+        """
+        print "ok"
+        """,
+        "simplify_if_true: if (true)"
+    ),
+    (
+        """
+        {
+            if (false) {
+                print("no");
             }
-            """,
-            """
-            t1 = 10
-            x = 1
-            print x
-            """,
-            "Удаление неиспользуемых временных переменных"
-        ),
-        (
-            """
-            {
-                let x: int = 5;
-                x = x;
-                print(x);
+        }
+        """,
+        """
+        """,
+        "simplify_if_true: if (false)"
+    ),
+    (
+        """
+        {
+            let x: bool = !true;
+            if (!x) {
+                print("never");
             }
-            """,
-            """
-            x = 5
-            print x
-            """,
-            "Удаление самоприсваивания"
-        ),
-        (
-            """
-            {
-                if (true) {
-                    print("ok");
-                }
+        }
+        """,
+        """
+        print "never"
+        """,
+        "simplify_if_true: x = !true; if (!x)"
+    ),
+    (
+        """
+        {
+            function test(): int {
+                return 42;
+                print("dead");
             }
-            """,
-            """
-            t0 = !True
-            if t0 goto else_0
-            print "ok"
-            goto endif_1
-            else_0:
-            endif_1:
-            """,
-            "simplify_if_true: if (true)"
-        ),
-        (
-            """
-            {
-                if (false) {
-                    print("no");
-                }
-            }
-            """,
-            """
-            t0 = !False
-            if t0 goto else_0
-            print "no"
-            goto endif_1
-            else_0:
-            endif_1:
-            """,
-            "simplify_if_true: if (false)"
-        ),
-        (
-            """
-            {
-                let x: bool = !true;
-                if (!x) {
-                    print("never");
-                }
-            }
-            """,
-            """
-            t0 = !True
-            x = t0
-            t1 = !x
-            t2 = !t1
-            if t2 goto else_0
-            print "never"
-            goto endif_1
-            else_0:
-            endif_1:
-            """,
-            "simplify_if_true: x = !true; if (!x)"
-        ),
-        (
-            """
-            {
-                function test(): int {
-                    return 42;
-                    print("dead");
-                }
-            }
-            """,
-            """
-            func_test:
-            params:
-            return 42
-            ; end func_test
-            """,
-            "Удаление мёртвого кода после return"
-        )
-    ]
+        }
+        """,
+        """
+        func_test:
+        params:
+        return 42
+        ; end func_test
+        """,
+        "Удаление мёртвого кода после return"
+    ),
+    (
+        """
+        {
+            let a: int = 1;
+            let b: int = a;
+            let c: int = b;
+            print(c);
+        }
+        """,
+        """
+        print 1
+        """,
+        "remove_dead_stores: записи, которые больше не читаются"
+    ),
+    (
+        """
+        {
+            let x: int = 5;
+            x = x;
+            print(x);
+        }
+        """,
+        """
+        print 5
+        """,
+        "remove_dead_stores: после самоприсваивания"
+    )
+]
+
+
+class TestExpectedIR(unittest.TestCase):
+
+    def test_expected_ir(self):
+        for code, expected, description, *passes in TESTS:
+            with self.subTest(description), redirect_stdout(io.StringIO()):
+                self.assertTrue(run_ir_test(code, expected, description, *passes))
 
+
+def main():
     passed = 0
-    for code, expected, description in tests:
-        if run_ir_test(code, expected, description):
+    for code, expected, description, *passes in TESTS:
+        if run_ir_test(code, expected, description, *passes):
             passed += 1
 
-    print(f"\n=== Результат: {passed}/{len(tests)} тестов успешно пройдены ===")
+    print(f"\n=== Результат: {passed}/{len(TESTS)} тестов успешно пройдены ===")
 
 
 if __name__ == "__main__":
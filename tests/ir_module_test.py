@@ -0,0 +1,107 @@
+import io
+import pickle
+import unittest
+from contextlib import redirect_stdout
+
+from antlr4 import InputStream
+
+from src.IR.instructions import IRCall, IRFunctionStart, IRPrint
+from src.IR.ir_generator import IRGenerator
+from src.IR.module import IRModule
+from src.IR.operands import FloatConst, StrConst, Var
+from src.main import CompileOptions, compile_stream
+from src.Nasm.nasm_generator import NASMGenerator
+from src.optimizer.ir_optimizer import IROptimizer
+from src.semantic.semantic_analyzer import SemanticAnalyzer
+from tests.cfg_test import lower
+from tests.lexer_conformance_test import load_corpus
+from tests.rd_parser_test import antlr_ast
+
+PROGRAM = """{
+    let g: float = 1.5;
+    function inc(a: int): int { return a + 1; }
+    print("start");
+    function both(a: bool, b: bool): bool { return a && b || !a; }
+    let x: int = inc(2);
+    print(both(true, false));
+    print(x);
+}"""
+
+
+def asm(ir, jobs=1):
+    with redirect_stdout(io.StringIO()):
+        return NASMGenerator(jobs=jobs).generate(ir)
+
+
+class TestIRModule(unittest.TestCase):
+
+    def test_units_and_flat_round_trip(self):
+        ir = lower(PROGRAM)
+        module = IRModule.from_instructions(ir)
+        self.assertEqual([u.name for u in module.units()], ["func_inc", "func_both", "main"])
+        self.assertTrue(module.main.is_main)
+        self.assertFalse(any(isinstance(i, IRFunctionStart) for u in module.units() for i in u.body))
+        self.assertEqual([str(i) for i in module], [str(i) for i in ir])
+        self.assertEqual(len(module), len(ir))
+        self.assertEqual(module.function_params()["func_inc"], [Var("a")])
+
+    def test_data_tables(self):
+        data = IRModule.from_instructions(lower(PROGRAM)).collect_data()
+        # Порядок единиц: сначала функции, затем main
+        self.assertEqual(list(data.variables)[:2], ["a", "t0"])
+        self.assertEqual(data.variables["g"], "float")
+        self.assertEqual(data.floats, {"1.5": "float_0"})
+        self.assertEqual(data.strings, {"start": "str_0"})
+        self.assertEqual(len(data.bools), 2)
+
+    def test_nested_function_is_own_unit(self):
+        ir = lower("{ function f(a: int): int { function g(b: int): int { return b; } return g(a); } print(f(2)); }")
+        module = IRModule.from_instructions(ir)
+        f, g = module.functions
+        self.assertEqual((f.name, g.name), ("func_f", "func_g"))
+        self.assertIsInstance(f.body[0], IRCall)
+        code = asm(module)
+        self.assertIn("func_g:", code)
+        self.assertLess(code.index("call func_g"), code.index("main:"))
+
+    def test_per_function_pipeline_matches_flat(self):
+        checked = 0
+        for code in [PROGRAM, *load_corpus()]:
+            ast = antlr_ast(code)
+            if ast is None:
+                continue
+            try:
+                with redirect_stdout(io.StringIO()):
+                    SemanticAnalyzer().analyze(ast)
+                ir = IRGenerator().generate(ast)
+            except Exception:
+                continue
+            with self.subTest(code=code[:40]):
+                module = IROptimizer().optimize_module(IRModule.from_instructions(ir))
+                self.assertEqual(asm(module), asm(IROptimizer().optimize(ir)))
+                checked += 1
+        self.assertGreater(checked, 10)
+
+    def test_worker_processes_give_same_output(self):
+        module = IRModule.from_instructions(lower(PROGRAM))
+        optimized = IROptimizer().optimize_module(module, jobs=2)
+        self.assertEqual([str(i) for i in optimized],
+                         [str(i) for i in IROptimizer().optimize_module(module)])
+        self.assertEqual(asm(optimized, jobs=2), asm(optimized))
+        self.assertIn("skip_0", asm(optimized, jobs=2))
+
+    def test_module_pickles(self):
+        module = pickle.loads(pickle.dumps(IRModule.from_instructions(lower(PROGRAM))))
+        self.assertIn(IRPrint(StrConst("start"), "string").value,
+                      [i.value for i in module.main.body if isinstance(i, IRPrint)])
+        self.assertEqual(module.collect_data().floats, {str(FloatConst(1.5)): "float_0"})
+
+    def test_compile_stream_with_function_jobs(self):
+        def compile_with(jobs):
+            with redirect_stdout(io.StringIO()):
+                return compile_stream(InputStream(PROGRAM), options=CompileOptions(function_jobs=jobs))
+        self.assertEqual(compile_with(2), compile_with(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import pickle
+import unittest
+
+from src.IR.instructions import IRAssign, IRBinary, IRIfGoto, IRPrint
+from src.IR.ir_generator import IRGenerator
+from src.IR.operands import BoolConst, FloatConst, IntConst, StrConst, Temp, Var, const
+from src.Nasm.nasm_generator import NASMGenerator
+from src.optimizer.ir_optimizer import IROptimizer
+from src.semantic.semantic_analyzer import SemanticAnalyzer
+from tests.rd_parser_test import rd_ast
+
+
+def lower(code):
+    ast = rd_ast(code)
+    SemanticAnalyzer().analyze(ast)
+    return IRGenerator().generate(ast)
+
+
+class TestOperands(unittest.TestCase):
+
+    def test_text_form_matches_previous_strings(self):
+        self.assertEqual([str(o) for o in (Temp("t0"), Var("x"), IntConst(42), FloatConst(2.5),
+                                           StrConst("hi"), BoolConst(True))],
+                         ["t0", "x", "42", "2.5", '"hi"', "True"])
+
+    def test_kinds_and_types(self):
+        self.assertEqual(const(True).kind, "bool")
+        self.assertEqual(const(1).kind, "int")
+        self.assertEqual(const(1.0).type_, "float")
+        self.assertEqual(const("s").type_, "string")
+        self.assertTrue(Temp("t1").is_name and not Temp("t1").is_const)
+
+    def test_equality_by_kind_and_value(self):
+        self.assertEqual(Var("x", "int"), Var("x"))
+        self.assertNotEqual(Var("t0"), Temp("t0"))
+        self.assertNotEqual(IntConst(1), BoolConst(True))
+        self.assertEqual(len({Temp("t0"), Temp("t0"), IntConst(0)}), 2)
+        self.assertEqual(pickle.loads(pickle.dumps(Var("x", "int"))).type_, "int")
+
+
+class TestTypedIR(unittest.TestCase):
+
+    def test_generator_emits_typed_operands(self):
+        ir = lower("{ let total: float = 1.5 * 2.0; let ok: bool = true; print(\"s\"); }")
+        binary = next(i for i in ir if isinstance(i, IRBinary))
+        self.assertIsInstance(binary.result, Temp)
+        self.assertEqual(binary.result.type_, "float")
+        self.assertEqual((binary.left, binary.right), (FloatConst(1.5), FloatConst(2.0)))
+        assigns = [i for i in ir if isinstance(i, IRAssign)]
+        self.assertEqual(assigns[0].target, Var("total"))
+        self.assertEqual(assigns[1].value, BoolConst(True))
+        self.assertEqual(next(i for i in ir if isinstance(i, IRPrint)).value, StrConst("s"))
+
+    def test_loop_condition_is_negated_jump(self):
+        ir = lower("{ let i: int = 0; while (i < 3) { i = i + 1; } }")
+        jump = next(i for i in ir if isinstance(i, IRIfGoto))
+        self.assertTrue(jump.negated)
+        self.assertIsInstance(jump.condition, Temp)
+        self.assertEqual(repr(jump), f"if !{jump.condition} goto {jump.label}")
+
+    def test_constant_folding_sees_constants(self):
+        ir = IROptimizer().constant_folding([
+            IRBinary(Temp("t0"), IntConst(7), "/", IntConst(-2), type_="int"),
+            IRBinary(Temp("t1"), FloatConst(1.5), "*", FloatConst(2.0), type_="float"),
+            IRBinary(Temp("t2"), IntConst(1), "/", IntConst(0), type_="int"),
+        ])
+        self.assertEqual(ir[0].value, IntConst(-3))  # idiv округляет к нулю
+        self.assertEqual((ir[1].value, ir[1].type_), (FloatConst(3.0), "float"))
+        self.assertIsInstance(ir[2], IRBinary)       # деление на ноль не сворачивается
+
+    def test_user_variables_are_not_temps(self):
+        # Весь конвейер уберёт и мёртвую запись в t2 (remove_dead_stores)
+        ir = IROptimizer().remove_unused_temps(lower("{ let t1: int = 10; let t2: int = t1; print(t1); }"))
+        self.assertIn(Var("t2"), [i.target for i in ir if isinstance(i, IRAssign)])
+
+    def test_while_true_loop_keeps_no_exit_jump(self):
+        ir = IROptimizer().optimize(lower("{ while (true) { print(1); } }"))
+        self.assertFalse(any(isinstance(i, IRIfGoto) for i in ir))
+
+    def test_nasm_resolves_operands_by_kind(self):
+        nasm = NASMGenerator()
+        asm = nasm.generate([IRAssign(Var("f", "float"), FloatConst(0.5), type_="float"),
+                             IRPrint(StrConst("a.b"), "string"),
+                             IRIfGoto(BoolConst(True), "end", negated=True)])
+        self.assertIn("True dq 1", asm)
+        self.assertIn("movss xmm0, [rel float_0]", asm)
+        self.assertIn("lea rdx, [rel str_0]", asm)
+        self.assertEqual(list(nasm.float_literals.values()), ["0.5"])
+
+
+if __name__ == "__main__":
+    unittest.main()
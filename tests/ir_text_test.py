@@ -0,0 +1,163 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from src.cache import StageCache
+from src.IR.instructions import IRBinary, IRCall, IRIfGoto, IRReturn, IRUnary
+from src.IR.module import IRModule
+from src.IR.operands import BoolConst, FloatConst, IntConst, StrConst, Temp, Var
+from src.IR.text import format_ir, parse_ir
+from src.main import compile_source
+from src.Nasm.nasm_generator import NASMGenerator
+from src.optimizer.ir_optimizer import IROptimizer
+from tests.cfg_test import corpus_ir, lower
+
+PROGRAM = """{
+    let g: float = 1.5;
+    function inc(a: int): int { return a + 1; }
+    let x: int = inc(2);
+    while (x < 5 && true) { x = x + 1; }
+    if (!(x == 5)) { print("a; b, c"); } else { print(g); }
+}"""
+
+
+def asm(ir):
+    with redirect_stdout(io.StringIO()):
+        return NASMGenerator().generate(ir)
+
+
+def fields(ir):
+    # Операнды сравниваются вместе с типом: он влияет на генерацию кода
+    return [(type(i).__name__, [(repr(v), getattr(v, "type_", None))
+                                for v in (getattr(i, f) for f in i.fields)]) for i in ir]
+
+
+def run_pass(name, text):
+    body = parse_ir(text).main.body
+    return format_ir(getattr(IROptimizer(), name)(body))
+
+
+class TestIRText(unittest.TestCase):
+
+    def test_round_trip_corpus(self):
+        for _, ir in corpus_ir():
+            module = IRModule.from_instructions(ir)
+            text = format_ir(module)
+            back = parse_ir(text)
+            self.assertEqual(fields(back), fields(module))
+            self.assertEqual(format_ir(back), text)
+
+    def test_same_asm(self):
+        module = IRModule.from_instructions(lower(PROGRAM))
+        self.assertEqual(asm(parse_ir(format_ir(module))), asm(module))
+
+    def test_operands(self):
+        text = """
+            %t0:int = - 5          ; унарный минус
+            %t1 = -5
+            x:float = 2.5e-07 (type=float)
+            y = "a, b" (type=string)
+            %t2:bool = ! false
+            %t3 = call func_f(x.1:int, %t1, true)
+            return
+        """
+        unary, assign, float_, string, not_, call, ret = parse_ir(text).main.body
+        self.assertIsInstance(unary, IRUnary)
+        self.assertEqual((unary.result, unary.op, unary.operand), (Temp("t0"), "-", IntConst(5)))
+        self.assertEqual(unary.result.type_, "int")
+        self.assertEqual(assign.value, IntConst(-5))
+        self.assertEqual((float_.value, float_.type_), (FloatConst(2.5e-07), "float"))
+        self.assertEqual(string.value, StrConst("a, b"))
+        self.assertEqual(not_.operand, BoolConst(False))
+        self.assertEqual(call.args, [Var("x.1"), Temp("t1"), BoolConst(True)])
+        self.assertIsNone(ret.value)
+
+    def test_keywords_as_names(self):
+        body = parse_ir("call = 1\nx = call\ngoto = goto + 1\nif !goto goto end_0").main.body
+        self.assertEqual(str(body[1]), "x = call")
+        self.assertIsInstance(body[2], IRBinary)
+        self.assertIsInstance(body[3], IRIfGoto)
+        self.assertTrue(body[3].negated)
+        self.assertEqual(body[3].label, "end_0")
+
+    def test_functions(self):
+        module = parse_ir("""
+            function func_f(a:int)
+                function func_g(b:int)
+                    return b:int
+                end func_g
+                %t0:int = call func_g(a:int)
+                return %t0:int
+            end func_f
+            print 1 (type=int)
+        """)
+        self.assertEqual([u.name for u in module.units()], ["func_f", "func_g", "main"])
+        self.assertEqual(module.function_params()["func_g"], [Var("b", "int")])
+        self.assertIsInstance(module.functions[0].body[0], IRCall)
+        self.assertIsInstance(module.functions[1].body[0], IRReturn)
+        # В модуле вложенная функция — отдельная единица, в тексте она идёт после внешней
+        self.assertIn("end func_f\nfunction func_g(b:int)\n    return b:int", format_ir(module))
+
+    def test_errors(self):
+        for text in ("x = ", "jump L", "x = 1 2", "if x goto", '; MyLang IR 99\nx = 1', "x = @"):
+            with self.assertRaises(Exception) as error:
+                parse_ir("print 1\n" + text)
+            self.assertIn("Ошибка IR в строке", str(error.exception))
+
+    def test_pass_on_hand_written_ir(self):
+        self.assertEqual(run_pass("constant_folding", """
+            %t0:int = 6 * 7 (type=int)
+            %t1:float = 1.5 / 0.5 (type=float)
+            %t2:int = 1 / 0 (type=int)
+        """).splitlines()[1:], [
+            "%t0:int = 42 (type=int)",
+            "%t1:float = 3.0 (type=float)",
+            "%t2:int = 1 / 0 (type=int)",
+        ])
+        self.assertEqual(run_pass("remove_unused_temps", """
+            %t0 = 1
+            %t1 = 2
+            x = %t1
+        """).splitlines()[1:], ["%t1 = 2", "x = %t1"])
+
+    def test_cache_stores_text(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "prog.my")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write(PROGRAM)
+            cache = StageCache(os.path.join(tmp, "cache"))
+            with redirect_stdout(io.StringIO()):
+                compile_source(source, os.path.join(tmp, "out.asm"), cache=cache)
+            key = cache.key(PROGRAM.encode("utf-8"))
+            path = cache.path("optimized_ir", key)
+            self.assertTrue(path.endswith(".ir"))
+            with open(path, encoding="utf-8") as f:
+                self.assertIn("function func_inc(a:int)", f.read())
+            found, module = cache.load("optimized_ir", key)
+            self.assertTrue(found)
+            self.assertIsInstance(module, IRModule)
+
+    def test_compile_from_ir_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "prog.my")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write(PROGRAM)
+            paths = {name: os.path.join(tmp, name) for name in ("ref.asm", "prog.ir", "from_ir.asm")}
+            log = io.StringIO()
+            with redirect_stdout(log):
+                compile_source(source, paths["ref.asm"])
+                compile_source(source, paths["prog.ir"], emit_ir=True)
+                compile_source(paths["prog.ir"], paths["from_ir.asm"])
+            outputs = {}
+            for name, path in paths.items():
+                with open(path, encoding="utf-8") as f:
+                    outputs[name] = f.read()
+            self.assertEqual(outputs["from_ir.asm"], outputs["ref.asm"])
+            self.assertTrue(outputs["prog.ir"].startswith("; MyLang IR"))
+            self.assertEqual(log.getvalue().count("AST построено"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
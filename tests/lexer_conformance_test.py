@@ -0,0 +1,102 @@
+import ast
+import glob
+import os
+import unittest
+
+from antlr4 import CommonTokenStream, InputStream
+from antlr4.error.ErrorListener import ErrorListener
+
+from src.lexer import fast_lexer
+from src.lexer.MyLangLexer import MyLangLexer
+from src.lexer.fast_lexer import FastLexer
+from src.parser.MyLangParser import MyLangParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Граничные случаи, включая ошибки распознавания и восстановление после них
+EDGE_CASES = [
+    "",
+    "{}",
+    "let x: int = 5;",
+    "x\t\r\n  y\n\n\tz",
+    "true false truex _under score_9 let1 letx",
+    "<= >= => ! != == = < >",
+    "1 12 1.5 1. 1.5.2 .5 007",
+    '"hello" "" "a b c" "line\nbreak" "ab\'c"',
+    '"unterminated',
+    "&x a & b & | && || |",
+    "# @ $ é ∑ 😀 x",
+    "a+b-c*d/e",
+    "function f(a: int, b: float): void { return; }",
+]
+
+
+class CollectErrors(ErrorListener):
+    def __init__(self):
+        self.errors = []
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        self.errors.append((line, column, msg))
+
+
+def load_corpus():
+    corpus = list(EDGE_CASES)
+    with open(os.path.join(ROOT, "example.my"), encoding="utf-8") as f:
+        corpus.append(f.read())
+    # Все программы, встречающиеся в тестовых скриптах
+    for path in sorted(glob.glob(os.path.join(ROOT, "tests", "**", "*.py"), recursive=True)):
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str) and "{" in node.value:
+                corpus.append(node.value)
+    return corpus
+
+
+def token_stream(lexer_class, code):
+    errors = CollectErrors()
+    lexer = lexer_class(InputStream(code))
+    lexer.removeErrorListeners()
+    lexer.addErrorListener(errors)
+    stream = CommonTokenStream(lexer)
+    stream.fill()
+    tokens = [(t.type, t.text, t.start, t.stop, t.line, t.column, t.channel, t.tokenIndex)
+              for t in stream.tokens]
+    return tokens, errors.errors
+
+
+class TestLexerConformance(unittest.TestCase):
+
+    def test_token_types_match_generated_parser(self):
+        for index, name in enumerate(MyLangParser.symbolicNames):
+            if name != "<INVALID>":
+                self.assertEqual(getattr(fast_lexer, name), index, name)
+                self.assertEqual(getattr(MyLangParser, name), index, name)
+        for index, literal in enumerate(MyLangParser.literalNames):
+            text = literal.strip("'")
+            if index == 0:
+                continue
+            expected = fast_lexer.KEYWORDS.get(text, fast_lexer.OPERATORS.get(text))
+            self.assertEqual(expected, index, literal)
+
+    def test_identical_token_streams_over_corpus(self):
+        corpus = load_corpus()
+        self.assertGreater(len(corpus), 40)
+        for code in corpus:
+            with self.subTest(code=code[:40]):
+                self.assertEqual(token_stream(FastLexer, code), token_stream(MyLangLexer, code))
+
+    def test_accepts_plain_string(self):
+        tokens = FastLexer("let x").getAllTokens()
+        self.assertEqual([t.type for t in tokens], [fast_lexer.LET, fast_lexer.ID])
+
+    def test_parser_accepts_fast_tokens(self):
+        code = "{ let x: int = 1 + 2; print(x); }"
+        parser = MyLangParser(CommonTokenStream(FastLexer(InputStream(code))))
+        tree = parser.program()
+        self.assertEqual(parser.getNumberOfSyntaxErrors(), 0)
+        self.assertEqual(tree.getText(), "{letx:int=1+2;print(x);}<EOF>")
+
+
+if __name__ == "__main__":
+    unittest.main()
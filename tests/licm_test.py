@@ -0,0 +1,185 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from src.IR.cfg import ControlFlowGraph
+from src.IR.instructions import IRBinary, IRCall, IRLabel
+from src.IR.ir_generator import IRGenerator
+from src.IR.module import IRModule
+from src.IR.text import format_ir, parse_ir
+from src.Nasm.nasm_generator import NASMGenerator
+from src.optimizer.ir_optimizer import IROptimizer
+from src.optimizer.licm import licm_body, pure_functions
+from src.semantic.semantic_analyzer import SemanticAnalyzer
+from tests.cfg_test import lower
+from tests.constant_propagation_test import same_output
+from tests.lexer_conformance_test import load_corpus
+from tests.rd_parser_test import antlr_ast
+from tests.ssa_test import run_ir
+
+LOOP = """
+    i:int = 0 (type=int)
+    loop_0:
+    %t0:bool = i:int < 10 (type=bool)
+    if !%t0:bool goto end_1
+    %t1:int = n:int * m:int (type=int)
+    %t2:int = i:int + %t1:int (type=int)
+    i:int = %t2:int (type=int)
+    goto loop_0
+    end_1:
+    print i:int (type=int)
+"""
+
+
+def hoist(text, name="main", pure=None):
+    body, hoisted = licm_body(parse_ir(text).main.body, name, pure)
+    return format_ir(body).splitlines()[1:], hoisted
+
+
+def position(lines, text):
+    return next(i for i, line in enumerate(lines) if text in line)
+
+
+class TestLoopInvariantMotion(unittest.TestCase):
+
+    def test_hoists_to_preheader(self):
+        lines, hoisted = hoist(LOOP)
+        self.assertEqual(hoisted, 1)
+        self.assertLess(position(lines, "n:int * m:int"), position(lines, "loop_0:"))
+        # Зависящее от i остаётся в цикле
+        self.assertGreater(position(lines, "i:int + %t1:int"), position(lines, "loop_0:"))
+
+    def test_loop_at_entry_gets_preheader(self):
+        lines, hoisted = hoist(LOOP.replace("i:int = 0 (type=int)", ""))
+        self.assertEqual(hoisted, 1)
+        self.assertEqual(lines[0], "%t1:int = n:int * m:int (type=int)")
+        self.assertEqual(lines[1], "loop_0:")
+
+    def test_preheader_for_jump_entry(self):
+        body = parse_ir("""
+            c:bool = false (type=bool)
+            x:int = 5 (type=int)
+            if c:bool goto loop_0
+            x:int = 1 (type=int)
+            loop_0:
+            %t0:int = x:int + 1 (type=int)
+            x:int = %t0:int (type=int)
+            if c:bool goto loop_0
+            print x:int (type=int)
+        """).main.body
+        cfg = ControlFlowGraph("main", body)
+        loop = cfg.loops[0]
+        preheader = cfg.preheader(loop)
+        # Оба входа извне идут через новый блок, обратное ребро — мимо него
+        self.assertEqual(len(preheader.preds), 2)
+        self.assertEqual(loop.header.preds[0], preheader)
+        self.assertIs(loop.header.idom, preheader)
+        self.assertIs(cfg.preheader(loop), preheader)
+        ir = cfg.linearize()
+        self.assertEqual(run_ir(ir), run_ir(body))
+        labels = [i.label for i in ir if isinstance(i, IRLabel)]
+        self.assertEqual(len(labels), len(set(labels)))
+
+    def test_nested_loops(self):
+        code = """{
+            function f(n: int): int {
+                let s: int = 0;
+                for (let i: int = 0; i < n; i = i + 1) {
+                    for (let j: int = 0; j < n; j = j + 1) { s = s + n * n; }
+                }
+                return s;
+            }
+            print(f(4));
+        }"""
+        ir = IROptimizer().optimize(lower(code))
+        body = IRModule.from_instructions(ir).functions[0].body
+        # Из внутреннего цикла — в его предзаголовок, а оттуда — перед внешним
+        first_label = next(i for i, instr in enumerate(body) if isinstance(instr, IRLabel))
+        self.assertIn("n * n", " ".join(map(str, body[:first_label])))
+        self.assertEqual(run_ir(ir), run_ir(lower(code)))
+
+    def test_clobbering_call_in_function(self):
+        text = LOOP.replace("%t2:int = i:int", "%t9:int = call func_g()\n%t2:int = i:int")
+        # Вызов мог изменить n и m
+        self.assertEqual(hoist(text, "func_f")[1], 0)
+        self.assertEqual(hoist(text)[1], 0)
+        # Временные main вызов не меняет
+        self.assertEqual(hoist(text.replace("n:int", "%t7:int").replace("m:int", "%t8:int"))[1], 1)
+        self.assertEqual(hoist(text.replace("n:int", "%t7:int").replace("m:int", "%t8:int"), "func_f")[1], 0)
+
+    def test_division_stays(self):
+        self.assertEqual(hoist(LOOP.replace("n:int * m:int", "n:int / m:int"))[1], 0)
+        self.assertEqual(hoist(LOOP.replace("n:int * m:int", "n:int / 2"))[1], 1)
+
+    def test_pure_calls(self):
+        code = """{
+            let n: int = 3;
+            let s: int = 0;
+            function sq(q: int): int { return q * q; }
+            function show(r: int): int { print(r); return r; }
+            for (let i: int = 0; i < 3; i = i + 1) { s = s + sq(n); }
+            for (let k: int = 0; k < 2; k = k + 1) { s = s + sq(n) + show(n); }
+            print(s);
+        }"""
+        module = IRModule.from_instructions(lower(code))
+        self.assertEqual(list(pure_functions(module)), ["func_sq"])
+        ir = IROptimizer().optimize(lower(code))
+        main = IRModule.from_instructions(ir).main.body
+        first_label = next(i for i, instr in enumerate(main) if isinstance(instr, IRLabel))
+        self.assertEqual([c.name for c in main[:first_label] if isinstance(c, IRCall)], ["func_sq"])
+        # Во втором цикле show может изменить n — sq(n) остаётся на месте
+        self.assertEqual([c.name for c in main[first_label:] if isinstance(c, IRCall)], ["func_sq", "func_show"])
+        self.assertEqual(run_ir(ir), run_ir(lower(code)))
+
+    def test_shared_params_not_pure(self):
+        # Параметр q функции g пишет и f — вынос вызова g поменял бы q для f
+        module = parse_ir("""
+            function func_g(q:int)
+            %t0:int = q:int + 1 (type=int)
+            return %t0:int
+            end func_g
+            function func_f(p:int)
+            q:int = p:int (type=int)
+            return q:int
+            end func_f
+        """)
+        self.assertEqual(pure_functions(module), {})
+
+    def test_stats(self):
+        optimizer = IROptimizer()
+        optimizer.optimize(lower("""{
+            function f(n: int, m: int): int {
+                let s: int = 0;
+                while (s < 100) { s = s + n * m + n; }
+                return s;
+            }
+            print(f(2, 3));
+        }"""))
+        self.assertEqual(optimizer.stats["loop_invariant_code_motion"], 1)
+
+    def test_corpus_behaviour(self):
+        checked = 0
+        for code in load_corpus():
+            ast = antlr_ast(code)
+            if ast is None:
+                continue
+            try:
+                with redirect_stdout(io.StringIO()):
+                    SemanticAnalyzer().analyze(ast)
+                ir = IRGenerator().generate(ast)
+                expected = run_ir(ir)
+            except Exception:
+                continue
+            with self.subTest(code=code[:40]):
+                hoisted = IROptimizer().loop_invariant_code_motion(ir)
+                self.assertTrue(same_output(expected, run_ir(hoisted)))
+                self.assertEqual(len([i for i in hoisted if isinstance(i, IRBinary)]),
+                                 len([i for i in ir if isinstance(i, IRBinary)]))
+                with redirect_stdout(io.StringIO()):
+                    NASMGenerator().generate(IROptimizer().optimize(ir))
+                checked += 1
+        self.assertGreater(checked, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import io
+import json
+import tracemalloc
+import unittest
+from contextlib import redirect_stdout
+
+from antlr4 import InputStream
+
+from src.main import STAGES, CompileOptions, compile_stream
+from src.optimizer.ir_optimizer import IROptimizer
+from src.pass_timer import PassTimer
+
+CODE = """
+{
+    let x: int = 1 + 2;
+    let y: int = x * 3;
+    print(y);
+}
+"""
+
+
+def run_with_timer(timer):
+    with redirect_stdout(io.StringIO()):
+        compile_stream(InputStream(CODE), options=CompileOptions(timer=timer))
+    return timer
+
+
+class TestPassTimer(unittest.TestCase):
+
+    def test_all_stages_and_passes_are_recorded(self):
+        timer = run_with_timer(PassTimer())
+        names = [r["name"] for r in timer.records]
+        stage_names = [name for name, _, _ in STAGES]
+        self.assertEqual([r["name"] for r in timer.records if r["depth"] == 0], stage_names)
+        # Проходы оптимизатора идут сразу за своей стадией
+        start = names.index("optimize") + 1
+        self.assertEqual(names[start:start + len(IROptimizer.PASSES)], list(IROptimizer.PASSES))
+        self.assertTrue(all(r["depth"] == 1 for r in timer.records[start:start + len(IROptimizer.PASSES)]))
+
+    def test_ir_counts(self):
+        timer = run_with_timer(PassTimer())
+        by_name = {r["name"]: r for r in timer.records}
+        self.assertIsNone(by_name["ir"]["ir_before"])
+        self.assertGreater(by_name["ir"]["ir_after"], 0)
+        self.assertEqual(by_name["optimize"]["ir_before"], by_name["ir"]["ir_after"])
+        self.assertEqual(by_name["nasm"]["ir_before"], by_name["optimize"]["ir_after"])
+
+    def test_memory_tracking(self):
+        timer = run_with_timer(PassTimer(track_memory=True))
+        self.assertTrue(all(r["peak_kb"] is not None and r["peak_kb"] >= 0 for r in timer.records))
+        self.assertFalse(tracemalloc.is_tracing())
+        # Пик стадии не меньше пика любого её прохода
+        optimize = next(r for r in timer.records if r["name"] == "optimize")
+        passes = [r for r in timer.records if r["depth"] == 1]
+        self.assertGreaterEqual(optimize["peak_kb"], max(r["peak_kb"] for r in passes))
+
+    def test_reports(self):
+        timer = run_with_timer(PassTimer(track_memory=True))
+        report = json.loads(timer.to_json())
+        self.assertEqual(len(report["passes"]), len(timer.records))
+        self.assertGreater(report["total_wall_ms"], 0)
+        table = timer.format_table()
+        self.assertIn("copy_propagation", table)
+        self.assertIn("Пик, КБ", table)
+        self.assertNotIn("Пик, КБ", run_with_timer(PassTimer()).format_table())
+
+
+if __name__ == "__main__":
+    unittest.main()
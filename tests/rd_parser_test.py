@@ -0,0 +1,94 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from antlr4 import CommonTokenStream, InputStream
+
+from src.AST.ASTBuilder import ASTBuilder
+from src.AST.Karkas import ASTNode, BinaryOp, Identifier, Program, UnaryOp
+from src.exceptions.syntax_error import MyLangSyntaxError
+from src.lexer.MyLangLexer import MyLangLexer
+from src.lexer.fast_lexer import FastLexer
+from src.main import CompileOptions, compile_stream
+from src.parser.MyLangParser import MyLangParser
+from src.parser.rd_parser import RDParser
+from tests.lexer_conformance_test import CollectErrors, load_corpus
+
+
+def structure(node):
+    """Сравнимое представление AST: класс узла и все его поля (включая позицию) рекурсивно."""
+    if isinstance(node, ASTNode):
+        return (type(node).__name__,
+                tuple((k, structure(getattr(node, k))) for k in node._fields))
+    if isinstance(node, (list, tuple)):
+        return tuple(structure(item) for item in node)
+    return (type(node).__name__, node)
+
+
+def antlr_ast(code):
+    """AST через ANTLR + ASTBuilder или None, если парсер нашёл ошибки.
+
+    Ошибки лексера не учитываются: оба лексера одинаково пропускают символы.
+    """
+    errors = CollectErrors()
+    lexer = MyLangLexer(InputStream(code))
+    lexer.removeErrorListeners()
+    parser = MyLangParser(CommonTokenStream(lexer))
+    parser.removeErrorListeners()
+    parser.addErrorListener(errors)
+    tree = parser.program()
+    if errors.errors:
+        return None
+    return ASTBuilder().visit(tree)
+
+
+def rd_ast(code):
+    lexer = FastLexer(InputStream(code))
+    lexer.removeErrorListeners()
+    return RDParser(CommonTokenStream(lexer)).parse()
+
+
+class TestRDParser(unittest.TestCase):
+
+    def test_identical_ast_over_corpus(self):
+        checked = 0
+        for code in load_corpus():
+            expected = antlr_ast(code)
+            with self.subTest(code=code[:40]):
+                if expected is None:
+                    with self.assertRaises(MyLangSyntaxError):
+                        rd_ast(code)
+                    continue
+                self.assertEqual(structure(rd_ast(code)), structure(expected))
+                checked += 1
+        self.assertGreater(checked, 20)
+
+    def test_precedence_and_associativity(self):
+        program = rd_ast("{ x = !a && b || c < d + e * f - g; }")
+        value = program.statements[0].value
+        self.assertIsInstance(value, BinaryOp)
+        self.assertEqual(value.op, "||")
+        self.assertIsInstance(value.left.left, UnaryOp)
+        sub = value.right.right
+        self.assertEqual(sub.op, "-")
+        self.assertEqual(sub.left.op, "+")
+        self.assertEqual(sub.left.right.op, "*")
+        self.assertIsInstance(sub.right, Identifier)
+
+    def test_syntax_error_position(self):
+        with self.assertRaises(MyLangSyntaxError) as ctx:
+            rd_ast("{\n  let x: int = 5\n  print(x);\n}")
+        self.assertEqual((ctx.exception.line, ctx.exception.column), (3, 2))
+        self.assertIn("expecting ';'", str(ctx.exception))
+
+    def test_pipeline_with_rd_parser(self):
+        code = "{ let x: int = 1 + 2; print(x); }"
+        with redirect_stdout(io.StringIO()):
+            expected = compile_stream(InputStream(code))
+            actual = compile_stream(InputStream(code), options=CompileOptions(lexer="fast", parser="rd"))
+        self.assertEqual(actual, expected)
+        self.assertIsInstance(rd_ast(code), Program)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from src.IR.instructions import IRGoto, IRIfGoto, IRLabel
+from src.IR.ir_generator import IRGenerator
+from src.IR.module import IRModule
+from src.IR.text import format_ir, parse_ir
+from src.Nasm.nasm_generator import NASMGenerator
+from src.optimizer.ir_optimizer import IROptimizer
+from src.optimizer.sccp import sccp_body
+from src.semantic.semantic_analyzer import SemanticAnalyzer
+from tests.cfg_test import lower
+from tests.constant_propagation_test import same_output
+from tests.lexer_conformance_test import load_corpus
+from tests.rd_parser_test import antlr_ast
+from tests.ssa_test import run_ir
+
+
+def sccp(text):
+    return format_ir(sccp_body(parse_ir(text).main.body)).splitlines()[1:]
+
+
+def branches(ir):
+    return [i for i in ir if isinstance(i, (IRGoto, IRIfGoto, IRLabel))]
+
+
+class TestSCCP(unittest.TestCase):
+
+    def test_if_true_and_constant_logic(self):
+        ir = IROptimizer().optimize(lower("""{
+            if (true) { print(1); } else { print(0); }
+            let k: bool = true;
+            let l: bool = false;
+            if (k && !l || false) { print("yes"); } else { print("no"); }
+        }"""))
+        self.assertEqual(branches(ir), [])
+        self.assertEqual([str(i) for i in ir][-1], 'print "yes" (type=string)')
+        self.assertNotIn('print "no" (type=string)', [str(i) for i in ir])
+
+    def test_constant_through_join(self):
+        # В обеих ветках x = 1: после слияния значение известно
+        self.assertEqual(sccp("""
+            if c:bool goto L1
+            x:int = 1 (type=int)
+            goto L2
+            L1:
+            x:int = 1 (type=int)
+            L2:
+            print x:int (type=int)
+        """)[-1], "print 1 (type=int)")
+
+    def test_unreachable_branch_does_not_spoil_join(self):
+        self.assertEqual(sccp("""
+            x:int = 1 (type=int)
+            %t0:bool = x:int == 1 (type=bool)
+            if %t0:bool goto L1
+            y:int = 3 (type=int)
+            goto L2
+            L1:
+            y:int = 2 (type=int)
+            L2:
+            print y:int (type=int)
+        """), [
+            "x:int = 1 (type=int)",
+            "%t0:bool = true (type=bool)",
+            "y:int = 2 (type=int)",
+            "print 2 (type=int)",
+        ])
+
+    def test_loops(self):
+        ir = IROptimizer().optimize(lower("""{
+            let i: int = 0;
+            while (i < 3) { i = i + 1; }
+            while (false) { print(i); }
+            print(i);
+        }"""))
+        # Первый цикл остаётся: i на входе в заголовок не постоянна
+        self.assertEqual(len([i for i in ir if isinstance(i, IRIfGoto)]), 1)
+        self.assertEqual([str(i) for i in ir][-1], "print i (type=int)")
+
+    def test_loop_with_constant_variable(self):
+        lines = sccp("""
+            n:int = 5 (type=int)
+            loop_0:
+            %t0:bool = n:int > 0 (type=bool)
+            if !%t0:bool goto end_1
+            print n:int (type=int)
+            goto loop_0
+            end_1:
+            print 0 (type=int)
+        """)
+        # n не меняется в цикле: условие всегда истинно, выход недостижим
+        self.assertIn("print 5 (type=int)", lines)
+        self.assertNotIn("print 0 (type=int)", lines)
+        self.assertEqual(lines[-1], "goto loop_0")
+
+    def test_unknown_values_keep_branches(self):
+        ir = IROptimizer().optimize(lower("""{
+            let x: int = 1;
+            function f(a: int): int { if (a == 1) { x = 2; } return a; }
+            let r: int = f(1);
+            if (x == 1) { print(1); }
+        }"""))
+        module = IRModule.from_instructions(ir)
+        # Параметр функции неизвестен, а x мог измениться при вызове
+        self.assertEqual(len([i for i in module.functions[0].body if isinstance(i, IRIfGoto)]), 1)
+        self.assertEqual(len([i for i in module.main.body if isinstance(i, IRIfGoto)]), 1)
+
+    def test_labels_cleaned(self):
+        self.assertEqual(sccp("""
+            if true goto L1
+            print 1 (type=int)
+            L1:
+            print 2 (type=int)
+        """), ["print 2 (type=int)"])
+
+    def test_corpus_behaviour(self):
+        checked = 0
+        for code in load_corpus():
+            ast = antlr_ast(code)
+            if ast is None:
+                continue
+            try:
+                with redirect_stdout(io.StringIO()):
+                    SemanticAnalyzer().analyze(ast)
+                ir = IRGenerator().generate(ast)
+                expected = run_ir(ir)
+            except Exception:
+                continue
+            with self.subTest(code=code[:40]):
+                pruned = IROptimizer().conditional_constants(ir)
+                self.assertTrue(same_output(expected, run_ir(pruned)))
+                self.assertLessEqual(len(pruned), len(ir))
+                with redirect_stdout(io.StringIO()):
+                    NASMGenerator().generate(IROptimizer().optimize(ir))
+                checked += 1
+        self.assertGreater(checked, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
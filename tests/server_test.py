@@ -0,0 +1,135 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from src import client
+from src.arguments import LEXER_NAMES, compile_options, make_arg_parser
+from src.client import send_request
+from src.main import LEXERS
+from src.server import CompileServer
+
+CODE = """
+{
+    let x: int = 5;
+    print(x);
+}
+"""
+
+
+class TestCompileServer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp.name, "prog.my")
+        self.output = os.path.join(self.tmp.name, "out", "prog.asm")
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write(CODE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compile_request(self):
+        server = CompileServer()
+        response = json.loads(server.handle_line(json.dumps(
+            {"command": "compile", "source": self.source, "output": self.output})))
+        self.assertTrue(response["ok"])
+        self.assertIn("NASM-код сохранён", response["log"])
+        with open(self.output, encoding="utf-8") as f:
+            self.assertIn("main:", f.read())
+
+    def test_missing_source_reports_error(self):
+        server = CompileServer()
+        response = server.handle({"source": self.source + ".missing", "output": self.output})
+        self.assertFalse(response["ok"])
+        self.assertEqual(server.requests_served, 1)
+
+    def test_request_options(self):
+        server = CompileServer()
+        args = make_arg_parser().parse_args([self.source, self.output, "--fused", "--emit-ir"])
+        response = server.handle({"source": self.source, "output": self.output,
+                                  "options": compile_options(args)})
+        self.assertTrue(response["ok"], response.get("error"))
+        self.assertIn("IR сохранён", response["log"])
+        with open(self.output, encoding="utf-8") as f:
+            self.assertIn("print 5", f.read())
+
+    def test_request_options_are_checked(self):
+        server = CompileServer()
+        for options in ({"running": False}, {"lexer": "slow"}, {"fused": "yes"},
+                        {"function_jobs": "4"}, {"cache_dir": 1}, ["--fused"]):
+            with self.subTest(options=options):
+                response = server.handle({"source": self.source, "output": self.output, "options": options})
+                self.assertFalse(response["ok"])
+                self.assertIn("Ошибка", response["error"])
+        self.assertTrue(server.running)
+        self.assertFalse(os.path.exists(self.output))
+
+    def test_client_forwards_options(self):
+        sent = []
+
+        def fake_send(payload):
+            sent.append(payload)
+            return {"ok": True, "log": ""}
+
+        with mock.patch.object(client, "send_request", fake_send):
+            self.assertEqual(client.main([self.source, self.output, "--lexer", "fast", "--emit-ir"]), 0)
+        options = sent[0]["options"]
+        self.assertEqual((options["lexer"], options["emit_ir"], options["parser"]), ("fast", True, "antlr"))
+        self.assertEqual(sorted(LEXERS), sorted(LEXER_NAMES))
+
+    def test_client_fallback_uses_options(self):
+        def refuse(payload):
+            raise ConnectionRefusedError
+
+        with mock.patch.object(client, "send_request", refuse), redirect_stdout(io.StringIO()):
+            self.assertEqual(client.main([self.source, self.output, "--parser", "rd", "--emit-ir"]), 0)
+        with open(self.output, encoding="utf-8") as f:
+            self.assertTrue(f.read().startswith("; MyLang IR"))
+
+    def test_bad_json_and_unknown_command(self):
+        server = CompileServer()
+        self.assertFalse(json.loads(server.handle_line("{not json"))["ok"])
+        self.assertFalse(server.handle({"command": "explode"})["ok"])
+
+    def test_stdio_protocol_stops_on_shutdown(self):
+        server = CompileServer()
+        reader = io.StringIO(
+            json.dumps({"source": self.source, "output": self.output}) + "\n"
+            + json.dumps({"command": "stats"}) + "\n"
+            + json.dumps({"command": "shutdown"}) + "\n"
+            + json.dumps({"command": "ping"}) + "\n"
+        )
+        writer = io.StringIO()
+        server.serve_stream(reader, writer)
+        responses = [json.loads(line) for line in writer.getvalue().splitlines()]
+        self.assertEqual(len(responses), 3)
+        self.assertTrue(responses[0]["ok"])
+        self.assertEqual(responses[1]["requests_served"], 1)
+
+    def test_unix_socket_roundtrip(self):
+        socket_path = os.path.join(self.tmp.name, "server.sock")
+        server = CompileServer()
+        thread = threading.Thread(target=server.serve_unix, args=(socket_path,), daemon=True)
+        thread.start()
+        for _ in range(100):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.01)
+
+        self.assertTrue(send_request({"command": "ping"}, socket_path)["ok"])
+        response = send_request({"source": self.source, "output": self.output}, socket_path)
+        self.assertTrue(response["ok"])
+        send_request({"command": "shutdown"}, socket_path)
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(os.path.exists(socket_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
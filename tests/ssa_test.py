@@ -0,0 +1,219 @@
+import io
+import operator
+import unittest
+from contextlib import redirect_stdout
+
+from src.IR.cfg import ControlFlowGraph, build_cfgs, linearize
+from src.IR.instructions import *
+from src.IR.ir_generator import IRGenerator
+from src.IR.module import IRModule
+from src.IR.ssa import construct_ssa, destruct_ssa, pinned_names, to_ssa, verify_ssa
+from src.Nasm.nasm_generator import NASMGenerator
+from src.optimizer.ir_optimizer import IROptimizer
+from src.semantic.semantic_analyzer import SemanticAnalyzer
+from tests.cfg_test import corpus_ir, lower
+from tests.ir_expected_test import TESTS
+from tests.rd_parser_test import antlr_ast
+
+
+def _div(a, b):
+    if b == 0:
+        raise ZeroDivisionError
+    if isinstance(a, float) or isinstance(b, float):
+        return a / b
+    quotient = abs(a) // abs(b)
+    return quotient if (a < 0) == (b < 0) else -quotient
+
+
+OPS = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": _div,
+       "==": operator.eq, "!=": operator.ne, "<": operator.lt, ">": operator.gt,
+       "<=": operator.le, ">=": operator.ge,
+       "&&": lambda a, b: bool(a and b), "||": lambda a, b: bool(a or b)}
+
+
+def run_ir(instructions, steps=100000):
+    """Исполняет плоский IR и возвращает напечатанное: эталон поведения для
+    проверки преобразований. Память общая, как в NASM: все имена глобальные."""
+    module = IRModule.from_instructions(instructions)
+    functions = {unit.name: (unit.params, unit.body) for unit in module.functions}
+
+    memory, output, budget = {}, [], [steps]
+
+    def value(operand):
+        return operand.value if operand.is_const else memory.get(operand.name, 0)
+
+    def run(code, in_function):
+        labels = {instr.label: i for i, instr in enumerate(code) if isinstance(instr, IRLabel)}
+        pc = 0
+        while pc < len(code):
+            budget[0] -= 1
+            if budget[0] < 0:
+                raise RuntimeError("слишком долго")
+            instr = code[pc]
+            pc += 1
+            if isinstance(instr, IRAssign):
+                memory[instr.target.name] = value(instr.value)
+            elif isinstance(instr, IRBinary):
+                memory[instr.result.name] = OPS[instr.op](value(instr.left), value(instr.right))
+            elif isinstance(instr, IRUnary):
+                memory[instr.result.name] = not value(instr.operand)
+            elif isinstance(instr, IRPrint):
+                output.append(str(value(instr.value)))
+            elif isinstance(instr, IRGoto):
+                pc = labels[instr.label]
+            elif isinstance(instr, IRIfGoto):
+                if bool(value(instr.condition)) != instr.negated:
+                    pc = labels[instr.label]
+            elif isinstance(instr, IRCall):
+                params, callee = functions[instr.name]
+                args = [value(a) for a in instr.args]
+                for param, arg in zip(params, args):
+                    memory[param.name] = arg
+                result = run(callee, True)
+                if instr.target is not None:
+                    memory[instr.target.name] = result
+            elif isinstance(instr, IRReturn) and in_function:
+                return value(instr.value) if instr.value is not None else None
+        return None
+
+    try:
+        run(module.main.body, False)
+    except ZeroDivisionError:
+        output.append("деление на ноль")
+    return output
+
+
+def round_trip(ir):
+    cfgs = build_cfgs(ir)
+    pinned = pinned_names(cfgs)
+    to_ssa(cfgs)
+    for cfg in cfgs:
+        verify_ssa(cfg, pinned)
+    for cfg in cfgs:
+        destruct_ssa(cfg)
+    return linearize(cfgs)
+
+
+def expected_programs():
+    for code, _, description, *_ in TESTS:
+        ast = antlr_ast(code)
+        SemanticAnalyzer().analyze(ast)
+        yield description, IRGenerator().generate(ast)
+
+
+def phis(cfg):
+    return [i for b in cfg.blocks for i in b.instructions if isinstance(i, IRPhi)]
+
+
+class TestSSA(unittest.TestCase):
+
+    def test_round_trip_ir_expected_programs(self):
+        for description, ir in expected_programs():
+            for variant in (ir, IROptimizer().optimize(ir)):
+                with self.subTest(description=description):
+                    before = [str(i) for i in variant]
+                    result = round_trip(variant)
+                    self.assertEqual(run_ir(result), run_ir(variant))
+                    self.assertEqual([str(i) for i in variant], before)  # исходный IR не тронут
+                    with redirect_stdout(io.StringIO()):
+                        NASMGenerator().generate(result)
+
+    def test_round_trip_over_corpus(self):
+        checked = 0
+        for code, ir in corpus_ir():
+            try:
+                expected = run_ir(ir)
+            except RuntimeError:
+                continue  # бесконечный цикл
+            with self.subTest(code=code[:40]):
+                self.assertEqual(run_ir(round_trip(ir)), expected)
+                checked += 1
+        self.assertGreater(checked, 10)
+
+    def test_loop_variable_gets_phi(self):
+        cfg = build_cfgs(lower("{ let i: int = 0; while (i < 3) { i = i + 1; } print(i); }"))[-1]
+        origin = construct_ssa(cfg)
+        verify_ssa(cfg)
+        header = cfg.loops[0].header
+        (phi,) = phis(cfg)
+        self.assertIn(phi, header.instructions)
+        self.assertEqual(origin[phi.target.name], "i")
+        self.assertEqual(sorted(str(v) for _, v in phi.sources), ["i.1", "i.3"])
+        self.assertIsInstance(phi.target, Var)
+
+    def test_straight_line_code_needs_no_phi(self):
+        cfg = build_cfgs(lower("{ let x: int = 1; x = x + 2; x = x * 3; print(x); }"))[-1]
+        construct_ssa(cfg)
+        verify_ssa(cfg)
+        self.assertEqual(phis(cfg), [])
+        targets = [str(i.defined()) for i in cfg.blocks[0].instructions if i.defined() is not None]
+        self.assertEqual(len(targets), len(set(targets)))
+
+    def test_parallel_copies_keep_swap(self):
+        code = """{
+            let a: int = 1;
+            let b: int = 2;
+            let i: int = 0;
+            while (i < 3) { let t: int = a; a = b; b = t; i = i + 1; }
+            print(a);
+            print(b);
+        }"""
+        ir = lower(code)
+        cfg = build_cfgs(ir)[-1]
+        construct_ssa(cfg)
+        # Протягиваем копии внутри SSA: phi начинают читать друг друга
+        copies = {}
+        for block in cfg.blocks:
+            for instr in block.instructions:
+                if isinstance(instr, IRAssign) and instr.value.is_name:
+                    copies[instr.target] = copies.get(instr.value, instr.value)
+        for phi in phis(cfg):
+            for source in phi.sources:
+                source[1] = copies.get(source[1], source[1])
+        verify_ssa(cfg)
+        destruct_ssa(cfg)
+        result = linearize([cfg])
+        self.assertTrue(any(".swap" in str(i) for i in result))
+        self.assertEqual(run_ir(result), run_ir(ir))
+        self.assertEqual(run_ir(result), ["2", "1"])
+
+    def test_shared_names_are_not_renamed(self):
+        ir = lower("""{
+            let g: int = 1;
+            function bump(n: int): int { g = g + n; return g; }
+            let r: int = bump(2);
+            print(g);
+        }""")
+        cfgs = build_cfgs(ir)
+        self.assertTrue({"g", "n"} <= pinned_names(cfgs))
+        to_ssa(cfgs)
+        names = {str(i.defined()) for c in cfgs for b in c.blocks for i in b.instructions
+                 if isinstance(i, IRInstruction) and i.defined() is not None}
+        self.assertIn("g", names)
+        self.assertFalse(any("." in name for name in names))
+
+    def test_critical_edge_is_split(self):
+        code = "{ let x: int = 0; let i: int = 0; while (i < 2) { if (i < 1) { x = 5; } i = i + 1; } print(x); }"
+        ir = lower(code)
+        cfg = build_cfgs(ir)[-1]
+        blocks = len(cfg.blocks)
+        construct_ssa(cfg)
+        destruct_ssa(cfg)
+        self.assertGreaterEqual(len(cfg.blocks), blocks)
+        self.assertFalse(phis(cfg))
+        self.assertEqual(run_ir(linearize([cfg])), run_ir(ir))
+
+    def test_verifier_rejects_broken_form(self):
+        x1 = Var("x.1", "int")
+        twice = ControlFlowGraph("main", [IRAssign(x1, IntConst(1)), IRAssign(x1, IntConst(2))])
+        with self.assertRaisesRegex(Exception, "определена дважды"):
+            verify_ssa(twice)
+        undominated = ControlFlowGraph("main", [
+            IRIfGoto(Temp("t0"), "L1"), IRAssign(x1, IntConst(1)),
+            IRLabel("L1"), IRPrint(x1, "int")])
+        with self.assertRaisesRegex(Exception, "не доминирует"):
+            verify_ssa(undominated)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+
+from src.AST.Karkas import (
+    Block, FunctionDeclaration, Identifier, Literal, PrintStatement, Program, VarDeclaration,
+)
+from src.semantic.semantic_analyzer import SemanticAnalyzer
+from src.semantic.symbol_table import SymbolTable
+
+
+class TestSymbolTable(unittest.TestCase):
+
+    def test_shadowing_is_restored_on_exit(self):
+        table = SymbolTable()
+        table.define("x", "int")
+        with table.nested():
+            table.define("x", "string")
+            self.assertEqual(table.lookup("x").type_, "string")
+            with table.nested():
+                self.assertEqual(table.lookup("x").type_, "string")
+        self.assertEqual(table.lookup("x").type_, "int")
+
+    def test_inner_names_disappear_on_exit(self):
+        table = SymbolTable()
+        table.enter_scope()
+        table.define("y", "bool")
+        self.assertEqual(table.depth, 1)
+        table.exit_scope()
+        self.assertIsNone(table.lookup("y"))
+        self.assertEqual(table.depth, 0)
+
+    def test_lookup_local_only_sees_current_scope(self):
+        table = SymbolTable()
+        table.define("x", "int")
+        with table.nested():
+            self.assertIsNone(table.lookup_local("x"))
+            self.assertIsNotNone(table.lookup("x"))
+        self.assertIsNotNone(table.lookup_local("x"))
+
+    def test_redefinition_in_same_scope_replaces(self):
+        table = SymbolTable()
+        with table.nested():
+            table.define("x", "int")
+            table.define("x", "float")
+            self.assertEqual(table.lookup("x").type_, "float")
+        # Одно объявление — один снимаемый со стека элемент
+        self.assertIsNone(table.lookup("x"))
+
+    def test_names_are_interned(self):
+        table = SymbolTable()
+        name = "".join(["va", "lue"])
+        symbol = table.define(name, "int")
+        self.assertIs(symbol.name, "value")
+
+    def test_scope_closed_after_exception(self):
+        table = SymbolTable()
+        with self.assertRaises(ValueError):
+            with table.nested():
+                table.define("x", "int")
+                raise ValueError
+        self.assertEqual(table.depth, 0)
+        self.assertIsNone(table.lookup("x"))
+
+    def test_cannot_exit_global_scope(self):
+        with self.assertRaises(Exception):
+            SymbolTable().exit_scope()
+
+
+class TestAnalyzerScopes(unittest.TestCase):
+
+    def test_block_local_is_not_visible_after_block(self):
+        program = Program([
+            Block([VarDeclaration("x", "int", Literal(1))]),
+            PrintStatement(Identifier("x")),
+        ])
+        with self.assertRaisesRegex(Exception, "не объявлена"):
+            SemanticAnalyzer().analyze(program)
+
+    def test_function_params_shadow_globals(self):
+        program = Program([
+            VarDeclaration("x", "string", Literal("s")),
+            FunctionDeclaration("f", [("x", "int")], "int", Block([])),
+            PrintStatement(Identifier("x")),
+        ])
+        analyzer = SemanticAnalyzer()
+        analyzer.analyze(program)
+        self.assertEqual(analyzer.global_scope.lookup("x").type_, "string")
+        self.assertEqual(analyzer.global_scope.depth, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from antlr4 import CommonTokenStream, InputStream
+
+from src.lexer.fast_lexer import FastLexer
+from src.parser.MyLangParser import MyLangParser
+from src.parser.two_stage import TwoStageParser
+from tests.lexer_conformance_test import CollectErrors, load_corpus
+
+
+def tokens(code):
+    lexer = FastLexer(InputStream(code))
+    lexer.removeErrorListeners()
+    stream = CommonTokenStream(lexer)
+    stream.fill()
+    return stream
+
+
+def ll_parse(code):
+    parser = MyLangParser(tokens(code))
+    parser.removeErrorListeners()
+    errors = CollectErrors()
+    parser.addErrorListener(errors)
+    return parser.program().toStringTree(recog=parser), errors.errors
+
+
+class TestTwoStageParser(unittest.TestCase):
+
+    def test_same_trees_as_full_ll(self):
+        two_stage = TwoStageParser()
+        failures = 0
+        corpus = load_corpus()
+        for code in corpus:
+            expected, errors = ll_parse(code)
+            failures += bool(errors)
+            with self.subTest(code=code[:40]):
+                tree = two_stage.parse(tokens(code))
+                self.assertEqual(tree.toStringTree(recog=MyLangParser(None)), expected)
+        # На нашей грамматике SLL откатывается только на синтаксических ошибках
+        self.assertEqual(two_stage.ll_fallbacks, failures)
+        self.assertEqual(two_stage.sll_parses, len(corpus) - failures)
+
+    def test_fallback_reports_errors(self):
+        two_stage = TwoStageParser()
+        tree = two_stage.parse(tokens("{ let x: int = 5 print(x); }"))
+        self.assertEqual(two_stage.stats(), {"sll_parses": 0, "ll_fallbacks": 1})
+        self.assertEqual(tree.parser.getNumberOfSyntaxErrors(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
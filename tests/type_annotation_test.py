@@ -0,0 +1,97 @@
+import io
+import time
+import unittest
+from contextlib import redirect_stdout
+
+from antlr4 import InputStream
+
+from src.AST.Karkas import ASTNode, Assignment, FunctionCall, FunctionDeclaration, Identifier, VarDeclaration
+from src.IR.instructions import IRAssign, IRPrint
+from src.IR.operands import FloatConst, IntConst, Var
+from src.IR.ir_generator import IRGenerator
+from src.Nasm.nasm_generator import NASMGenerator
+from src.main import CompileOptions, build_ast, lex, parse
+from src.semantic.semantic_analyzer import SemanticAnalyzer
+
+PROGRAM = """
+{
+    function half(v: float): float {
+        return v / 2.0;
+    }
+    let x: float = 1.5;
+    x = half(x);
+    let n: int = 3;
+    let ok: bool = !(n == 0);
+    print(half(x));
+    print(!ok);
+    print("s");
+}
+"""
+
+EXPRESSIONS = ("Literal", "Identifier", "BinaryOp", "UnaryOp", "FunctionCall")
+
+
+def analyzed(code):
+    options = CompileOptions(lexer="fast", parser="rd")
+    with redirect_stdout(io.StringIO()):
+        ast = build_ast(parse(lex(InputStream(code), options), options), options)
+    SemanticAnalyzer().analyze(ast)
+    return ast
+
+
+def walk(node):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, ASTNode):
+            yield node
+            stack.extend(getattr(node, f) for f in node._fields if f != "symbol")
+
+
+class TestTypeAnnotations(unittest.TestCase):
+
+    def test_every_expression_has_a_type(self):
+        for node in walk(analyzed(PROGRAM)):
+            if type(node).__name__ in EXPRESSIONS:
+                self.assertIsNotNone(node.type_, repr(node))
+
+    def test_names_are_resolved_to_symbols(self):
+        ast = analyzed(PROGRAM)
+        declaration = next(n for n in walk(ast) if isinstance(n, VarDeclaration) and n.name == "x")
+        for node in walk(ast):
+            if isinstance(node, (VarDeclaration, Assignment, FunctionDeclaration, FunctionCall)):
+                self.assertIsNotNone(node.symbol, repr(node))
+            if isinstance(node, Identifier) and node.name == "x":
+                self.assertIs(node.symbol, declaration.symbol)
+            if isinstance(node, FunctionCall):
+                self.assertEqual(node.symbol.decl.name, "half")
+
+    def test_ir_takes_types_from_annotations(self):
+        ir = IRGenerator().generate(analyzed(PROGRAM))
+        self.assertEqual([i.type_ for i in ir if isinstance(i, IRPrint)], ["float", "bool", "string"])
+        assignment = next(i for i in ir if isinstance(i, IRAssign) and str(i.target) == "x" and str(i.value) != "1.5")
+        self.assertEqual(assignment.type_, "float")
+
+
+class TestNasmTypeIndex(unittest.TestCase):
+
+    def test_unannotated_print_falls_back_to_definition(self):
+        asm = NASMGenerator().generate([IRAssign(Var("y"), FloatConst(2.5), type_="float"), IRPrint(Var("y"))])
+        self.assertIn("format_float", asm.split("section .text")[1])
+
+    def test_variable_collection_is_linear(self):
+        def run(count):
+            ir = [IRAssign(Var(f"v{i}"), IntConst(i), type_="int") for i in range(count)]
+            started = time.perf_counter()
+            NASMGenerator().generate(ir)
+            return time.perf_counter() - started
+
+        run(1000)
+        small, large = min(run(2000) for _ in range(3)), min(run(16000) for _ in range(3))
+        self.assertLess(large / small, 8 * 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
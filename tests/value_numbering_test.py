@@ -0,0 +1,161 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from src.IR.instructions import IRBinary
+from src.IR.ir_generator import IRGenerator
+from src.IR.module import IRModule
+from src.IR.text import format_ir, parse_ir
+from src.Nasm.nasm_generator import NASMGenerator
+from src.optimizer.ir_optimizer import IROptimizer
+from src.optimizer.value_numbering import value_numbering_body
+from src.semantic.semantic_analyzer import SemanticAnalyzer
+from tests.cfg_test import lower
+from tests.constant_propagation_test import same_output
+from tests.lexer_conformance_test import load_corpus
+from tests.rd_parser_test import antlr_ast
+from tests.ssa_test import run_ir
+
+
+def number(text, name="main"):
+    body, eliminated = value_numbering_body(parse_ir(text).main.body, name)
+    return format_ir(body).splitlines()[1:], eliminated
+
+
+def products(ir):
+    return [str(i) for i in ir if isinstance(i, IRBinary) and i.op == "*"]
+
+
+class TestValueNumbering(unittest.TestCase):
+
+    def test_local_reuse_and_commutative(self):
+        lines, eliminated = number("""
+            %t0:int = a:int * b:int (type=int)
+            %t1:int = b:int * a:int (type=int)
+            %t2:int = %t0:int + %t1:int (type=int)
+            print %t2:int (type=int)
+        """)
+        self.assertEqual(eliminated, 1)
+        self.assertEqual(lines, [
+            "%t0:int = a:int * b:int (type=int)",
+            "%t2:int = %t0:int + %t0:int (type=int)",
+            "print %t2:int (type=int)",
+        ])
+
+    def test_redefinition_invalidates(self):
+        lines, eliminated = number("""
+            %t0:int = a:int * b:int (type=int)
+            a:int = 1 (type=int)
+            %t1:int = a:int * b:int (type=int)
+            a:int = 2 (type=int)
+            print %t0:int (type=int)
+            print %t1:int (type=int)
+        """)
+        self.assertEqual(eliminated, 0)
+        self.assertEqual(len([l for l in lines if "*" in l]), 2)
+
+    def test_dominator_scope(self):
+        ir = IROptimizer().optimize(lower("""{
+            function f(x: int, y: int): int {
+                let p: int = x * y;
+                if (x > 0) { p = p + x * y; } else { p = p - x * y; }
+                return p + x * y;
+            }
+            print(f(2, 3));
+        }"""))
+        func = IRModule.from_instructions(ir).functions[0]
+        # x и y в теле не пишутся: x * y из входного блока доступно везде
+        self.assertEqual(products(func.body), ["t0 = x * y (type=int)"])
+
+    def test_sibling_branches_not_shared(self):
+        lines, eliminated = number("""
+            if c:bool goto L1
+            %t0:int = a:int * b:int (type=int)
+            print %t0:int (type=int)
+            goto L2
+            L1:
+            %t1:int = a:int * b:int (type=int)
+            print %t1:int (type=int)
+            L2:
+        """)
+        self.assertEqual(eliminated, 0)
+
+    def test_call_blocks_reuse_in_function(self):
+        text = """
+            %t9:int = n:int + 1 (type=int)
+            %t0:int = a:int * 2 (type=int)
+            %t1:int = call func_f(%t0:int)
+            %t2:int = a:int * 2 (type=int)
+            print %t2:int (type=int)
+        """
+        # Вызов мог изменить a (и, при рекурсии, временные функции)
+        self.assertEqual(number(text, "func_f")[1], 0)
+        self.assertEqual(number(text.replace("a:int", "%t9:int"), "func_f")[1], 0)
+        lines, eliminated = number(text.replace("a:int", "%t9:int"))
+        self.assertEqual(eliminated, 1)
+        self.assertEqual(lines[-1], "print %t0:int (type=int)")
+
+    def test_single_write_read_before(self):
+        code = """{
+            let g: int = 4;
+            function f(): int { let a: int = g + g; g = a; return g + g; }
+            print(f());
+        }"""
+        # g читается и до своей единственной записи в f
+        self.assertEqual(run_ir(IROptimizer().optimize(lower(code))), ["16"])
+        lines, eliminated = number("""
+            %t0:int = g:int + g:int (type=int)
+            g:int = %t0:int (type=int)
+            %t1:int = g:int + g:int (type=int)
+            return %t1:int
+        """, "func_f")
+        self.assertEqual(eliminated, 0)
+
+    def test_copy_when_rename_unsafe(self):
+        lines, eliminated = number("""
+            x:int = a:int * b:int (type=int)
+            y:int = a:int * b:int (type=int)
+            x:int = 0 (type=int)
+            print y:int (type=int)
+        """)
+        self.assertEqual(eliminated, 1)
+        self.assertEqual(lines[1], "y:int = x:int (type=int)")
+
+    def test_stats(self):
+        code = """{
+            function g(a: int, b: int): int { let c: int = a * b + a * b; return c * (a * b); }
+            print(g(2, 3));
+        }"""
+        optimizer = IROptimizer()
+        ir = optimizer.optimize(lower(code))
+        self.assertEqual(optimizer.stats["value_numbering"], 2)
+        self.assertEqual(len(products(ir)), 2)
+        # Счётчики собираются и с процессов пула
+        module = IROptimizer()
+        module.optimize_module(IRModule.from_instructions(lower(code)), jobs=2)
+        self.assertEqual(module.stats, optimizer.stats)
+
+    def test_corpus_behaviour(self):
+        checked = 0
+        for code in load_corpus():
+            ast = antlr_ast(code)
+            if ast is None:
+                continue
+            try:
+                with redirect_stdout(io.StringIO()):
+                    SemanticAnalyzer().analyze(ast)
+                ir = IRGenerator().generate(ast)
+                expected = run_ir(ir)
+            except Exception:
+                continue
+            with self.subTest(code=code[:40]):
+                numbered = IROptimizer().value_numbering(ir)
+                self.assertTrue(same_output(expected, run_ir(numbered)))
+                with redirect_stdout(io.StringIO()):
+                    NASMGenerator().generate(IROptimizer().optimize(ir))
+                checked += 1
+        self.assertGreater(checked, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()